@@ -0,0 +1,202 @@
+"""Time each stage of the morphct pipeline on synthetic morphologies.
+
+Example
+-------
+Time systems of about 1e2 to 1e5 benzene chromophores::
+
+    python benchmarks/run_benchmarks.py --sizes 100 1000 10000 100000
+
+The results are written to "benchmarks/results/morphct-<version>.json" so the
+scaling of each stage can be compared between versions.
+"""
+import argparse
+from contextlib import contextmanager
+import datetime
+import json
+import os
+import platform
+import tempfile
+import time
+
+import numpy as np
+
+import morphct
+from morphct import kmc_analyze
+from morphct.chromophores import (
+    get_chromo_ids_smiles, set_neighbors_voronoi, set_qcc_inputs
+)
+from morphct.execute_qcc import (
+    dimer_homolumo, set_energyvalues, singles_homolumo
+)
+from morphct.mobility_kmc import (
+    combine_carriers, get_rate_table, run_single_kmc
+)
+from morphct.system import System
+
+from synthetic import benzene_lattice, write_gsd
+
+
+@contextmanager
+def timed(stages, name):
+    """Add the wall time of the block to `stages[name]` in seconds."""
+    t0 = time.perf_counter()
+    yield
+    stages[name] = time.perf_counter() - t0
+
+
+def benchmark(n_molecules, tmpdir, n_carriers=20, lifetimes=(1e-12, 1e-11)):
+    """Run every stage of the pipeline on one synthetic morphology.
+
+    Parameters
+    ----------
+    n_molecules : int
+        The approximate number of benzene molecules (see
+        `synthetic.benzene_lattice`).
+    tmpdir : path
+        A directory for the gsd and energy files.
+    n_carriers : int, default 20
+        The number of holes simulated at each lifetime.
+    lifetimes : tuple of float, default (1e-12, 1e-11)
+        The carrier lifetimes in seconds.
+
+    Returns
+    -------
+    dict
+        The size of the system, the wall time of each stage in seconds
+        ("stages"), and the KMC throughput ("kmc").
+    """
+    stages = {}
+    with timed(stages, "generate"):
+        snap = benzene_lattice(n_molecules)
+        gsdfile = os.path.join(tmpdir, f"benzene_{n_molecules}.gsd")
+        write_gsd(snap, gsdfile)
+        system = System(gsdfile, tmpdir)
+
+    with timed(stages, "smarts"):
+        ids = get_chromo_ids_smiles(system.snap, "c1ccccc1", by_molecule=True)
+    with timed(stages, "add_chromophores"):
+        system.add_chromophores(ids, "donor")
+    chromo_list = system.chromophores
+    with timed(stages, "qcc_inputs"):
+        set_qcc_inputs(chromo_list, system.snap)
+    with timed(stages, "neighbors_voronoi"):
+        qcc_pairs = set_neighbors_voronoi(chromo_list, system.snap, d_cut=10)
+
+    s_filename = os.path.join(tmpdir, "singles_energies.txt")
+    d_filename = os.path.join(tmpdir, "dimer_energies.txt")
+    # The surrogate backend stands in for the quantum chemistry
+    with timed(stages, "homolumo_surrogate"):
+        singles_homolumo(chromo_list, s_filename, backend="surrogate")
+        dimer_homolumo(
+            qcc_pairs, chromo_list, d_filename, backend="surrogate"
+        )
+    with timed(stages, "set_energyvalues"):
+        set_energyvalues(chromo_list, s_filename, d_filename)
+
+    temp = 300
+    box = system.snap.configuration.box[:3]
+    with timed(stages, "rate_table"):
+        rate_table = get_rate_table(chromo_list, box, temp)
+    jobs = [
+        (i, lifetime, "hole")
+        for lifetime in lifetimes
+        for i in range(n_carriers)
+    ]
+    with timed(stages, "kmc"):
+        carriers = run_single_kmc(
+            jobs,
+            tmpdir,
+            chromo_list,
+            system.snap,
+            temp,
+            carrier_kwargs={"record_history": False},
+            seed=42,
+            verbose=0,
+            rate_table=rate_table,
+        )
+    n_hops = sum(carrier.n_hops for carrier in carriers)
+    with timed(stages, "kmc_analyze"):
+        kmc_analyze.summarize_mobility(combine_carriers(carriers), temp)
+
+    return {
+        "n_molecules": n_molecules,
+        "n_chromophores": len(chromo_list),
+        "n_pairs": len(qcc_pairs),
+        "n_atoms": int(system.snap.particles.N),
+        "stages": stages,
+        "kmc": {
+            "n_carriers": len(carriers),
+            "n_hops": int(n_hops),
+            "hops_per_second": n_hops / stages["kmc"],
+        },
+    }
+
+
+def main(sizes, output=None, n_carriers=20):
+    """Benchmark each size and write the results to a JSON file.
+
+    Parameters
+    ----------
+    sizes : list of int
+        The approximate numbers of chromophores.
+    output : path, default None
+        The JSON file to write. If None is given,
+        "benchmarks/results/morphct-<version>.json" is used.
+    n_carriers : int, default 20
+        The number of holes simulated at each lifetime.
+
+    Returns
+    -------
+    dict
+        The benchmark results.
+    """
+    if output is None:
+        output = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            "results",
+            f"morphct-{morphct.__version__}.json",
+        )
+    results = {
+        "morphct_version": morphct.__version__,
+        "python_version": platform.python_version(),
+        "numpy_version": np.__version__,
+        "platform": platform.platform(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "results": [],
+    }
+    for size in sizes:
+        print(f"Benchmarking {size} chromophores...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = benchmark(size, tmpdir, n_carriers=n_carriers)
+        for stage, seconds in result["stages"].items():
+            print(f"\t{stage:<20} {seconds:10.4f} s")
+        print(f"\t{result['kmc']['hops_per_second']:.3g} hops/s")
+        results["results"].append(result)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[64, 216],
+        help="Approximate numbers of chromophores to benchmark.",
+    )
+    parser.add_argument(
+        "--output", default=None, help="Path of the JSON results file."
+    )
+    parser.add_argument(
+        "--n-carriers",
+        type=int,
+        default=20,
+        help="Number of holes simulated at each lifetime.",
+    )
+    args = parser.parse_args()
+    main(args.sizes, output=args.output, n_carriers=args.n_carriers)
@@ -0,0 +1,126 @@
+"""Synthetic periodic morphologies for benchmarking morphct."""
+import gsd.hoomd
+import numpy as np
+
+# Benzene geometry in Angstroms
+_CC_BOND = 1.39
+_CH_BOND = 1.09
+
+
+def benzene():
+    """Get the positions, types and bonds of one benzene molecule.
+
+    Returns
+    -------
+    positions : numpy.ndarray (12, 3)
+        The atom positions centered on the origin in the xy plane. The carbons
+        come first.
+    types : list of str
+        The element of each atom.
+    bonds : numpy.ndarray (12, 2) of int
+        The atom indices of each bond.
+    """
+    angles = np.arange(6) * np.pi / 3
+    ring = np.stack([np.cos(angles), np.sin(angles), np.zeros(6)], axis=1)
+    positions = np.concatenate([ring * _CC_BOND, ring * (_CC_BOND + _CH_BOND)])
+    types = ["C"] * 6 + ["H"] * 6
+    bonds = [(i, (i + 1) % 6) for i in range(6)]
+    bonds += [(i, i + 6) for i in range(6)]
+    return positions, types, np.array(bonds)
+
+
+def _random_rotations(n, rng):
+    """Get n uniformly random rotation matrices."""
+    q = rng.normal(size=(n, 4))
+    q /= np.linalg.norm(q, axis=1)[:, None]
+    w, x, y, z = q.T
+    return np.stack(
+        [
+            np.stack([1 - 2*(y*y + z*z), 2*(x*y - z*w), 2*(x*z + y*w)], -1),
+            np.stack([2*(x*y + z*w), 1 - 2*(x*x + z*z), 2*(y*z - x*w)], -1),
+            np.stack([2*(x*z - y*w), 2*(y*z + x*w), 1 - 2*(x*x + y*y)], -1),
+        ],
+        axis=1,
+    )
+
+
+def benzene_lattice(n_molecules, spacing=6.0, jitter=0.5, seed=0):
+    """Make a periodic snapshot of benzene molecules on a cubic lattice.
+
+    Each molecule has a random orientation and is displaced from its lattice
+    site by up to `jitter` along each axis. Molecules which cross the box
+    boundary are wrapped with their images set, like in a simulation
+    snapshot.
+
+    Parameters
+    ----------
+    n_molecules : int
+        The approximate number of molecules. The lattice is the smallest cube
+        with at least this many sites.
+    spacing : float, default 6.0
+        The lattice spacing in Angstroms.
+    jitter : float, default 0.5
+        The largest displacement of a molecule from its site in Angstroms.
+    seed : int, default 0
+        A seed for the random orientations and displacements.
+
+    Returns
+    -------
+    gsd.hoomd.Frame
+        The snapshot, with lengths in Angstroms and element names as the
+        particle types.
+    """
+    rng = np.random.default_rng(seed)
+    n_side = int(np.ceil(n_molecules ** (1 / 3)))
+    n = n_side ** 3
+    length = n_side * spacing
+
+    mol_pos, mol_types, mol_bonds = benzene()
+    sites = np.stack(
+        np.meshgrid(*[np.arange(n_side)] * 3, indexing="ij"), axis=-1
+    ).reshape(-1, 3)
+    centers = (sites + 0.5) * spacing - length / 2
+    centers += rng.uniform(-jitter, jitter, size=(n, 3))
+    rotations = _random_rotations(n, rng)
+    unwrapped = (
+        np.einsum("nij,aj->nai", rotations, mol_pos) + centers[:, None, :]
+    ).reshape(-1, 3)
+
+    images = np.floor((unwrapped + length / 2) / length).astype(int)
+    positions = unwrapped - images * length
+
+    n_atoms = len(mol_types)
+    bonds = (
+        mol_bonds[None, :, :] + n_atoms * np.arange(n)[:, None, None]
+    ).reshape(-1, 2)
+
+    # gsd < 2.8 calls the frame class Snapshot
+    frame_class = getattr(gsd.hoomd, "Frame", None) or gsd.hoomd.Snapshot
+    snap = frame_class()
+    snap.configuration.box = [length, length, length, 0, 0, 0]
+    snap.particles.N = len(positions)
+    snap.particles.types = ["C", "H"]
+    snap.particles.typeid = np.tile(
+        [snap.particles.types.index(t) for t in mol_types], n
+    )
+    snap.particles.position = positions
+    snap.particles.image = images
+    snap.bonds.N = len(bonds)
+    snap.bonds.types = ["C-C"]
+    snap.bonds.typeid = np.zeros(len(bonds), dtype=int)
+    snap.bonds.group = bonds
+    return snap
+
+
+def write_gsd(snap, filename):
+    """Write a snapshot to a gsd file.
+
+    Parameters
+    ----------
+    snap : gsd.hoomd.Frame
+        The snapshot to write.
+    filename : path
+        The path of the gsd file.
+    """
+    with gsd.hoomd.open(name=filename, mode="w") as f:
+        f.append(snap)
@@ -5,6 +5,7 @@ from morphct import (
     execute_qcc,
     helper_functions,
     kmc_analyze,
+    master_equation,
     mobility_kmc,
     transfer_integrals
 )
@@ -16,6 +17,7 @@ __all__ = [
     "execute_qcc",
     "helper_functions",
     "kmc_analyze",
+    "master_equation",
     "mobility_kmc",
     "transfer_integrals",
 ]
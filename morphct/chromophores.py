@@ -1,6 +1,7 @@
 import copy
 import itertools
 from collections import defaultdict
+from multiprocessing import get_context
 import os
 import sys
 from warnings import warn
@@ -50,6 +51,13 @@ class Chromophore:
         exp(r/vrh_delocalization) when `use_vrh` is True.
     charge : int, default 0
         The charge (in units of electrons) associated with this chromophore.
+    unwrapped_center, image, center : numpy.ndarray(3), default None
+        Precomputed center attributes, e.g., from `get_chromo_centers`. If None
+        is given, they are computed from the snapshot.
+    write_qcc : bool, default True
+        Whether to write the QCC input on initialization. If False,
+        `qcc_input` and `boundary_bonds` are None until `set_qcc_inputs` is
+        called, which is much faster for many chromophores.
 
     Attributes
     ----------
@@ -67,9 +75,18 @@ class Chromophore:
         Snapshot indices of the particles which belong to this chromophore.
     n_atoms : int
         The number of atoms in the chromophore.
+    orientation : numpy.ndarray(3)
+        The unit normal vector of the best-fit plane through the chromophore
+        atoms. On initialization this is set to None, values are cached by
+        `morphct.kmc_analyze.get_orientations`. See `get_chromo_orientations`
+        for more information.
+    boundary_bonds : numpy.ndarray (N, 2) of int
+        The bonds connecting the chromophore to the rest of its molecule. See
+        `morphct.execute_qcc.get_boundary_bonds` for more information.
     qcc_input : str
         The input for the MINDO3 quantum chemical calculation run in pySCF. See
-        https://pyscf.org/quickstart.html for more information.
+        https://pyscf.org/quickstart.html for more information. None if it has
+        not been written yet.
     neighbors : list of (int, numpy.ndarray(size=3))
         Each list entry is the chromophore index of the neighbor followed by the
         relative image of that neighbor. On initialization this is an empty
@@ -102,6 +119,8 @@ class Chromophore:
     -------
     get_MO_energy
         Get the frontier orbital energy for this chromophore.
+    update_geometry
+        Update the geometry-dependent attributes from a new snapshot.
     """
 
     def __init__(
@@ -114,6 +133,10 @@ class Chromophore:
         reorganization_energy=0.3064,
         vrh_delocalization=2e-10,
         charge=0,
+        unwrapped_center=None,
+        image=None,
+        center=None,
+        write_qcc=True,
     ):
         self.id = chromo_id
         if species.lower() not in ["donor", "acceptor"]:
@@ -126,10 +149,34 @@ class Chromophore:
         self.charge = charge
 
         # Sets unwrapped_center, center, and image attributes
-        self._set_center(snap, atom_ids)
+        if unwrapped_center is None or image is None or center is None:
+            self._set_center(snap, atom_ids)
+        else:
+            self.unwrapped_center = unwrapped_center
+            self.image = image
+            self.center = center
+
+        # The orientation is computed for many chromophores at once when needed
+        self.orientation = None
+
+        # The bonds to the rest of the molecule only depend on the topology
+        self.boundary_bonds = None
+        self.qcc_input = None
+        if write_qcc:
+            self.boundary_bonds = eqcc.get_boundary_bonds(snap, atom_ids)
+            self.qcc_input = eqcc.write_qcc_inp(
+                snap, atom_ids, conversion_dict, self.boundary_bonds
+            )
 
-        self.qcc_input = eqcc.write_qcc_inp(snap, atom_ids, conversion_dict)
+        self._reset_neighbors()
 
+    def __repr__(self):
+        """Return the Chromophore representation."""
+        return "Chromophore {} ({}): {} atoms at {:.3f} {:.3f} {:.3f}".format(
+            self.id, self.species, self.n_atoms, *self.center
+        )
+
+    def _reset_neighbors(self):
         # Now to create a load of placeholder parameters to update later when we
         # have the full list/energy levels.
         # The self.neighbors list contains one element for each chromophore
@@ -152,12 +199,6 @@ class Chromophore:
         self.neighbors_delta_e = []
         self.neighbors_ti = []
 
-    def __repr__(self):
-        """Return the Chromophore representation."""
-        return "Chromophore {} ({}): {} atoms at {:.3f} {:.3f} {:.3f}".format(
-            self.id, self.species, self.n_atoms, *self.center
-        )
-
     def _set_center(self, snap, atom_ids):
 
         box = freud.Box.from_box(snap.configuration.box)
@@ -168,6 +209,40 @@ class Chromophore:
         self.image = image
         self.center = box.wrap(center)
 
+    def update_geometry(self, snap, conversion_dict=None, write_qcc=True):
+        """Update the geometry-dependent attributes from a new snapshot.
+
+        The atom indices and boundary bonds are reused, so the snapshot must
+        have the same topology as the one used to create the chromophore (e.g.,
+        another frame of the same trajectory). The center, image, and
+        qcc_input are recomputed, and the orientation, neighbors, and energies
+        are reset because they depend on the geometry.
+
+        Parameters
+        ----------
+        snap : gsd.hoomd.Snapshot
+            Atomistic simulation snapshot from a GSD file. It is expected that
+            the lengths in this file have been converted to Angstroms.
+        conversion_dict : dictionary, default None
+            A dictionary that maps the atom type to its element. e.g.,
+            `{'c3': C}`. If None is given, assume the particles already have
+            element names.
+        write_qcc : bool, default True
+            Whether to write the QCC input. If False, `qcc_input` is set to
+            None until `set_qcc_inputs` is called.
+        """
+        self._set_center(snap, self.atom_ids)
+        self.orientation = None
+        self.qcc_input = None
+        if write_qcc:
+            if getattr(self, "boundary_bonds", None) is None:
+                self.boundary_bonds = eqcc.get_boundary_bonds(
+                    snap, self.atom_ids
+                )
+            self.qcc_input = eqcc.write_qcc_inp(
+                snap, self.atom_ids, conversion_dict, self.boundary_bonds
+            )
+        self._reset_neighbors()
 
     def get_MO_energy(self):
         """Get the frontier molecular orbital energy for this chromophore.
@@ -185,7 +260,137 @@ class Chromophore:
         return self.homo
 
 
-def get_chromo_ids_smiles(snap, smarts_str, conversion_dict=None):
+def get_chromo_centers(snap, atom_ids_list):
+    """Get the centers of many chromophores at once.
+
+    The positions of all chromophores are unwrapped together and averaged
+    with a single segmented reduction, which is much faster than computing
+    each center separately.
+
+    Parameters
+    ----------
+    snap : gsd.hoomd.Snapshot
+        Atomistic simulation snapshot from a GSD file. It is expected that the
+        lengths in this file have been converted to Angstroms.
+    atom_ids_list : list of numpy.ndarray of int
+        Snapshot indices of the particles in each chromophore.
+
+    Returns
+    -------
+    unwrapped_centers : numpy.ndarray (N, 3)
+        The unwrapped center of each chromophore.
+    images : numpy.ndarray (N, 3) of int
+        The image of each unwrapped center.
+    centers : numpy.ndarray (N, 3)
+        The center of each chromophore wrapped into the box.
+    """
+    box = freud.Box.from_box(snap.configuration.box)
+    lengths = np.array([len(i) for i in atom_ids_list])
+    offsets = np.cumsum(lengths) - lengths
+    atom_ids = np.concatenate(atom_ids_list)
+    unwrapped_pos = box.unwrap(
+        snap.particles.position[atom_ids], snap.particles.image[atom_ids]
+    )
+    unwrapped_centers = (
+        np.add.reduceat(unwrapped_pos, offsets, axis=0) / lengths[:, None]
+    )
+    images = box.get_images(unwrapped_centers)
+    centers = box.wrap(unwrapped_centers)
+    return unwrapped_centers, images, centers
+
+
+def get_chromo_orientations(snap, atom_ids_list):
+    """Get the plane normal vectors of many chromophores at once.
+
+    The best-fit plane of each chromophore is found from the eigenvector with
+    the smallest eigenvalue of the covariance matrix of its unwrapped atom
+    positions. The covariance matrices of all chromophores are built with a
+    single segmented reduction and diagonalized together. The sign of each
+    normal is chosen to point the same way as the normal of the plane through
+    the first three atoms of the chromophore.
+
+    Parameters
+    ----------
+    snap : gsd.hoomd.Snapshot
+        Atomistic simulation snapshot from a GSD file.
+    atom_ids_list : list of numpy.ndarray of int
+        Snapshot indices of the particles in each chromophore. Each chromophore
+        must have at least three particles.
+
+    Returns
+    -------
+    numpy.ndarray (N, 3)
+        The unit normal vector of each chromophore.
+    """
+    box = freud.Box.from_box(snap.configuration.box)
+    lengths = np.array([len(i) for i in atom_ids_list])
+    offsets = np.cumsum(lengths) - lengths
+    atom_ids = np.concatenate(atom_ids_list)
+    positions = box.unwrap(
+        snap.particles.position[atom_ids], snap.particles.image[atom_ids]
+    )
+    segment = np.repeat(np.arange(len(lengths)), lengths)
+    means = np.add.reduceat(positions, offsets, axis=0) / lengths[:, None]
+    diffs = positions - means[segment]
+    covs = np.add.reduceat(
+        diffs[:, :, None] * diffs[:, None, :], offsets, axis=0
+    )
+    # eigh sorts the eigenvalues in ascending order
+    normals = np.linalg.eigh(covs)[1][:, :, 0]
+
+    ref = np.cross(
+        positions[offsets + 1] - positions[offsets],
+        positions[offsets + 2] - positions[offsets],
+    )
+    normals[np.einsum("ij,ij->i", normals, ref) < 0] *= -1
+    return normals
+
+
+def set_qcc_inputs(chromo_list, snap, conversion_dict=None):
+    """Write the QCC inputs of the chromophores which don't have one yet.
+
+    The boundary bonds of all such chromophores are found together using
+    `morphct.execute_qcc.get_boundary_bonds_bulk`.
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores to update. Chromophores whose `qcc_input` is already
+        set are skipped.
+    snap : gsd.hoomd.Snapshot
+        Atomistic simulation snapshot from a GSD file. It is expected that the
+        lengths in this file have been converted to Angstroms.
+    conversion_dict : dictionary, default None
+        A dictionary that maps the atom type to its element. e.g., `{'c3': C}`.
+        If None is given, assume the particles already have element names.
+    """
+    todo = [chromo for chromo in chromo_list if chromo.qcc_input is None]
+    if not todo:
+        return
+
+    no_bonds = [chromo for chromo in todo if chromo.boundary_bonds is None]
+    if no_bonds:
+        boundary_bonds = eqcc.get_boundary_bonds_bulk(
+            snap, [chromo.atom_ids for chromo in no_bonds]
+        )
+        for chromo, bonds in zip(no_bonds, boundary_bonds):
+            chromo.boundary_bonds = bonds
+
+    box = snap.configuration.box[:3]
+    unwrapped_pos = snap.particles.position + snap.particles.image * box
+    for chromo in todo:
+        chromo.qcc_input = eqcc.write_qcc_inp(
+            snap,
+            chromo.atom_ids,
+            conversion_dict,
+            chromo.boundary_bonds,
+            unwrapped_pos
+        )
+
+
+def get_chromo_ids_smiles(
+    snap, smarts_str, conversion_dict=None, by_molecule=False, nprocs=None
+):
     """Get the atom indices in a snapshot associated with a SMARTS string.
 
     This function can be used to determine the atom indices for each
@@ -209,31 +414,116 @@ def get_chromo_ids_smiles(snap, smarts_str, conversion_dict=None):
         An instance that maps AMBER types to their element can be found in
         `amber_dict`. If None is given, assume the particles already have
         element names.
+    by_molecule : bool, default False
+        Whether to split the snapshot into bonded molecules and match each
+        unique molecule topology separately instead of matching the whole
+        snapshot at once. Molecules with identical particle types and bonds are
+        only matched once (using the geometry of the first such molecule) and
+        the matches are mapped onto the others, which is much faster and uses
+        much less memory for large systems.
+    nprocs : int, default None
+        Number of processes passed to multiprocessing.Pool to match the unique
+        molecule topologies in parallel when `by_molecule` is True. This is
+        useful for blends with many distinct molecules. If None is given, the
+        number of cpus is used. No more processes are used than there are
+        unique topologies, and the matches are identical to and in the same
+        order as with one process. The whole snapshot match (`by_molecule`
+        False) runs on one process and can find different chromophores, so
+        giving more than one process without `by_molecule` raises a
+        ValueError.
 
     Returns
     -------
     list of numpy.ndarray of int
-        atom indices of each SMARTS match
+        atom indices of each SMARTS match. If `by_molecule` is True, the
+        matches are ordered by molecule.
 
     Note
     ----
     If no matches are found, a warning is raised and the pybel.Molecule object
-    is returned for debugging.
+    is returned for debugging. If `by_molecule` is True, a list of the
+    pybel.Molecule of each unique molecule topology is returned instead.
     """
+    atomic_nums = _get_atomic_numbers(snap, conversion_dict)
     box = snap.configuration.box[:3]
     unwrapped_positions = snap.particles.position + snap.particles.image * box
+    bonds = np.asarray(snap.bonds.group, dtype=int).reshape(-1, 2)
 
-    mol = openbabel.OBMol()
-    for i, typeid in enumerate(snap.particles.typeid):
-        a = mol.NewAtom()
+    if not by_molecule and nprocs is not None and nprocs > 1:
+        raise ValueError(
+            "Matching in parallel requires by_molecule=True, which can give "
+            "different matches than matching the whole snapshot."
+        )
+
+    if by_molecule:
+        unique = _get_unique_molecules(snap)
+        # Match the first molecule of each topology and map the matches to
+        # the rest
+        args = [
+            (
+                atomic_nums[mols[0][1]],
+                unwrapped_positions[mols[0][1]],
+                local_bonds,
+                smarts_str,
+            )
+            for mols, local_bonds in unique
+        ]
+        if nprocs is None:
+            nprocs = os.cpu_count()
+        nprocs = min(nprocs, len(args))
+        if nprocs > 1:
+            with get_context("spawn").Pool(processes=nprocs) as p:
+                all_matches = p.map(_smarts_worker, args)
+        else:
+            all_matches = [_smarts_worker(arg) for arg in args]
+
+        atom_ids = []
+        for (molecules, _), matches in zip(unique, all_matches):
+            for i, inds in molecules:
+                atom_ids += [(i, inds[match]) for match in matches]
+        atom_ids = [inds for i, inds in sorted(atom_ids, key=lambda x: x[0])]
+    else:
+        pybelmol = _make_pybelmol(atomic_nums, unwrapped_positions, bonds)
+        smarts = pybel.Smarts(smarts_str)
+        # shift indices by 1
+        atom_ids = [np.array(i) - 1 for i in smarts.findall(pybelmol)]
+
+    if not atom_ids:
+        warn(
+            f"No matches found for smarts string {smarts_str}. "
+            + "Please check the returned pybel.Molecule for errors.\n"
+        )
+        if by_molecule:
+            return [_make_pybelmol(*arg[:3]) for arg in args]
+        return pybelmol
+    print(f"Found {len(atom_ids)} chromophores.")
+    return atom_ids
+
+
+def _get_atomic_numbers(snap, conversion_dict=None):
+    """Get the atomic number of each particle in the snapshot."""
+    type_nums = []
+    for ptype in snap.particles.types:
         if conversion_dict is not None:
-            element = conversion_dict[snap.particles.types[typeid]]
+            element = conversion_dict[ptype]
         else:
-            element = element_from_symbol(snap.particles.types[typeid])
-        a.SetAtomicNum(element.atomic_number)
-        a.SetVector(*[float(x) for x in unwrapped_positions[i]])
+            element = element_from_symbol(ptype)
+        type_nums.append(element.atomic_number)
+    return np.array(type_nums, dtype=int)[snap.particles.typeid]
+
+
+def _make_pybelmol(atomic_nums, positions, bonds):
+    """Build a pybel.Molecule with perceived bond orders.
 
-    for i, j in snap.bonds.group:
+    The bonds are the zero-based indices of the bonded atoms.
+    """
+    mol = openbabel.OBMol()
+    for num, xyz in zip(atomic_nums, positions):
+        a = mol.NewAtom()
+        a.SetAtomicNum(int(num))
+        a.SetVector(*[float(x) for x in xyz])
+
+    for i, j in bonds:
         # openbabel indexes atoms from 1
         # AddBond(i_index, j_index, bond_order)
         mol.AddBond(int(i + 1), int(j + 1), 1)
@@ -243,19 +533,57 @@ def get_chromo_ids_smiles(snap, smarts_str, conversion_dict=None):
     mol.PerceiveBondOrders()
     mol.SetAromaticPerceived()
 
-    pybelmol = pybel.Molecule(mol)
+    return pybel.Molecule(mol)
+
 
+def _smarts_worker(arg):
+    """Find the zero-based indices of the SMARTS matches in one molecule."""
+    atomic_nums, positions, bonds, smarts_str = arg
+    pybelmol = _make_pybelmol(atomic_nums, positions, bonds)
     smarts = pybel.Smarts(smarts_str)
     # shift indices by 1
-    atom_ids = [np.array(i) - 1 for i in smarts.findall(pybelmol)]
-    if not atom_ids:
-        warn(
-            f"No matches found for smarts string {smarts_str}. "
-            + "Please check the returned pybel.Molecule for errors.\n"
-        )
-        return pybelmol
-    print(f"Found {len(atom_ids)} chromophores.")
-    return atom_ids
+    return [np.array(i) - 1 for i in smarts.findall(pybelmol)]
+
+
+def _get_unique_molecules(snap):
+    """Group the bonded molecules in the snapshot by their topology.
+
+    Returns
+    -------
+    list of (list of (int, numpy.ndarray), numpy.ndarray)
+        For each unique topology: the molecule index and snapshot particle
+        indices of every molecule with that topology, and the bonds of the
+        topology in molecule-local particle indices.
+    """
+    bonds = np.asarray(snap.bonds.group, dtype=int).reshape(-1, 2)
+    n = snap.particles.N
+    mol_ids = hf.get_bonded_clusters(n, bonds)
+
+    # Particle indices of each molecule in ascending order
+    order = np.argsort(mol_ids, kind="stable")
+    counts = np.bincount(mol_ids)
+    starts = np.cumsum(counts) - counts
+    molecules = np.split(order, starts[1:])
+
+    # Index of each particle within its molecule
+    local_ids = np.empty(n, dtype=int)
+    local_ids[order] = np.arange(n) - np.repeat(starts, counts)
+
+    # Bonds of each molecule in local indices
+    bond_order = np.argsort(mol_ids[bonds[:, 0]], kind="stable")
+    bond_counts = np.bincount(mol_ids[bonds[:, 0]], minlength=len(counts))
+    local_bonds = np.split(
+        local_ids[bonds[bond_order]], np.cumsum(bond_counts)[:-1]
+    )
+
+    typeid = np.asarray(snap.particles.typeid)
+    unique = {}
+    for i, inds in enumerate(molecules):
+        key = (typeid[inds].tobytes(), local_bonds[i].tobytes())
+        if key not in unique:
+            unique[key] = ([], local_bonds[i])
+        unique[key][0].append((i, inds))
+    return list(unique.values())
 
 
 def set_neighbors_voronoi(chromo_list, snap, conversion_dict=None, d_cut=10):
@@ -293,8 +621,9 @@ def set_neighbors_voronoi(chromo_list, snap, conversion_dict=None, d_cut=10):
     voronoi.compute((freudbox, centers))
 
     box = snap.configuration.box[:3]
+    atom_bonds = eqcc.get_atom_bonds(snap)
     qcc_pairs = []
-    neighbors = []
+    neighbors = set()
     for (i, j) in voronoi.nlist:
         if i == j:
             pass
@@ -326,14 +655,66 @@ def set_neighbors_voronoi(chromo_list, snap, conversion_dict=None, d_cut=10):
             chromo_j.neighbors.append([i, -rel_image])
             chromo_j.neighbors_delta_e.append(None)
             chromo_j.neighbors_ti.append(None)
-            neighbors.append((i, j))
+            neighbors.add((i, j))
             qcc_input = eqcc.write_qcc_pair_input(
-                snap, chromo_i, chromo_j, j_shift, conversion_dict
+                snap, chromo_i, chromo_j, j_shift, conversion_dict, atom_bonds
             )
             qcc_pairs.append(((i, j), qcc_input))
     return qcc_pairs
 
 
+def get_neighbor_arrays(chromo_list):
+    """Flatten the neighbor lists of the chromophores into edge arrays.
+
+    Each directed edge (chromophore i to neighbor j) appears once, in the same
+    order as the chromophores and their `neighbors` lists.
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores in the simulation.
+
+    Returns
+    -------
+    i : numpy.ndarray (N_edges,) of int
+        The index of the chromophore.
+    j : numpy.ndarray (N_edges,) of int
+        The index of the neighbor.
+    images : numpy.ndarray (N_edges, 3) of int
+        The relative image of the neighbor.
+    tis : numpy.ndarray (N_edges,)
+        The transfer integral in eV. NaN if it is None or has not been set.
+    delta_es : numpy.ndarray (N_edges,)
+        The frontier orbital energy difference in eV. NaN if it is None or has
+        not been set.
+    """
+    n_neighbors = [len(chromo.neighbors) for chromo in chromo_list]
+    n_edges = sum(n_neighbors)
+    i = np.repeat(np.arange(len(chromo_list)), n_neighbors)
+    j = np.fromiter(
+        (n for chromo in chromo_list for n, _ in chromo.neighbors),
+        dtype=int,
+        count=n_edges,
+    )
+    images = np.array(
+        [img for chromo in chromo_list for _, img in chromo.neighbors],
+        dtype=int,
+    ).reshape(-1, 3)
+
+    def _values(attr):
+        values = []
+        for chromo, n in zip(chromo_list, n_neighbors):
+            vals = getattr(chromo, attr)
+            if len(vals) != n:
+                vals = [None] * n
+            values += vals
+        return np.array(
+            [np.nan if v is None else v for v in values], dtype=float
+        )
+
+    return i, j, images, _values("neighbors_ti"), _values("neighbors_delta_e")
+
+
 conversion_dict = {
     "S1": element_from_symbol("S"),
     "H1": element_from_symbol("H"),
@@ -3,8 +3,6 @@ from multiprocessing import get_context
 
 import ele
 import numpy as np
-import pyscf
-from pyscf.semiempirical import MINDO3
 
 from morphct import helper_functions as hf
 from morphct import transfer_integrals as ti
@@ -13,7 +11,8 @@ from morphct import transfer_integrals as ti
 def get_homolumo(molstr, charge=0, verbose=0, tol=1e-6):
     """Get the HOMO-1, HOMO, LUMO, LUMO+1 energies in eV using MINDO3.
 
-    See https://pyscf.org/quickstart.html for more information.
+    This is the "mindo3" QCC backend (see `get_qcc_backend`). See
+    https://pyscf.org/quickstart.html for more information.
 
     Parameters
     ----------
@@ -34,6 +33,9 @@ def get_homolumo(molstr, charge=0, verbose=0, tol=1e-6):
     numpy.ndarray
         Array containing HOMO-1, HOMO, LUMO, LUMO+1 energies in eV
     """
+    import pyscf
+    from pyscf.semiempirical import MINDO3
+
     mol = pyscf.M(atom=molstr, charge=charge)
     mf = MINDO3(mol).run(verbose=verbose, conv_tol=tol)
     occ = mf.get_occ()
@@ -43,20 +45,122 @@ def get_homolumo(molstr, charge=0, verbose=0, tol=1e-6):
     return energies
 
 
-def singles_homolumo(chromo_list, filename=None, nprocs=None):
+def _parse_qcc_input(molstr):
+    """Get the elements and positions from a QCC input string."""
+    atoms = [atom.split() for atom in molstr.split(";") if atom.strip()]
+    elements = [atom[0] for atom in atoms]
+    positions = np.array([atom[1:4] for atom in atoms], dtype=float)
+    return elements, positions
+
+
+def get_homolumo_surrogate(
+    molstr, charge=0, alpha=-3.5, beta=-2.5, bond_length=1.4, decay=0.5
+):
+    """Get the HOMO-1, HOMO, LUMO, LUMO+1 energies in eV using a Huckel model.
+
+    This is the "surrogate" QCC backend (see `get_qcc_backend`). It is
+    deterministic and takes less than a millisecond per molecule, so the rest
+    of the pipeline can be tested and profiled without quantum chemistry, but
+    the energies are only qualitative.
+
+    Each non-hydrogen atom contributes one orbital with energy `alpha` and one
+    electron, or two for sulfur and oxygen (as in thiophene). The coupling of
+    two atoms a distance d apart is beta * exp(-(d - bond_length) / decay), so
+    bonded atoms are coupled by about `beta` and the coupling between stacked
+    molecules decays with their separation.
+
+    Parameters
+    ----------
+    molstr : str
+        Input string containing elements and positions in Angstroms (e.g., "C
+        0.0 0.0 0.0; H 1.54 0.0 0.0"), as written by `write_qcc_inp`.
+    charge : int, default 0
+        The charge of the molecule, which removes electrons.
+    alpha : float, default -3.5
+        The orbital energy of each atom in eV.
+    beta : float, default -2.5
+        The coupling of bonded atoms in eV.
+    bond_length : float, default 1.4
+        The distance in Angstroms at which the coupling is `beta`.
+    decay : float, default 0.5
+        The decay length of the coupling in Angstroms.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array containing HOMO-1, HOMO, LUMO, LUMO+1 energies in eV
+    """
+    elements, positions = _parse_qcc_input(molstr)
+    heavy = positions[[element != "H" for element in elements]]
+    distances = np.linalg.norm(heavy[:, None] - heavy[None, :], axis=-1)
+    hamiltonian = beta * np.exp(-(distances - bond_length) / decay)
+    np.fill_diagonal(hamiltonian, alpha)
+    energies = np.linalg.eigvalsh(hamiltonian)
+
+    n_electrons = sum(
+        2 if element in ["S", "O"] else 1
+        for element in elements
+        if element != "H"
+    )
+    n_occupied = int(np.ceil((n_electrons - charge) / 2))
+    i_lumo = np.clip(n_occupied, 1, len(energies) - 1)
+    # Repeat the frontier orbitals of very small molecules
+    indices = np.clip(np.arange(i_lumo - 2, i_lumo + 2), 0, len(energies) - 1)
+    return energies[indices]
+
+
+def get_qcc_backend(backend="mindo3"):
+    """Get the function which calculates the frontier orbital energies.
+
+    Parameters
+    ----------
+    backend : str or callable, default "mindo3"
+        "mindo3" (`get_homolumo`, which requires pyscf), "surrogate"
+        (`get_homolumo_surrogate`), or a function with the signature
+        ``f(molstr, charge=0)`` which returns the HOMO-1, HOMO, LUMO, LUMO+1
+        energies in eV. A function must be picklable (e.g., defined at the top
+        level of a module) to be run on several processes.
+
+    Returns
+    -------
+    callable
+        The backend function.
+    """
+    backends = {"mindo3": get_homolumo, "surrogate": get_homolumo_surrogate}
+    if callable(backend):
+        return backend
+    if backend not in backends:
+        raise ValueError(
+            f"Unknown QCC backend {backend}. Use one of {list(backends)} or a "
+            "function."
+        )
+    return backends[backend]
+
+
+def singles_homolumo(
+    chromo_list, filename=None, nprocs=None, cache=None, backend="mindo3"
+):
     """Get the HOMO-1, HOMO, LUMO, LUMO+1 energies for all single chromophores.
 
     Parameters
     ----------
     chromo_list : list of Chromophore
         Chromophores to calculate energies of. Each Chromophore must have
-        qcc_input attribute set.
+        qcc_input attribute set (see `morphct.chromophores.set_qcc_inputs`).
     filename : str, default None
         Path to file where singles energies will be saved. If None, energies
         will not be saved.
     nprocs : int, default None
-        Number of processes passed to multiprocessing.Pool. 
-       
+        Number of processes passed to multiprocessing.Pool. If None is given,
+        the number of cpus is used, except for the "surrogate" backend which
+        is fast enough to run on this process.
+    cache : dict, default None
+        Previously calculated energies keyed by the (qcc_input, charge) of the
+        calculation. Only inputs which are not in the cache are calculated and
+        the new results are added to it. If None is given, every input is
+        calculated. The cache should only hold results of the same backend.
+    backend : str or callable, default "mindo3"
+        How the energies are calculated, see `get_qcc_backend`.
 
     Returns
     -------
@@ -64,19 +168,28 @@ def singles_homolumo(chromo_list, filename=None, nprocs=None):
         Array of energies where each row corresponds to the MO energies of each
         chromophore in the list.
     """
-    if nprocs is None:
-        nprocs = mp.cpu_count()
-    with get_context("spawn").Pool(processes=nprocs) as p:
-        data = p.map(
-            _worker_wrapper, [(i.qcc_input, i.charge) for i in chromo_list]
+    missing = [i.id for i in chromo_list if i.qcc_input is None]
+    if missing:
+        raise ValueError(
+            f"Chromophores {missing[:10]} have no QCC input. Call "
+            "morphct.chromophores.set_qcc_inputs first."
         )
+    args = [(i.qcc_input, i.charge) for i in chromo_list]
+    data = _get_energies(args, nprocs, cache, backend)
 
     data = np.stack(data)
     if filename is not None:
         np.savetxt(filename, data)
     return data
 
-def dimer_homolumo(qcc_pairs, chromo_list, filename=None, nprocs=None):
+def dimer_homolumo(
+    qcc_pairs,
+    chromo_list,
+    filename=None,
+    nprocs=None,
+    cache=None,
+    backend="mindo3",
+    ):
     """Get the HOMO-1, HOMO, LUMO, LUMO+1 energies for all chromophore pairs.
 
     Parameters
@@ -91,8 +204,16 @@ def dimer_homolumo(qcc_pairs, chromo_list, filename=None, nprocs=None):
         Path to file where the pair energies will be saved. If None, energies
         will not be saved.
     nprocs : int, default None
-        Number of processes passed to multiprocessing.Pool.
-        
+        Number of processes passed to multiprocessing.Pool. If None is given,
+        the number of cpus is used, except for the "surrogate" backend which
+        is fast enough to run on this process.
+    cache : dict, default None
+        Previously calculated energies keyed by the (qcc_input, charge) of the
+        calculation. Only inputs which are not in the cache are calculated and
+        the new results are added to it. If None is given, every input is
+        calculated. The cache should only hold results of the same backend.
+    backend : str or callable, default "mindo3"
+        How the energies are calculated, see `get_qcc_backend`.
 
     Returns
     -------
@@ -100,15 +221,11 @@ def dimer_homolumo(qcc_pairs, chromo_list, filename=None, nprocs=None):
         Each list item contains the indices of the pair and an array of its MO
         energies.
     """
-    if nprocs is None:
-        nprocs = mp.cpu_count()
-
-    with get_context("spawn").Pool(processes=nprocs) as p:
-        args = [
-            (qcc_input, chromo_list[i].charge + chromo_list[j].charge)
-            for (i,j), qcc_input in qcc_pairs
-        ]
-        data = p.map(_worker_wrapper, args)
+    args = [
+        (qcc_input, chromo_list[i].charge + chromo_list[j].charge)
+        for (i,j), qcc_input in qcc_pairs
+    ]
+    data = _get_energies(args, nprocs, cache, backend)
 
     dimer_data = [i for i in zip([pair for pair, qcc_input in qcc_pairs], data)]
     if filename is not None:
@@ -120,6 +237,31 @@ def dimer_homolumo(qcc_pairs, chromo_list, filename=None, nprocs=None):
     return dimer_data
 
 
+def _get_energies(args, nprocs=None, cache=None, backend="mindo3"):
+    """Run the calculations for the (qcc_input, charge) args not in cache."""
+    if cache is None:
+        todo = args
+    else:
+        # Identical inputs only need to be calculated once
+        todo = [i for i in dict.fromkeys(args) if i not in cache]
+
+    func = get_qcc_backend(backend)
+    data = []
+    if todo:
+        if nprocs is None:
+            nprocs = 1 if backend == "surrogate" else mp.cpu_count()
+        tasks = [(func, qcc_input, charge) for qcc_input, charge in todo]
+        if nprocs == 1:
+            data = [_worker_wrapper(task) for task in tasks]
+        else:
+            with get_context("spawn").Pool(processes=nprocs) as p:
+                data = p.map(_worker_wrapper, tasks)
+
+    if cache is None:
+        return data
+    cache.update(zip(todo, data))
+    return [cache[i] for i in args]
+
 
 def get_dimerdata(filename):
     """Read in the saved data created by `dimer_homolumo`.
@@ -202,7 +344,132 @@ def set_energyvalues(chromo_list, s_filename, d_filename):
         jchromo.neighbors_ti[jneighborind] = transint
 
 
-def write_qcc_inp(snap, atom_ids, conversion_dict=None):
+def get_boundary_bonds(snap, atom_ids):
+    """Get the bonds connecting a group of particles to the rest of the system.
+
+    These bonds only depend on the topology, so they can be computed once and
+    reused for every frame of a trajectory.
+
+    Parameters
+    ----------
+    snap : gsd.hoomd.Snapshot
+        Atomistic simulation snapshot from a GSD file.
+    atom_ids : numpy.ndarray of int
+        Snapshot indices of the particles in the group.
+
+    Returns
+    -------
+    numpy.ndarray (N, 2) of int
+        Each row contains the index of the particle inside the group followed
+        by the index of the bonded particle outside of the group. Rows are in
+        the order the bonds appear in the snapshot.
+    """
+    bonds = np.asarray(snap.bonds.group).reshape(-1, 2)
+    i_in = np.isin(bonds[:, 0], atom_ids)
+    j_in = np.isin(bonds[:, 1], atom_ids)
+    crossing = i_in != j_in
+    boundary = bonds[crossing]
+    # Flip the bonds where the second particle is the one inside the group
+    flip = j_in[crossing]
+    return np.where(flip[:, None], boundary[:, ::-1], boundary)
+
+
+def get_atom_bonds(snap):
+    """Index the bonds of each particle in a snapshot.
+
+    Parameters
+    ----------
+    snap : gsd.hoomd.Snapshot
+        Atomistic simulation snapshot from a GSD file.
+
+    Returns
+    -------
+    indptr : numpy.ndarray (N_particles + 1,) of int
+        The bonds of particle n are `bond_inds[indptr[n]:indptr[n+1]]`.
+    bond_inds : numpy.ndarray (2 * N_bonds,) of int
+        Indices into `snap.bonds.group`, sorted by particle and then by bond.
+    """
+    bonds = np.asarray(snap.bonds.group, dtype=np.int64).reshape(-1, 2)
+    atoms = bonds.ravel()
+    order = np.argsort(atoms, kind="stable")
+    bond_inds = np.repeat(np.arange(len(bonds)), 2)[order]
+    counts = np.bincount(atoms, minlength=snap.particles.N)
+    indptr = np.concatenate(([0], np.cumsum(counts)))
+    return indptr, bond_inds
+
+
+def get_boundary_bonds_bulk(snap, atom_ids_list):
+    """Get the boundary bonds of many groups of particles at once.
+
+    Equivalent to calling `get_boundary_bonds` for each group, but the bonds
+    are only iterated over once, which is much faster for many groups.
+
+    Parameters
+    ----------
+    snap : gsd.hoomd.Snapshot
+        Atomistic simulation snapshot from a GSD file.
+    atom_ids_list : list of numpy.ndarray of int
+        Snapshot indices of the particles in each group.
+
+    Returns
+    -------
+    list of numpy.ndarray (N, 2) of int
+        The boundary bonds of each group in the same format as
+        `get_boundary_bonds`.
+    """
+    n = snap.particles.N
+    n_groups = len(atom_ids_list)
+    bonds = np.asarray(snap.bonds.group, dtype=np.int64).reshape(-1, 2)
+    lengths = np.array([len(i) for i in atom_ids_list], dtype=np.int64)
+    groups = np.repeat(np.arange(n_groups), lengths)
+    atoms = np.concatenate(atom_ids_list).astype(np.int64)
+    # (group, particle) membership as sorted integer keys
+    keys = np.unique(groups * n + atoms)
+
+    # For each particle, the range of the groups it belongs to
+    order = np.argsort(atoms, kind="stable")
+    atoms = atoms[order]
+    groups = groups[order]
+    starts = np.searchsorted(atoms, np.arange(n), side="left")
+    counts = np.searchsorted(atoms, np.arange(n), side="right") - starts
+
+    boundary_groups = []
+    boundary_inds = []
+    boundary = []
+    for inside, outside in [(0, 1), (1, 0)]:
+        # Expand each bond once per group containing the inside particle
+        n_per_bond = counts[bonds[:, inside]]
+        bond_inds = np.repeat(np.arange(len(bonds)), n_per_bond)
+        offsets = np.arange(len(bond_inds)) - np.repeat(
+            np.cumsum(n_per_bond) - n_per_bond, n_per_bond
+        )
+        bond_groups = groups[
+            np.repeat(starts[bonds[:, inside]], n_per_bond) + offsets
+        ]
+        # Keep the bonds where the outside particle is not in the group
+        out_keys = bond_groups * n + bonds[bond_inds, outside]
+        found = np.searchsorted(keys, out_keys)
+        found[found == len(keys)] = 0
+        crossing = keys[found] != out_keys
+        boundary_groups.append(bond_groups[crossing])
+        boundary_inds.append(bond_inds[crossing])
+        boundary.append(bonds[bond_inds[crossing]][:, [inside, outside]])
+
+    boundary_groups = np.concatenate(boundary_groups)
+    # Order by group, then by bond index to match get_boundary_bonds
+    order = np.lexsort((np.concatenate(boundary_inds), boundary_groups))
+    boundary = np.concatenate(boundary)[order]
+    splits = np.cumsum(np.bincount(boundary_groups, minlength=n_groups))[:-1]
+    return np.split(boundary, splits)
+
+
+def write_qcc_inp(
+    snap,
+    atom_ids,
+    conversion_dict=None,
+    boundary_bonds=None,
+    unwrapped_pos=None,
+):
     """Write a quantum chemical input string.
 
     Input string for pySCF containing elements and positions in Angstroms
@@ -221,6 +488,13 @@ def write_qcc_inp(snap, atom_ids, conversion_dict=None):
         An instance that maps AMBER types to their element can be found in
         `amber_dict`. If None is given, assume the particles already have
         element names.
+    boundary_bonds : numpy.ndarray (N, 2) of int, default None
+        The bonds connecting the particles to the rest of the system, as
+        returned by `get_boundary_bonds`. If None is given, they will be
+        computed from the snapshot.
+    unwrapped_pos : numpy.ndarray (N, 3), default None
+        The unwrapped positions of all particles in the snapshot. If None is
+        given, they will be computed from the snapshot.
 
     Returns
     -------
@@ -230,8 +504,9 @@ def write_qcc_inp(snap, atom_ids, conversion_dict=None):
     atoms = []
     positions = []
 
-    box = snap.configuration.box[:3]
-    unwrapped_pos = snap.particles.position + snap.particles.image * box
+    if unwrapped_pos is None:
+        box = snap.configuration.box[:3]
+        unwrapped_pos = snap.particles.position + snap.particles.image * box
 
     for i in atom_ids:
         if conversion_dict is not None:
@@ -247,51 +522,31 @@ def write_qcc_inp(snap, atom_ids, conversion_dict=None):
 
     # To determine where to add hydrogens, check the bonds that go to
     # particles outside of the ids provided
-    for i, j in snap.bonds.group:
-        if i in atom_ids and j not in atom_ids:
-            if conversion_dict is not None:
-                element = conversion_dict[
-                    snap.particles.types[snap.particles.typeid[j]]
-                ]
-            else:
-                element = ele.element_from_symbol(
-                    snap.particles.types[snap.particles.typeid[j]]
-                )
-            # If it's already a Hydrogen, just add it
-            if element.atomic_number == 1:
-                atoms.append(element.symbol)
-                positions.append(unwrapped_pos[j])
-            # If it's not a hydrogen, use the existing bond vector to
-            # determine the direction and scale it to a more reasonable
-            # length for C-H bond
-            else:
-                # Average sp3 C-H bond is 1.094 Angstrom
-                v = unwrapped_pos[j] - unwrapped_pos[i]
-                unit_vec = v / np.linalg.norm(v)
-                new_pos = unit_vec * 1.094 + unwrapped_pos[i]
-                atoms.append("H")
-                positions.append(new_pos)
-
-        # Same as above but j->i instead of i->j
-        elif j in atom_ids and i not in atom_ids:
-            if conversion_dict is not None:
-                element = conversion_dict[
-                    snap.particles.types[snap.particles.typeid[i]]
-                ]
-            else:
-                element = ele.element_from_symbol(
-                    snap.particles.types[snap.particles.typeid[i]]
-                )
-            if element.atomic_number == 1:
-                atoms.append(element.symbol)
-                positions.append(unwrapped_pos[i])
-
-            else:
-                v = unwrapped_pos[i] - unwrapped_pos[j]
-                unit_vec = v / np.linalg.norm(v)
-                new_pos = unit_vec * 1.094 + unwrapped_pos[j]
-                atoms.append("H")
-                positions.append(new_pos)
+    if boundary_bonds is None:
+        boundary_bonds = get_boundary_bonds(snap, atom_ids)
+    for i, j in boundary_bonds:
+        if conversion_dict is not None:
+            element = conversion_dict[
+                snap.particles.types[snap.particles.typeid[j]]
+            ]
+        else:
+            element = ele.element_from_symbol(
+                snap.particles.types[snap.particles.typeid[j]]
+            )
+        # If it's already a Hydrogen, just add it
+        if element.atomic_number == 1:
+            atoms.append(element.symbol)
+            positions.append(unwrapped_pos[j])
+        # If it's not a hydrogen, use the existing bond vector to
+        # determine the direction and scale it to a more reasonable
+        # length for C-H bond
+        else:
+            # Average sp3 C-H bond is 1.094 Angstrom
+            v = unwrapped_pos[j] - unwrapped_pos[i]
+            unit_vec = v / np.linalg.norm(v)
+            new_pos = unit_vec * 1.094 + unwrapped_pos[i]
+            atoms.append("H")
+            positions.append(new_pos)
 
     # Shift center to origin
     positions = np.stack(positions)
@@ -303,7 +558,7 @@ def write_qcc_inp(snap, atom_ids, conversion_dict=None):
 
 
 def write_qcc_pair_input(
-    snap, chromo_i, chromo_j, j_shift, conversion_dict=None
+    snap, chromo_i, chromo_j, j_shift, conversion_dict=None, atom_bonds=None
     ):
     """Write a quantum chemical input string for chromophore pairs.
 
@@ -329,6 +584,10 @@ def write_qcc_pair_input(
         An instance that maps AMBER types to their element can be found in
         `amber_dict`. If None is given, assume the particles already have
         element names.
+    atom_bonds : tuple of numpy.ndarray, default None
+        The output of `get_atom_bonds` for this snapshot. Pass it when writing
+        many pairs so the bonds are only indexed once. If None is given, it is
+        computed here.
 
     Returns
     -------
@@ -336,16 +595,35 @@ def write_qcc_pair_input(
         The input for the MINDO3 quantum chemical calculation run in pySCF.
     """
     box = snap.configuration.box[:3]
-    unwrapped_pos = snap.particles.position + snap.particles.image * box
+    atom_ids = np.concatenate((chromo_i.atom_ids, chromo_j.atom_ids))
+
+    # Only the bonds of the pair's particles can go to particles outside of
+    # the ids provided, kept in snapshot order
+    if atom_bonds is None:
+        atom_bonds = get_atom_bonds(snap)
+    indptr, bond_inds = atom_bonds
+    pair_bonds = np.unique(
+        np.concatenate([bond_inds[indptr[n]:indptr[n+1]] for n in atom_ids])
+    )
+    pair_bonds = np.asarray(snap.bonds.group).reshape(-1, 2)[pair_bonds]
+
+    # Unwrap only the particles used here, not the whole snapshot
+    needed = np.unique(np.concatenate((atom_ids, pair_bonds.ravel())))
+    unwrapped_pos = dict(
+        zip(
+            needed,
+            snap.particles.position[needed]
+            + snap.particles.image[needed] * box
+        )
+    )
 
     # chromophore i is shifted into 0,0,0 image
     positions = [
-        i + chromo_i.image * box for i in unwrapped_pos[chromo_i.atom_ids]
+        unwrapped_pos[i] + chromo_i.image * box for i in chromo_i.atom_ids
     ]
     # shift chromophore j's unwrapped positions
-    positions += [i for i in unwrapped_pos[chromo_j.atom_ids] + j_shift]
+    positions += [unwrapped_pos[i] + j_shift for i in chromo_j.atom_ids]
 
-    atom_ids = np.concatenate((chromo_i.atom_ids, chromo_j.atom_ids))
     typeids = snap.particles.typeid[atom_ids]
     if conversion_dict is not None:
         atoms = [
@@ -358,7 +636,7 @@ def write_qcc_pair_input(
 
     # To determine where to add hydrogens, check the bonds that go to
     # particles outside of the ids provided
-    for i, j in snap.bonds.group:
+    for i, j in pair_bonds:
         if i in atom_ids and j not in atom_ids:
             # If bond is to chromophore j, additional shifting might be needed
             if i in chromo_j.atom_ids:
@@ -424,5 +702,5 @@ def write_qcc_pair_input(
 
 
 def _worker_wrapper(arg):
-    qcc_input, charge = arg
-    return get_homolumo(qcc_input, charge=charge)
+    func, qcc_input, charge = arg
+    return func(qcc_input, charge=charge)
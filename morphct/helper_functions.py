@@ -1,6 +1,8 @@
 import itertools
 
 import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 
 
 # UNIVERSAL CONSTANTS, DO NOT CHANGE!
@@ -33,6 +35,33 @@ def box_points(box):
     return box_pts
 
 
+def get_bonded_clusters(n_particles, bonds):
+    """Find the index of the bonded cluster (molecule) of each particle.
+
+    Clusters are the connected components of the bond graph, numbered in order
+    of their lowest particle index.
+
+    Parameters
+    ----------
+    n_particles : int
+        The number of particles.
+    bonds : numpy.ndarray (N_bonds, 2) of int
+        The particle indices of each bond.
+
+    Returns
+    -------
+    numpy.ndarray (n_particles,) of int
+        The cluster index of each particle.
+    """
+    bonds = np.asarray(bonds, dtype=int).reshape(-1, 2)
+    graph = coo_matrix(
+        (np.ones(len(bonds), dtype=bool), (bonds[:, 0], bonds[:, 1])),
+        shape=(n_particles, n_particles),
+    )
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+
 def v_print(string, verbosity, v_level=0, filename=None):  # pragma: no cover
     """Print based on verbosity level.
 
@@ -58,6 +87,98 @@ def v_print(string, verbosity, v_level=0, filename=None):  # pragma: no cover
                 f.write(f"{string}\n")
 
 
+class Logger:
+    """A buffered logger for one process.
+
+    Unlike `v_print`, which opens the file on every call, lines are kept in a
+    buffer and written together. The verbosity is checked before a message is
+    formatted, so disabled diagnostics cost almost nothing, e.g.
+
+    >>> logger = Logger(verbose, filename="kmc_00.log")
+    >>> logger.log("Hopping to {}", n_ind, v_level=1)
+    >>> logger.close()
+
+    Parameters
+    ----------
+    verbosity : int
+        The current verbosity level.
+    filename : path, default None
+        Path to a file to which the lines are appended. If None is given, the
+        lines are printed to stdout without buffering.
+    buffer_size : int, default 1000
+        The number of lines kept before they are written to the file.
+
+    Methods
+    -------
+    enabled(v_level=0)
+    log(message, *args, v_level=0)
+    flush()
+    close()
+    """
+    def __init__(self, verbosity, filename=None, buffer_size=1000):
+        self.verbosity = verbosity
+        self.filename = filename
+        self.buffer_size = buffer_size
+        self._lines = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def enabled(self, v_level=0):
+        """Whether a message at `v_level` would be logged.
+
+        Use this to skip building expensive messages.
+
+        Parameters
+        ----------
+        v_level : int, default 0
+            The level above which messages are logged.
+
+        Returns
+        -------
+        bool
+        """
+        return self.verbosity > v_level
+
+    def log(self, message, *args, v_level=0):
+        """Log a message if the verbosity is greater than `v_level`.
+
+        Parameters
+        ----------
+        message : str
+            The message. If `args` are given, it is formatted with
+            `message.format(*args)` only if it is logged.
+        *args
+            Arguments used to format the message.
+        v_level : int, default 0
+            The level above which the message is logged.
+        """
+        if self.verbosity <= v_level:
+            return
+        if args:
+            message = message.format(*args)
+        if self.filename is None:
+            print(message)
+            return
+        self._lines.append(message)
+        if len(self._lines) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered lines to the file."""
+        if self._lines:
+            with open(self.filename, "a") as f:
+                f.write("\n".join(self._lines) + "\n")
+            self._lines = []
+
+    def close(self):
+        """Write any buffered lines. The logger can still be used after."""
+        self.flush()
+
+
 def time_units(elapsed_time, precision=2):
     """Convert elapsed time in seconds to its largest unit.
 
@@ -142,6 +263,8 @@ def get_hop_rate(
 ):
     """Get the hopping rate.
 
+    This is the scalar version of `get_hop_rates`.
+
     Parameters
     ----------
     lambd : float
@@ -158,9 +281,10 @@ def get_hop_rate(
     use_vrh : bool, default False
         Whether to use variable-range hopping.
     rij : float, default 0.0
-        The distance between the chromophores in Angstroms. (only used with VRH)
+        The distance between the chromophores. (only used with VRH)
     vrh : float, default 1.0
-        A cutoff distance in Angstroms. (only used with VRH)
+        The variable-range hopping delocalization length in the same units as
+        `rij`. (only used with VRH)
     boltz : bool, default False
         Whether to apply a simple Boltzmann energy penalty.
 
@@ -169,31 +293,111 @@ def get_hop_rate(
     float
         The hopping rate in inverse seconds.
     """
+    return float(
+        get_hop_rates(
+            lambd,
+            ti,
+            delta_e,
+            prefactor,
+            temp,
+            use_vrh=use_vrh,
+            rij=rij,
+            vrh=vrh,
+            boltz=boltz,
+        )
+    )
+
+
+def get_hop_rates(
+    lambd,
+    ti,
+    delta_e,
+    prefactor,
+    temp,
+    use_vrh=False,
+    rij=0.0,
+    vrh=1.0,
+    boltz=False,
+):
+    """Get the hopping rates of many hops at once.
+
+    All of the array arguments are broadcast together, so e.g. the rates of
+    every neighbor pair can be computed in one call.
+
+    Parameters
+    ----------
+    lambd : float or numpy.ndarray
+        The reorganization energy in eV.
+    ti : float or numpy.ndarray
+        The transfer integral between the chromophores in eV.
+    delta_e : float or numpy.ndarray
+        The energy difference between the frontier orbitals of the chromophores
+        in eV.
+    prefactor : float or numpy.ndarray
+        A prefactor to the rate equation.
+    temp : float or numpy.ndarray
+        The temperature in Kelvin.
+    use_vrh : bool, default False
+        Whether to use variable-range hopping.
+    rij : float or numpy.ndarray, default 0.0
+        The distance between the chromophores. (only used with VRH)
+    vrh : float or numpy.ndarray, default 1.0
+        The variable-range hopping delocalization length in the same units as
+        `rij`. (only used with VRH)
+    boltz : bool, default False
+        Whether to apply a simple Boltzmann energy penalty.
+
+    Returns
+    -------
+    numpy.ndarray
+        The hopping rates in inverse seconds. Hops with a transfer integral of
+        zero have a rate of zero.
+    """
     # Based on the input parameters, can make this the semiclassical Marcus
     # Hopping Rate Equation, or a more generic Miller Abrahams-based hop
-    # Firstly, to prevent divide-by-zero errors:
-    if ti == 0.0:
-        return 0
     # Regardless of hopping type, sort out the prefactor first:
-    lambd *= elem_chrg
-    ti *= elem_chrg
-    delta_e *= elem_chrg
+    lambd = np.asarray(lambd, dtype=float) * elem_chrg
+    ti = np.asarray(ti, dtype=float) * elem_chrg
+    delta_e = np.asarray(delta_e, dtype=float) * elem_chrg
 
     k = prefactor * (2 * np.pi / hbar) * (ti ** 2)
-    k *= np.sqrt(1 / (4 * lambd * np.pi * k_B * temp))
+    k = k * np.sqrt(1 / (4 * lambd * np.pi * k_B * temp))
 
     # VRH?
     if use_vrh is True:
-        k *= np.exp(-rij / vrh)
+        k = k * np.exp(-np.asarray(rij) / vrh)
     # Simple Boltzmann energy penalty?
     if boltz is True:
-        # Only apply the penalty if delta_e is positive
-        if delta_e > 0.0:
-            k *= np.exp(-delta_e / (k_B * temp))
-        # Otherwise, k *= 1
+        # Only apply the penalty if delta_e is positive, otherwise k *= 1
+        k = k * np.where(
+            delta_e > 0.0, np.exp(-np.abs(delta_e) / (k_B * temp)), 1.0
+        )
     else:
-        k *= np.exp(-((delta_e + lambd) ** 2) / (4 * lambd * k_B * temp))
-    return k
+        k = k * np.exp(-((delta_e + lambd) ** 2) / (4 * lambd * k_B * temp))
+    # Hops without a transfer integral never happen
+    return np.where(ti == 0.0, 0.0, k)
+
+
+def msd_slope_to_mobility(slope, temp):
+    """Convert the slope of the MSD against time into a mobility.
+
+    The diffusion coefficient is D = slope / 6 in three dimensions (Carbone and
+    Troisi) and the mobility is given by the Einstein-Smoluchowski relation.
+
+    Parameters
+    ----------
+    slope : float or numpy.ndarray
+        The slope of the mean squared displacement in meters^2 against time in
+        seconds.
+    temp : float
+        The temperature in Kelvin.
+
+    Returns
+    -------
+    float or numpy.ndarray
+        The mobility in centimeters^2/(Volt second).
+    """
+    return elem_chrg * slope / (6 * k_B * temp) * 100 ** 2
 
 
 def get_event_tau(
@@ -261,6 +465,35 @@ def get_event_tau(
     return tau
 
 
+def get_event_taus(rates):
+    """Get the times of many events at once.
+
+    The random numbers are drawn in the same order as calling `get_event_tau`
+    on each rate in turn, so the two give the same times for the same seed.
+
+    Parameters
+    ----------
+    rates : numpy.ndarray
+        The rates in inverse seconds.
+
+    Returns
+    -------
+    numpy.ndarray
+        The time in seconds each event would take given its rate. Events with
+        a rate of zero take 1e99 seconds.
+    """
+    rates = np.asarray(rates, dtype=float)
+    taus = np.full(rates.shape, 1e99)
+    nonzero = rates != 0
+    x = np.random.random(np.count_nonzero(nonzero))
+    # Ensure that we don't get exactly 0.0, which would break our logarithm
+    for i in np.flatnonzero(x == 0):
+        while x[i] == 0:
+            x[i] = np.random.random()
+    taus[nonzero] = -np.log(x) / rates[nonzero]
+    return taus
+
+
 def find_axis(atom1, atom2, normalize=True):
     """Find normalized vector from atom1 to atom2."""
     sep = atom2 - atom1
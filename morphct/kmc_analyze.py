@@ -1,7 +1,9 @@
 from collections import defaultdict
 import csv
 import itertools
+from multiprocessing import get_context
 import os
+from types import SimpleNamespace
 
 import freud
 import numpy as np
@@ -12,11 +14,16 @@ from scipy.sparse import lil_matrix
 from scipy.stats import linregress
 
 from morphct import helper_functions as hf
-from morphct.mobility_kmc import get_molecule_ids
+from morphct.chromophores import get_chromo_orientations, get_neighbor_arrays
+from morphct.mobility_kmc import (
+    get_molecule_ids, get_rate_table, get_valid_carriers
+)
 
 
 plt = None
 p3 = None
+# Resolution of the saved figures, set by `render`
+dpi = 300
 
 
 def split_carriers(combined_data):
@@ -47,6 +54,51 @@ def split_carriers(combined_data):
     return hole_data, elec_data
 
 
+def _group_lifetimes(carrier_data):
+    """Group the carriers by their lifetime.
+
+    Carriers whose final time is more than double (or less than half of) their
+    lifetime, or which only hopped once, are discarded.
+
+    Parameters
+    ----------
+    carrier_data : dict
+        The data for one carrier type.
+
+    Returns
+    -------
+    lifetimes : numpy.ndarray (N_lifetimes,)
+        The unique lifetimes in seconds, in the order they first appear.
+    groups : numpy.ndarray (N_kept,) of int
+        The index in `lifetimes` of each kept carrier.
+    squared_disps : numpy.ndarray (N_kept,)
+        The squared displacement of each kept carrier in meters^2.
+    times : numpy.ndarray (N_kept,)
+        The final time of each kept carrier in seconds.
+    n_discarded : int
+        The number of discarded carriers.
+    """
+    lts = np.asarray(carrier_data["lifetime"], dtype=float)
+    current = np.asarray(carrier_data["current_time"], dtype=float)
+    n_hops = np.asarray(carrier_data["n_hops"])
+    disps = np.asarray(carrier_data["displacement"], dtype=float)
+
+    keep = get_valid_carriers(lts, current, n_hops)
+    lifetimes, first, inverse = np.unique(
+        lts[keep], return_index=True, return_inverse=True
+    )
+    # Keep the lifetimes in the order they first appear
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    # A -> m
+    squared_disps = (disps[keep] * 1e-10) ** 2
+    n_discarded = len(lts) - np.count_nonzero(keep)
+    return lifetimes[order], rank[inverse], squared_disps, current[keep], (
+        n_discarded
+    )
+
+
 def get_times_msds(carrier_data):
     """Get the lifetimes and mean squared displacements of the carriers.
 
@@ -61,38 +113,305 @@ def get_times_msds(carrier_data):
         The carrier lifetimes in seconds, the mean squared displacement in
         meters, and the standard errors of these values, respectively.
     """
-    total = 0
-    total_averaged = 0
-    squared_disps = defaultdict(list)
-    actual_times = defaultdict(list)
-    for i, displacement in enumerate(carrier_data["displacement"]):
-        current = carrier_data["current_time"][i]
-        lt = carrier_data["lifetime"][i]
-        n_hops = carrier_data["n_hops"][i]
-        if current > lt * 2 or current < lt / 2 or n_hops == 1:
-            total += 1
-            continue
-        # A -> m
-        squared_disps[lt] += [(carrier_data["displacement"][i] * 1e-10) ** 2]
-        actual_times[lt] += [current]
-
-        # Also keep track of whether each carrier is a hole or an electron
-        total_averaged += 1
-        total += 1
-    if total > total_averaged:
-        print(f"\tNotice: The data from {total - total_averaged} carriers were")
+    lts, groups, squared_disps, times, n_discarded = _group_lifetimes(
+        carrier_data
+    )
+    if n_discarded:
+        print(f"\tNotice: The data from {n_discarded} carriers were")
         print("\tdiscarded due to the carrier lifetime being more than double")
         print("\t(or less than half of) the specified carrier lifetime.")
-    times = []
-    msds = []
-    time_stderr = []
-    msd_stderr = []
-    for lt, disps in squared_disps.items():
-        times.append(lt)
-        time_stderr.append(np.std(actual_times[lt]) / len(actual_times[lt]))
-        msds.append(np.average(disps))
-        msd_stderr.append(np.std(disps) / len(disps))
-    return times, msds, time_stderr, msd_stderr
+
+    counts = np.bincount(groups, minlength=len(lts))
+
+    def _mean_std(values):
+        mean = np.bincount(groups, values, minlength=len(lts)) / counts
+        var = np.bincount(
+            groups, (values - mean[groups]) ** 2, minlength=len(lts)
+        )
+        return mean, np.sqrt(var / counts)
+
+    _, time_std = _mean_std(times)
+    msds, msd_std = _mean_std(squared_disps)
+    return (
+        lts.tolist(),
+        msds.tolist(),
+        (time_std / counts).tolist(),
+        (msd_std / counts).tolist(),
+    )
+
+
+def _checkpoint_squared_disps(carrier_data):
+    """Get the squared displacements of the carriers at each checkpoint.
+
+    Parameters
+    ----------
+    carrier_data : dict
+        The data for one carrier type, from a run with checkpoints (see
+        `morphct.mobility_kmc.run_kmc`).
+
+    Returns
+    -------
+    times : numpy.ndarray (N_checkpoints,)
+        The checkpoint times in seconds.
+    squared_disps : numpy.ndarray (N_carriers, N_checkpoints)
+        The squared displacement of each carrier at each checkpoint in
+        meters^2, NaN if the checkpoint was not reached.
+    """
+    times = np.asarray(carrier_data["checkpoint_times"][0], dtype=float)
+    positions = np.stack(carrier_data["checkpoint_positions"])
+    initial = np.asarray(carrier_data["initial_position"], dtype=float)
+    disps = positions - initial[:, np.newaxis, :]
+    # A -> m
+    return times, np.sum(disps ** 2, axis=2) * 1e-20
+
+
+def get_checkpoint_msds(carrier_data):
+    """Get the mean squared displacements of the carriers at each checkpoint.
+
+    Every carrier contributes to the MSD at each checkpoint it reached, so the
+    MSDs at different times are correlated. Use `get_mobility_error` to
+    estimate the error of the mobility from whole trajectories.
+
+    Parameters
+    ----------
+    carrier_data : dict
+        The data for one carrier type, from a run with checkpoints (see
+        `morphct.mobility_kmc.run_kmc`).
+
+    Returns
+    -------
+    list, list, list, list
+        The checkpoint times in seconds, the mean squared displacement in
+        meters, and the standard errors of these values, respectively. The
+        error of each MSD is the standard error of the mean over the carriers
+        which reached the checkpoint (NaN if there is only one). Checkpoints
+        which no carrier reached are omitted and the checkpoint times have no
+        error.
+    """
+    times, squared_disps = _checkpoint_squared_disps(carrier_data)
+    counts = np.count_nonzero(np.isfinite(squared_disps), axis=0)
+    reached = counts > 0
+    times = times[reached]
+    squared_disps = squared_disps[:, reached]
+    counts = counts[reached]
+    msds = np.nanmean(squared_disps, axis=0)
+    deviations = np.where(
+        np.isfinite(squared_disps), squared_disps - msds, 0
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = np.sum(deviations ** 2, axis=0) / (counts - 1)
+        msd_stderr = np.where(counts > 1, np.sqrt(variance / counts), np.nan)
+    return (
+        times.tolist(),
+        msds.tolist(),
+        np.zeros_like(times).tolist(),
+        msd_stderr.tolist(),
+    )
+
+
+def _checkpoint_slope_error(carrier_data, method, n_resamples, seed):
+    """Get the standard error of the MSD slope by resampling trajectories.
+
+    See `get_mobility_error` for the parameters.
+    """
+    times, squared_disps = _checkpoint_squared_disps(carrier_data)
+    reached = np.isfinite(squared_disps)
+    keep = np.any(reached, axis=0)
+    times = times[keep]
+    if len(times) < 2:
+        raise ValueError("At least two checkpoints are needed to fit the MSD.")
+    reached = reached[:, keep].astype(float)
+    values = np.where(reached, squared_disps[:, keep], 0)
+
+    sums = values.sum(axis=0)
+    counts = reached.sum(axis=0)
+    centered = times - times.mean()
+    weights = centered / np.sum(centered ** 2)
+
+    if method == "jackknife":
+        if np.any(counts < 2):
+            raise ValueError(
+                "The jackknife needs at least two carriers per checkpoint."
+            )
+        # Leave out each whole trajectory
+        slopes = ((sums - values) / (counts - reached)) @ weights
+        n = len(slopes)
+        slope_err = np.sqrt(
+            (n - 1) / n * np.sum((slopes - slopes.mean()) ** 2)
+        )
+    elif method == "bootstrap":
+        rng = np.random.default_rng(seed)
+        n = len(values)
+        slopes = np.empty(n_resamples)
+        # Draw how many times each trajectory is resampled in chunks to bound
+        # the memory
+        chunk = max(1, int(1e7) // n)
+        for start in range(0, n_resamples, chunk):
+            stop = min(start + chunk, n_resamples)
+            draws = rng.multinomial(n, np.full(n, 1 / n), size=stop - start)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                boot_means = (draws @ values) / (draws @ reached)
+            slopes[start:stop] = boot_means @ weights
+        slope_err = np.nanstd(slopes, ddof=1)
+    else:
+        raise ValueError(
+            f"Unknown method {method}. Use 'bootstrap' or 'jackknife'."
+        )
+    return slope_err
+
+
+def _has_checkpoints(carrier_data):
+    """Check whether the carrier data is from a run with checkpoints."""
+    checkpoint_times = carrier_data.get("checkpoint_times")
+    return checkpoint_times is not None and checkpoint_times[0] is not None
+
+
+def get_mobility_error(
+    carrier_data, temp, method="bootstrap", n_resamples=1000, seed=None
+):
+    """Estimate the standard error of the mobility by resampling the carriers.
+
+    The mobility is proportional to the slope of the linear fit of the MSD
+    against the lifetime (see `calc_mobility`), and the slope is a weighted
+    sum of the MSD of each lifetime. The carriers are resampled within each
+    lifetime and the spread of the resulting mobilities is used as the error.
+
+    With "bootstrap", `n_resamples` resamples (with replacement) are drawn as
+    batched index arrays. With "jackknife", every leave-one-carrier-out
+    estimate is computed in closed form from the per-lifetime sums.
+
+    For a run with checkpoints, whole carrier trajectories are resampled
+    instead, which accounts for the correlation between the MSDs at different
+    checkpoint times.
+
+    Parameters
+    ----------
+    carrier_data : dict
+        The data for one carrier type.
+    temp : float
+        Simulation temperature in Kelvin.
+    method : str, default "bootstrap"
+        The resampling method, "bootstrap" or "jackknife".
+    n_resamples : int, default 1000
+        The number of bootstrap resamples.
+    seed : int, default None
+        A seed for the bootstrap resampling.
+
+    Returns
+    -------
+    float
+        The standard error of the mobility in centimeters^2/(Volt second).
+    """
+    if _has_checkpoints(carrier_data):
+        slope_err = _checkpoint_slope_error(
+            carrier_data, method, n_resamples, seed
+        )
+        return hf.msd_slope_to_mobility(slope_err, temp)
+
+    lts, groups, squared_disps, _, _ = _group_lifetimes(carrier_data)
+    if len(lts) < 2:
+        raise ValueError("At least two lifetimes are needed to fit the MSD.")
+
+    counts = np.bincount(groups, minlength=len(lts))
+    means = np.bincount(groups, squared_disps, minlength=len(lts)) / counts
+    # slope = sum(weights * msds) is the least-squares slope
+    centered = lts - lts.mean()
+    weights = centered / np.sum(centered ** 2)
+
+    if method == "jackknife":
+        if np.any(counts < 2):
+            raise ValueError(
+                "The jackknife needs at least two carriers per lifetime."
+            )
+        sums = means * counts
+        loo_means = (sums[groups] - squared_disps) / (counts[groups] - 1)
+        slopes = np.sum(weights * means) + weights[groups] * (
+            loo_means - means[groups]
+        )
+        n = len(slopes)
+        slope_err = np.sqrt(
+            (n - 1) / n * np.sum((slopes - slopes.mean()) ** 2)
+        )
+    elif method == "bootstrap":
+        rng = np.random.default_rng(seed)
+        boot_means = np.empty((n_resamples, len(lts)))
+        for i_lt in range(len(lts)):
+            disps = squared_disps[groups == i_lt]
+            # Draw the resamples in chunks to bound the size of the indices
+            chunk = max(1, int(1e7) // len(disps))
+            for start in range(0, n_resamples, chunk):
+                stop = min(start + chunk, n_resamples)
+                size = (stop - start, len(disps))
+                inds = rng.integers(0, len(disps), size=size)
+                boot_means[start:stop, i_lt] = disps[inds].mean(axis=1)
+        slope_err = np.std(boot_means @ weights, ddof=1)
+    else:
+        raise ValueError(
+            f"Unknown method {method}. Use 'bootstrap' or 'jackknife'."
+        )
+    return hf.msd_slope_to_mobility(slope_err, temp)
+
+
+def _get_field(carrier_data):
+    """Get the applied field of the carriers, or None if there was none."""
+    fields = carrier_data.get("field")
+    if fields is None or fields[0] is None:
+        return None
+    return np.asarray(fields[0], dtype=float)
+
+
+def get_drift_mobility(carrier_data, field):
+    """Get the mobility from the drift of the carriers along a field.
+
+    The drift velocity is the total displacement of the carriers along the
+    field (against it for electrons) divided by their total time, and its
+    error is the standard error of this ratio estimate.
+
+    Parameters
+    ----------
+    carrier_data : dict
+        The data for one carrier type, from a run with the applied `field`.
+    field : numpy.ndarray, shape (3,)
+        The applied electric field in Volts/meter.
+
+    Returns
+    -------
+    mobility, mob_error : float, float
+        The drift mobility and its standard error in centimeters^2/(Volt
+        second).
+    velocity : numpy.ndarray (3,)
+        The drift velocity of the carriers in meters/second, signed so that
+        it is along the field for positive mobility.
+    """
+    field = np.asarray(field, dtype=float)
+    strength = np.linalg.norm(field)
+    box = np.asarray(carrier_data["box"], dtype=float)
+    # A -> m
+    disps = 1e-10 * (
+        np.asarray(carrier_data["current_position"], dtype=float)
+        + np.asarray(carrier_data["image"]) * box
+        - np.asarray(carrier_data["initial_position"], dtype=float)
+    )
+    # Electrons drift against the field
+    charge = np.where(np.array(carrier_data["c_type"]) == "electron", -1, 1)
+    disps = charge[:, np.newaxis] * disps
+    # The carriers stay on their last chromophore until the end of their
+    # lifetime, unless they were stopped by the hop limit
+    times = np.where(
+        [limit is None for limit in carrier_data["hop_limit"]],
+        carrier_data["lifetime"],
+        carrier_data["current_time"],
+    ).astype(float)
+
+    velocity = disps.sum(axis=0) / times.sum()
+    along = disps @ (field / strength)
+    residuals = along - (velocity @ field / strength) * times
+    n = len(times)
+    velocity_err = np.sqrt(np.sum(residuals ** 2) / (n - 1) / n) / times.mean()
+    # m^2/(V s) -> cm^2/(V s)
+    mobility = velocity @ field / strength ** 2 * 1e4
+    mob_error = velocity_err / strength * 1e4
+    return mobility, mob_error, velocity
 
 
 def plot_displacement_dist(carrier_data, c_type, path):  # pragma: no cover
@@ -113,7 +432,7 @@ def plot_displacement_dist(carrier_data, c_type, path):  # pragma: no cover
     plt.ylabel("Frequency (Arb. U.)")
     filename = f"{c_type}_displacement_dist.png"
     filepath = os.path.join(path, filename)
-    plt.savefig(filepath, dpi=300)
+    plt.savefig(filepath, dpi=dpi)
     print(f"\tFigure saved as {filename}")
     plt.close()
 
@@ -147,7 +466,7 @@ def plot_cluster_size_dist(clusters, path):  # pragma: no cover
             plt.ylabel("Frequency (Arb. U.)")
             filename = f"{species[i]}_cluster_dist.png"
             filepath = os.path.join(path, filename)
-            plt.savefig(filepath, dpi=300)
+            plt.savefig(filepath, dpi=dpi)
             print(f"\tFigure saved as {filename}")
             plt.close()
 
@@ -167,44 +486,33 @@ def get_connections(chromo_list, carrier_history, box):
 
     Returns
     -------
-    numpy.ndarray (7,N)
+    numpy.ndarray (N,7)
         Array consists of chromo center (x,y,z), hop vector (x,y,z), and the
         number of times the carrier has travelled that path by number of
         chromophores.
     """
-    # Create an "empty" array to store data.
-    connections = np.zeros(7)
-    # Iterate through the chromo_list
-    for i, chromo in enumerate(chromo_list):
-        # Iterate through the neighbors of the chromophore
-        for j, image in chromo.neighbors:
-            # Only consider one direction.
-            if i < j:
-                chromoj = chromo_list[j]
-                # Get the vector between the two chromophores.
-                if np.array_equal(image, [0, 0, 0]):
-                    vector = chromoj.center - chromo.center
-                # Account for pbc if not in same relative image.
-                else:
-                    vector = chromoj.center - chromo.center + image * box
-
-                # Get the net number of times the path was travelled.
-                forward = carrier_history[j, i]
-                reverse = carrier_history[i, j]
-                times = abs(forward - reverse)
-
-                # Append the array if the net times travelled is greater than 0
-                if times > 0:
-                    datum = np.hstack(
-                        (chromo.center, vector, np.array([np.log10(times)]))
-                    )
-                    connections = np.vstack((connections, datum))
-    # Return the array excluding the zeros first line.
-    return connections[1:]
+    i, j, images, _, _ = get_neighbor_arrays(chromo_list)
+    # Only consider one direction.
+    mask = i < j
+    i, j, images = i[mask], j[mask], images[mask]
+
+    # Get the net number of times each path was travelled.
+    history = carrier_history.tocsr()
+    forward = np.asarray(history[j, i]).ravel()
+    reverse = np.asarray(history[i, j]).ravel()
+    times = np.abs(forward - reverse)
+    mask = times > 0
+    i, j, images, times = i[mask], j[mask], images[mask], times[mask]
+
+    # Get the vector between the two chromophores, accounting for pbc if they
+    # are not in the same relative image.
+    centers = np.array([chromo.center for chromo in chromo_list])
+    vectors = centers[j] - centers[i] + images * box
+    return np.column_stack((centers[i], vectors, np.log10(times)))
 
 
 def plot_connections(
-    chromo_list, carrier_history, c_type, path
+    chromo_list, carrier_history, c_type, path, box
 ):  # pragma: no cover
     """Plot the paths of the carriers.
 
@@ -218,8 +526,9 @@ def plot_connections(
         Carrier species, "electron" or "hole".
     path : path
         Path to directory where to save the plot.
-    path : path
-        Path to directory where to save the plot.
+    box : numpy.ndarray, shape (3,)
+        The lengths of the box vectors in Angstroms. Box is assumed to be
+        orthogonal.
     """
     # A complicated function that shows connections between carriers in 3D
     # that carriers prefer to hop between.
@@ -286,7 +595,7 @@ def plot_connections(
 
     filename = f"3d_{c_type}_network.png"
     filepath = os.path.join(path, filename)
-    plt.savefig(filepath, bbox_inches="tight", dpi=300)
+    plt.savefig(filepath, bbox_inches="tight", dpi=dpi)
     print(f"\tFigure saved as {filename}")
     plt.clf()
 
@@ -337,6 +646,45 @@ def calc_mobility(fit_time, fit_msd, time_err, msd_err, temp):
     return mobility, mob_err
 
 
+def _fit_msd(times, msds):
+    """Fit a line to the MSDs, returning the fit, r-value and standard error."""
+    fit_time = np.linspace(np.min(times), np.max(times), 100)
+    gradient, intercept, r_val, p_val, std_err = linregress(times, msds)
+    fit_msd = (fit_time * gradient) + intercept
+    return fit_time, fit_msd, r_val, std_err
+
+
+def get_mobility(times, msds, time_stderr, msd_stderr, temp):
+    """Fit the mean squared displacement and calculate the mobility.
+
+    Parameters
+    ----------
+    times : list of float
+        The carrier lifetimes in seconds.
+    msds : list of float
+        The carrier mean squared displacement in meters.
+    time_stderr : list of float
+        The standard error of the carrier lifetimes in seconds.
+    msd_stderr : list of float
+        The standard error of the carrier mean squared displacement in meters.
+    temp : float
+        Simulation temperature in Kelvin.
+
+    Returns
+    -------
+    mobility, mob_error, r_squared : float, float, float
+        The mobility in centimeters^2/(Volt second), the standard error of the
+        mobility, and the r-squared value of the linear fit.
+    """
+    fit_time, fit_msd, r_val, std_err = _fit_msd(times, msds)
+    print(f"\tStandard Error {std_err}")
+    print(f"\tFitting r_val = {r_val}")
+    mobility, mob_error = calc_mobility(
+        fit_time, fit_msd, np.average(time_stderr), np.average(msd_stderr), temp
+    )
+    return mobility, mob_error, r_val ** 2
+
+
 def plot_msd(
     times, msds, time_stderr, msd_stderr, c_type, temp, path
 ):  # pragma: no cover
@@ -365,11 +713,7 @@ def plot_msd(
         The mobility in centimeters^2/(Volt second), the standard error of the
         mobility, and the r-squared value of the linear fit.
     """
-    fit_time = np.linspace(np.min(times), np.max(times), 100)
-    gradient, intercept, r_val, p_val, std_err = linregress(times, msds)
-    print(f"\tStandard Error {std_err}")
-    print(f"\tFitting r_val = {r_val}")
-    fit_msd = (fit_time * gradient) + intercept
+    fit_time, fit_msd, r_val, _ = _fit_msd(times, msds)
     mobility, mob_error = calc_mobility(
         fit_time, fit_msd, np.average(time_stderr), np.average(msd_stderr), temp
     )
@@ -381,7 +725,7 @@ def plot_msd(
     plt.title(rf"$\mu_{{0, {c_type[0]}}}$ = {mobility:.3e} cm$^{2}$/Vs")
     filename = f"lin_MSD_{c_type}.png"
     filepath = os.path.join(path, filename)
-    plt.savefig(filepath, dpi=300,facecolor = "white")
+    plt.savefig(filepath, dpi=dpi,facecolor = "white")
     plt.clf()
     print(f"\tFigure saved as {filename}")
 
@@ -393,7 +737,7 @@ def plot_msd(
     plt.title(rf"$\mu_{{0, {c_type[0]}}}$ = {mobility:.3e} cm$^{2}$/Vs", y=1.1)
     filename = f"semi_log_MSD_{c_type}.png"
     filepath = os.path.join(path, filename)
-    plt.savefig(filepath, dpi=300)
+    plt.savefig(filepath, dpi=dpi)
     plt.clf()
     print(f"\tFigure saved as {filename}")
 
@@ -407,7 +751,7 @@ def plot_msd(
     plt.title(rf"$\mu_{{0,{c_type[0]}}}$ = {mobility:.3e} cm$^{{2}}$/Vs", y=1.1)
     filename = f"log_MSD_{c_type}.png"
     filepath = os.path.join(path, filename)
-    plt.savefig(filepath, dpi=300)
+    plt.savefig(filepath, dpi=dpi)
     plt.clf()
     print(f"\tFigure saved as {filename}")
     return mobility, mob_error, r_val ** 2
@@ -448,6 +792,30 @@ def get_anisotropy(xyzs):
     return 3 / 2 * np.sum(eigenvals ** 2) / np.sum(eigenvals) ** 2 - 1 / 2
 
 
+def get_carrier_positions(carrier_data):
+    """Get the unwrapped final positions of (up to 1000 of) the carriers.
+
+    Parameters
+    ----------
+    carrier_data : dict
+        The data for one carrier type.
+
+    Returns
+    -------
+    numpy.ndarray (N, 3)
+        The unwrapped final positions of the carriers in nanometers.
+    """
+    box = carrier_data["box"][0]
+    xyzs = []
+    # Get the indices of the carriers that travelled the furthest
+    # only do the first 1000, in case there's a lot
+    for i, pos in enumerate(carrier_data["current_position"][:1000]):
+        image = carrier_data["image"][i]
+        position = image * box + pos
+        xyzs.append(position / 10.0) # A -> nm
+    return np.array(xyzs)
+
+
 def plot_hop_vectors(
     carrier_data, chromo_list, snap, c_type, path
 ):  # pragma: no cover
@@ -558,7 +926,7 @@ def plot_hop_vectors(
 
     filename = f"hop_vec_{c_type}.png"
     filepath = (os.path.join(path, filename),)
-    plt.savefig(filepath, bbox_inches="tight", dpi=300)
+    plt.savefig(filepath, bbox_inches="tight", dpi=dpi)
     print(f"\tFigure saved as {filename}")
     plt.clf()
 
@@ -583,23 +951,10 @@ def plot_anisotropy(carrier_data, c_type, three_d, path):  # pragma: no cover
         The anisotropy of the system.
     """
     box = carrier_data["box"][0]
-    xyzs = []
-    # Get the indices of the carriers that travelled the furthest
-    # only do the first 1000, in case there's a lot
-    for i, pos in enumerate(carrier_data["current_position"][:1000]):
-        image = carrier_data["image"][i]
-        position = image * box + pos
-        xyzs.append(position / 10.0) # A -> nm
-
+    xyzs = get_carrier_positions(carrier_data)
     colors = ["b"] * len(xyzs)
-    xyzs = np.array(xyzs)
 
     anisotropy = get_anisotropy(xyzs)
-    print("\t----------------------------------------")
-    print(
-        f"\t{c_type.capitalize()} charge transport anisotropy: {anisotropy:.3f}"
-    )
-    print("\t----------------------------------------")
 
     if three_d:
         # Reduce number of plot markers
@@ -630,7 +985,7 @@ def plot_anisotropy(carrier_data, c_type, three_d, path):  # pragma: no cover
         plt.title(f"Anisotropy ({c_type.capitalize()})", y=1.1)
         filename = f"anisotropy_{c_type}.png"
         filepath = os.path.join(path, filename)
-        plt.savefig(filepath, bbox_inches="tight", dpi=300)
+        plt.savefig(filepath, bbox_inches="tight", dpi=dpi)
         plt.clf()
         print(f"\tFigure saved as {filename}")
     return anisotropy
@@ -712,8 +1067,210 @@ def gauss_fit(data):
     return bin_edges, fit_args, mean, std
 
 
+def get_edge_table(chromo_list, chromo_mol_id, box=None, orientations=None):
+    """Get the properties of every neighbor pair as arrays.
+
+    Each directed edge (chromophore i to neighbor j) appears once, in the same
+    order as the chromophores and their `neighbors` lists (see
+    `morphct.chromophores.get_neighbor_arrays`). The neighbor histograms and
+    hop properties are computed from this table.
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores in the simulation.
+    chromo_mol_id : numpy.ndarray of int
+        The molecule index of each chromophore.
+    box : numpy.ndarray, shape (3,), default None
+        The lengths of the box vectors in Angstroms. Box is assumed to be
+        orthogonal. If None is given, the "separation" values are NaN.
+    orientations : list of numpy.ndarray, default None
+        The orientations of each chromophore, as returned by
+        `get_orientations`. If None is given, the "orientation" values are NaN.
+
+    Returns
+    -------
+    dict of numpy.ndarray
+        "i" and "j" are the indices of the chromophore and its neighbor,
+        "image" is the relative image of the neighbor, "separation" is the
+        distance between their centers in Angstroms, "orientation" is the
+        angle between their orientation vectors in radians, "ti" and
+        "delta_e" are the transfer integral and energy difference in eV (NaN
+        if not set), "intra_mol" is whether they are in the same molecule,
+        "species" is the species of chromophore i, and "same_species" is
+        whether the neighbor has the same species.
+    """
+    i, j, images, tis, delta_es = get_neighbor_arrays(chromo_list)
+    centers = np.array([chromo.center for chromo in chromo_list]).reshape(-1, 3)
+    species = np.array([chromo.species for chromo in chromo_list])
+    chromo_mol_id = np.asarray(chromo_mol_id)
+
+    if box is None:
+        separations = np.full(len(i), np.nan)
+    else:
+        separations = np.linalg.norm(
+            centers[j] + images * box - centers[i], axis=1
+        )
+    if orientations is None:
+        angles = np.full(len(i), np.nan)
+    else:
+        orientations = np.array(orientations).reshape(-1, 3)
+        dot_products = np.einsum(
+            "ij,ij->i", orientations[i], orientations[j]
+        )
+        # in radians
+        angles = np.arccos(np.clip(np.abs(dot_products), 0, 1))
+
+    return {
+        "i": i,
+        "j": j,
+        "image": images,
+        "separation": separations,
+        "orientation": angles,
+        "ti": tis,
+        "delta_e": delta_es,
+        "intra_mol": chromo_mol_id[i] == chromo_mol_id[j],
+        "species": species[i],
+        "same_species": species[i] == species[j],
+    }
+
+
+def get_neighbor_separations(chromo_list, chromo_mol_id, box, edges=None):
+    """Get the separations of the inter-molecular neighbors of each species.
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores in the simulation.
+    chromo_mol_id : numpy.ndarray of int
+        The molecule index of each chromophore.
+    box : numpy.ndarray, shape (3,)
+        The lengths of the box vectors in Angstroms. Box is assumed to be
+        orthogonal.
+    edges : dict, default None
+        The output of `get_edge_table`. If None is given, it will be computed.
+
+    Returns
+    -------
+    list of list of float
+        The separations in Angstroms of the donor and acceptor neighbors,
+        respectively.
+    """
+    if edges is None:
+        edges = get_edge_table(chromo_list, chromo_mol_id, box)
+    # Skip any chromophores that are part of the same molecule
+    inter = ~edges["intra_mol"]
+    return [
+        edges["separation"][inter & (edges["species"] == sp)].tolist()
+        for sp in ["donor", "acceptor"]
+    ]
+
+
+def get_neighbor_orientations(
+    chromo_list, chromo_mol_id, orientations, edges=None
+):
+    """Get the angles between the inter-molecular neighbors of each species.
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores in the simulation.
+    chromo_mol_id : numpy.ndarray of int
+        The molecule index of each chromophore.
+    orientations : list of numpy.ndarray
+        The orientations of each chromophore.
+    edges : dict, default None
+        The output of `get_edge_table` computed with `orientations`. If None is
+        given, it will be computed.
+
+    Returns
+    -------
+    list of list of float
+        The angles in radians between the orientation vectors of the donor and
+        acceptor neighbors, respectively.
+    """
+    if edges is None:
+        edges = get_edge_table(
+            chromo_list, chromo_mol_id, orientations=orientations
+        )
+    # Skip any chromophores that are part of the same molecule
+    inter = ~edges["intra_mol"]
+    return [
+        edges["orientation"][inter & (edges["species"] == sp)].tolist()
+        for sp in ["donor", "acceptor"]
+    ]
+
+
+def get_neighbor_tis(chromo_list, chromo_mol_id, edges=None):
+    """Get the intra- and inter-molecular transfer integrals of each species.
+
+    Each pair of neighbors of the same species is only counted once.
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores in the simulation.
+    chromo_mol_id : numpy.ndarray of int
+        The molecule index of each chromophore.
+    edges : dict, default None
+        The output of `get_edge_table`. If None is given, it will be computed.
+
+    Returns
+    -------
+    ti_intra, ti_inter : list of list of float, list of list of float
+        The intra- and inter-molecular transfer integrals in eV of the donor
+        and acceptor neighbors, respectively.
+    """
+    if edges is None:
+        edges = get_edge_table(chromo_list, chromo_mol_id)
+    mask = (
+        edges["same_species"]
+        & (edges["i"] < edges["j"])
+        & ~np.isnan(edges["ti"])
+    )
+    ti_intra = []
+    ti_inter = []
+    for sp in ["donor", "acceptor"]:
+        sp_mask = mask & (edges["species"] == sp)
+        ti_intra.append(edges["ti"][sp_mask & edges["intra_mol"]].tolist())
+        ti_inter.append(edges["ti"][sp_mask & ~edges["intra_mol"]].tolist())
+    return ti_intra, ti_inter
+
+
+def get_hist_cutoff(data, bins, pad=False, **kwargs):
+    """Choose a cutoff value from the smoothed histogram of some data.
+
+    The histogram is smoothed the same way as in the plots, then passed to
+    `get_dist_cutoff`.
+
+    Parameters
+    ----------
+    data : array-like
+        The data to histogram.
+    bins : int or numpy.ndarray
+        The bins passed to numpy.histogram.
+    pad : bool, default False
+        Whether to add an empty bin at zero before smoothing.
+    **kwargs
+        Keyword arguments passed to `get_dist_cutoff`.
+
+    Returns
+    -------
+    float or None
+        The cutoff value.
+    """
+    n, bin_edges = np.histogram(data, bins=bins)
+    n = n.astype(float)
+    bin_centers = (bin_edges[1:] + bin_edges[:-1]) / 2.0
+    if pad:
+        bin_centers = np.insert(bin_centers, 0, 0)
+        n = np.insert(n, 0, 0)
+    smooth_n = gaussian_filter(n, 1.0)
+    return get_dist_cutoff(bin_centers, smooth_n, **kwargs)
+
+
 def plot_neighbor_hist(
-    chromo_list, chromo_mol_id, box, sepcut, path
+    chromo_list, chromo_mol_id, box, sepcut, path, edges=None
 ):  # pragma: no cover
     """Plot the histogram of distances between neighbors.
 
@@ -721,8 +1278,8 @@ def plot_neighbor_hist(
     ----------
     chromo_list : list of Chromophore
         The chromophores in the simulation.
-    chromo_mol_id : dict
-        A dictionary that maps the chromophore index to the molecule index.
+    chromo_mol_id : numpy.ndarray of int
+        The molecule index of each chromophore.
     box : numpy.ndarray, shape (3,)
         The lengths of the box vectors in Angstroms. Box is assumed to be
         orthogonal.
@@ -730,22 +1287,13 @@ def plot_neighbor_hist(
         The cutoff distances for the donor and acceptor species, respectively.
     path : path
         Path to directory where to save the plot.
+    edges : dict, default None
+        The output of `get_edge_table`. If None is given, it will be computed.
     """
-    seps_donor = []
-    seps_acceptor = []
-    for i, ichromo in enumerate(chromo_list):
-        for j, img in ichromo.neighbors:
-            jchromo = chromo_list[j]
-            # Skip any chromophores that are part of the same molecule
-            if chromo_mol_id[i] == chromo_mol_id[j]:
-                continue
-            sep = np.linalg.norm(jchromo.center + img * box - ichromo.center)
-            if ichromo.species == "donor":
-                seps_donor.append(sep)
-            else:
-                seps_acceptor.append(sep)
+    seps = get_neighbor_separations(
+        chromo_list, chromo_mol_id, box, edges=edges
+    )
     species = ["donor", "acceptor"]
-    seps = [seps_donor, seps_acceptor]
     for sp_i, sp in enumerate(species):
         sep = seps[sp_i]
         if len(sep) == 0:
@@ -769,14 +1317,14 @@ def plot_neighbor_hist(
         plt.ylabel("Frequency (Arb. U.)")
         filename = f"neighbor_hist_{sp}.png"
         filepath = os.path.join(path, filename)
-        plt.savefig(filepath, dpi=300)
+        plt.savefig(filepath, dpi=dpi)
         plt.close()
         print(f"Neighbor histogram figure saved as {filename}")
         plt.close()
 
 
 def plot_orientation_hist(
-    chromo_list, chromo_mol_id, orientations, ocut, path
+    chromo_list, chromo_mol_id, orientations, ocut, path, edges=None
 ):  # pragma: no cover
     """Plot histogram of the angle distributions between chromophore neighbors.
 
@@ -787,8 +1335,8 @@ def plot_orientation_hist(
     ----------
     chromo_list : list of Chromophore
         The chromophores in the simulation.
-    chromo_mol_id : dict
-        A dictionary that maps the chromophore index to the molecule index.
+    chromo_mol_id : numpy.ndarray of int
+        The molecule index of each chromophore.
     orientations : list of numpy.ndarray
         The orientations of each chromophore.
     ocut : list of float
@@ -796,26 +1344,14 @@ def plot_orientation_hist(
         respectively.
     path : path
         Path to directory where to save the plot.
+    edges : dict, default None
+        The output of `get_edge_table` computed with `orientations`. If None is
+        given, it will be computed.
     """
-    orientations_donor = []
-    orientations_acceptor = []
-    for i, ichromo in enumerate(chromo_list):
-        ivec = orientations[i]
-        for j, img in ichromo.neighbors:
-            jchromo = chromo_list[j]
-            # Skip any chromophores that are part of the same molecule
-            if chromo_mol_id[i] == chromo_mol_id[j]:
-                continue
-            jvec = orientations[j]
-            dot_product = np.dot(ivec, jvec)
-            # in radians
-            angle = np.arccos(np.abs(dot_product))
-            if ichromo.species == "donor":
-                orientations_donor.append(angle)
-            elif ichromo.species == "acceptor":
-                orientations_acceptor.append(angle)
+    orients = get_neighbor_orientations(
+        chromo_list, chromo_mol_id, orientations, edges=edges
+    )
     species = ["donor", "acceptor"]
-    orients = [orientations_donor, orientations_acceptor]
     for sp_i, sp in enumerate(species):
         orient = orients[sp_i]
         if len(orient) == 0:
@@ -841,7 +1377,7 @@ def plot_orientation_hist(
         plt.ylabel("Frequency (Arb. U.)")
         filename = f"orientation_hist_{sp}.png"
         filepath = os.path.join(path, filename)
-        plt.savefig(filepath, dpi=300)
+        plt.savefig(filepath, dpi=dpi)
         plt.close()
         print(f"Orientation histogram figure saved as {filename}")
 
@@ -913,9 +1449,7 @@ def get_clusters(chromo_list, snap, rmax=None):
 
         cl.compute((box, positions), neighbors={"r_max": rmax})
 
-        large = sum([1 for c in cl.cluster_keys if len(c) > 6])
-        biggest = max([len(c) for c in cl.cluster_keys])
-        psi = large / cl.num_clusters
+        _, large, biggest, psi = get_cluster_stats(cl)
         print("\t----------------------------------------")
         print(f"\t{sp.capitalize()}: Detected {cl.num_clusters} total")
         print(f"\tand {large} large clusters (size > 6).")
@@ -926,10 +1460,37 @@ def get_clusters(chromo_list, snap, rmax=None):
     return clusters
 
 
+def get_cluster_stats(cluster, large_cluster=6):
+    """Get the size statistics of a set of clusters.
+
+    Parameters
+    ----------
+    cluster : freud.cluster.Cluster
+        The computed clusters.
+    large_cluster : int, default 6
+        Clusters with more chromophores than this are considered "large".
+
+    Returns
+    -------
+    n_clusters, n_large, largest, psi : int, int, int, float
+        The number of clusters, the number of large clusters, the size of the
+        largest cluster, and the ratio of large clusters to all clusters.
+    """
+    sizes = np.array([len(c) for c in cluster.cluster_keys])
+    n_large = int(np.count_nonzero(sizes > large_cluster))
+    return cluster.num_clusters, n_large, int(sizes.max()), (
+        n_large / cluster.num_clusters
+    )
+
+
 def get_orientations(chromo_list, snap):
     """Get the orientation vectors for each chromophore.
 
-    The orientation is calculated as the plane normal vector.
+    The orientation is the normal vector of the best-fit plane through the
+    chromophore atoms (see `morphct.chromophores.get_chromo_orientations`).
+    The orientations are cached on the chromophores, so only those which have
+    not been computed yet (or which were reset by
+    `Chromophore.update_geometry`) are calculated.
 
     Parameters
     ----------
@@ -943,16 +1504,13 @@ def get_orientations(chromo_list, snap):
     list of numpy.ndarray
         The orientations of each chromophore.
     """
-    orientations = []
-    for chromo in chromo_list:
-        positions = snap.particles.position[chromo.atom_ids]
-
-        # There is a really cool way to do this with single value composition
-        # but on the time crunch I didn't have time to learn how to implement
-        # it properly. Check https://goo.gl/jxuhvJ for more details.
-        plane = get_plane(positions)
-        orientations.append(np.array(plane) / np.linalg.norm(plane))
-    return orientations
+    # Chromophores pickled before orientations were cached have no attribute
+    todo = [c for c in chromo_list if getattr(c, "orientation", None) is None]
+    if todo:
+        normals = get_chromo_orientations(snap, [c.atom_ids for c in todo])
+        for chromo, normal in zip(todo, normals):
+            chromo.orientation = normal
+    return [chromo.orientation for chromo in chromo_list]
 
 
 def get_plane(positions):
@@ -1143,103 +1701,105 @@ def plot_clusters_3D(
 
     filename = "clusters.png"
     filepath = os.path.join(path, "figures", filename)
-    plt.savefig(filepath, bbox_inches="tight", dpi=300)
+    plt.savefig(filepath, bbox_inches="tight", dpi=dpi)
     print(f"3D cluster figure saved as {filename}")
     plt.close()
 
 
-def plot_energy_levels(chromo_list, data_dict, path):  # pragma: no cover
-    """
+def get_energy_levels(chromo_list):
+    """Get the frontier orbital energies and energy differences of each species.
 
     Parameters
     ----------
     chromo_list : list of Chromophore
         The chromophores in the simulation.
-    path : path
-        Path to directory where to save the plot.
 
     Returns
     -------
+    dict
+        Maps the species ("donor" or "acceptor") to a tuple of the frontier
+        orbital energy of each chromophore (HOMO for donors and LUMO for
+        acceptors), the energy differences in eV of the neighbor pairs with a
+        transfer integral, and the reorganization energy in eV.
     """
-    homo_levels = []
-    lumo_levels = []
-    donor_delta_eij = []
-    acceptor_delta_eij = []
-    donor_lambda_ij = None
-    acceptor_lambda_ij = None
-    for chromo in chromo_list:
-        if chromo.species == "donor":
-            homo_levels.append(chromo.homo)
-            for i, delta_eij in enumerate(chromo.neighbors_delta_e):
-                ti = chromo.neighbors_ti[i]
-                if delta_eij is not None and ti is not None:
-                    donor_delta_eij.append(delta_eij)
-                donor_lambda_ij = chromo.reorganization_energy
+    i, _, _, tis, delta_es = get_neighbor_arrays(chromo_list)
+    species = np.array([chromo.species for chromo in chromo_list])
+    valid = ~np.isnan(tis) & ~np.isnan(delta_es)
+    energy_levels = {}
+    for sp in ["donor", "acceptor"]:
+        sp_chromos = [chromo for chromo in chromo_list if chromo.species == sp]
+        if sp == "donor":
+            levels = [chromo.homo for chromo in sp_chromos]
         else:
-            lumo_levels.append(chromo.lumo)
-            for i, delta_eij in enumerate(chromo.neighbors_delta_e):
-                ti = chromo.neighbors_ti[i]
-                if delta_eij is not None and ti is not None:
-                    acceptor_delta_eij.append(delta_eij)
-                acceptor_lambda_ij = chromo.reorganization_energy
-    if donor_delta_eij:
-        (donor_bin_edges, donor_fit_args, donor_mean, donor_std) = gauss_fit(
-            donor_delta_eij
-        )
-        donor_err = donor_std / np.sqrt(len(donor_delta_eij))
-
-        data_dict["donor_delta_eij_mean"] = donor_mean
-        data_dict["donor_delta_eij_std"] = donor_std
-        data_dict["donor_delta_eij_err"] = donor_err
-
-        homo_av = np.average(homo_levels)
-        homo_std = np.std(homo_levels)
-        homo_err = homo_std / np.sqrt(len(homo_levels))
-        data_dict["donor_homo_mean"] = homo_av
-        data_dict["donor_homo_std"] = homo_std
-        data_dict["donor_homo_err"] = homo_err
-        print(f"Donor HOMO Level = {homo_av:.3f} +/- {homo_err:.3f}")
-        print(f"Donor Delta E_ij mean = {donor_mean:.3f} +/- {donor_err:.3f}")
-        plot_delta_eij(
-            donor_delta_eij,
-            donor_bin_edges,
-            donor_fit_args,
-            "donor",
-            donor_lambda_ij,
-            path,
-        )
-    if acceptor_delta_eij:
-        (
-            acceptor_bin_edges,
-            acceptor_fit_args,
-            acceptor_av,
-            acceptor_std,
-        ) = gauss_fit(acceptor_delta_eij)
-        acceptor_err = acceptor_std / np.sqrt(len(acceptor_delta_eij))
-
-        data_dict["acceptor_delta_eij_mean"] = acceptor_av
-        data_dict["acceptor_delta_eij_std"] = acceptor_std
-        data_dict["acceptor_delta_eij_err"] = acceptor_err
-        lumo_av = np.average(lumo_levels)
-        lumo_std = np.std(lumo_levels)
-        lumo_err = lumo_std / np.sqrt(len(lumo_levels))
-        data_dict["acceptor_lumo_mean"] = lumo_av
-        data_dict["acceptor_lumo_std"] = lumo_std
-        data_dict["acceptor_lumo_err"] = lumo_err
-        print(
-            f"Acceptor LUMO Level = {lumo_av:.3f} +/- {lumo_err:.3f}\n",
-            "Acceptor Delta E_ij mean = ",
-            f"{acceptor_av:.3f} +/- {acceptor_err:.3f}",
-            sep=""
-        )
-        plot_delta_eij(
-            acceptor_delta_eij,
-            acceptor_bin_edges,
-            acceptor_fit_args,
-            "acceptor",
-            acceptor_lambda_ij,
-            path,
-        )
+            levels = [chromo.lumo for chromo in sp_chromos]
+        delta_eij = delta_es[valid & (species[i] == sp)]
+        lambda_ij = None
+        for chromo in sp_chromos:
+            if chromo.neighbors_delta_e:
+                lambda_ij = chromo.reorganization_energy
+        energy_levels[sp] = (levels, delta_eij, lambda_ij)
+    return energy_levels
+
+
+def get_energy_stats(energy_levels):
+    """Get the statistics of the energy levels.
+
+    Parameters
+    ----------
+    energy_levels : dict
+        The output of `get_energy_levels`.
+
+    Returns
+    -------
+    dict
+        The mean, standard deviation, and standard error of the energy
+        differences (e.g., "donor_delta_eij_mean") and frontier orbital
+        energies (e.g., "donor_homo_mean") of each species.
+    """
+    data_dict = {}
+    for sp, orbital in [("donor", "homo"), ("acceptor", "lumo")]:
+        levels, delta_eij, _ = energy_levels[sp]
+        if len(delta_eij) == 0:
+            continue
+        delta_std = np.std(delta_eij)
+        data_dict[f"{sp}_delta_eij_mean"] = np.mean(delta_eij)
+        data_dict[f"{sp}_delta_eij_std"] = delta_std
+        data_dict[f"{sp}_delta_eij_err"] = delta_std / np.sqrt(len(delta_eij))
+
+        level_std = np.std(levels)
+        data_dict[f"{sp}_{orbital}_mean"] = np.average(levels)
+        data_dict[f"{sp}_{orbital}_std"] = level_std
+        data_dict[f"{sp}_{orbital}_err"] = level_std / np.sqrt(len(levels))
+    return data_dict
+
+
+def plot_energy_levels(
+    chromo_list, data_dict, path, energy_levels=None
+):  # pragma: no cover
+    """Plot the distribution of energy differences of each species.
+
+    The statistics from `get_energy_stats` are added to `data_dict`.
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores in the simulation.
+    data_dict : dict
+        The analysis results.
+    path : path
+        Path to directory where to save the plot.
+    energy_levels : dict, default None
+        The output of `get_energy_levels`. If None is given, it will be
+        computed from `chromo_list`.
+    """
+    if energy_levels is None:
+        energy_levels = get_energy_levels(chromo_list)
+    data_dict.update(get_energy_stats(energy_levels))
+    for sp, (_, delta_eij, lambda_ij) in energy_levels.items():
+        if len(delta_eij) == 0:
+            continue
+        bin_edges, fit_args, _, _ = gauss_fit(delta_eij)
+        plot_delta_eij(delta_eij, bin_edges, fit_args, sp, lambda_ij, path)
 
 
 def plot_delta_eij(
@@ -1274,241 +1834,147 @@ def plot_delta_eij(
 
     filename = f"{species}_delta_E_ij.png"
     filepath = os.path.join(path, filename)
-    plt.savefig(filepath, dpi=300)
+    plt.savefig(filepath, dpi=dpi)
     plt.close()
     print(f"\tFigure saved as {filename}")
 
 
-def plot_mixed_hopping_rates(
+def get_hop_properties(
     chromo_list,
     clusters,
     chromo_mol_id,
-    data_dict,
-    cutoff_dict,
+    box,
     temp,
-    path,
     use_vrh=False,
     koopmans=None,
     boltz=False,
-):  # pragma: no cover
-    """
+    edges=None,
+):
+    """Get the hop rates and transfer integrals of the neighbor pairs.
+
+    The pairs are split by whether the chromophores are in the same cluster
+    and in the same molecule. The rates are computed with
+    `morphct.mobility_kmc.get_rate_table`, the same way as in the KMC
+    simulation.
 
     Parameters
     ----------
     chromo_list : list of Chromophore
         The chromophores in the simulation.
     clusters : list of freud.cluster.Cluster
-        The clusters in the simulation.
-    chromo_mol_id : dict
-        A dictionary that maps the chromophore index to the molecule index.
+        The donor and acceptor clusters in the simulation, as returned by
+        `get_clusters`.
+    chromo_mol_id : numpy.ndarray of int
+        The molecule index of each chromophore.
+    box : numpy.ndarray, shape (3,)
+        The lengths of the box vectors in Angstroms. Box is assumed to be
+        orthogonal.
     temp : float
         Simulation temperature in Kelvin.
-    path : path
-        Path to directory where to save the plot.
+    use_vrh : bool, default False
+        Whether to use variable-range hopping.
+    koopmans : float, default None
+        A scaling factor to apply to the rate.
+    boltz : bool, default False
+        Whether to use a Boltzmann energy penalty.
+    edges : dict, default None
+        The output of `get_edge_table`. If None is given, it will be computed.
+
+    Returns
+    -------
+    collections.defaultdict of list
+        The rates and transfer integrals keyed by the hop type ("intra" or
+        "inter"), target ("c" for cluster or "m" for molecule), property ("r"
+        for rate or "T" for transfer integral), and species ("d" or "a").
+        e.g., "inter_mrd" contains the rates of the inter-molecular donor hops.
+    """
+    if edges is None:
+        edges = get_edge_table(chromo_list, chromo_mol_id, box)
+
+    # The cluster index of each chromophore. The clusters of each species are
+    # computed from only the chromophores of that species, in order.
+    cluster_ids = np.full(len(chromo_list), -1)
+    for sp_i, sp in enumerate(["donor", "acceptor"]):
+        if clusters[sp_i] is None:
+            continue
+        chromo_ids = [c.id for c in chromo_list if c.species == sp]
+        cluster_ids[chromo_ids] = clusters[sp_i].cluster_idx
+
+    # Each pair with a nonzero transfer integral is counted once
+    tis = edges["ti"]
+    hops = ~np.isnan(tis) & (tis != 0) & (edges["i"] < edges["j"])
+    i = edges["i"][hops]
+    j = edges["j"][hops]
+    tis = tis[hops]
+
+    # Now take into account the various behaviours we can have from the
+    # parameter file
+    prefactor = 1.0
+    # Apply the koopmans prefactor
+    if koopmans is not None:
+        prefactor *= koopmans
+    # The rate table has the same pair order as the edge table
+    rates = get_rate_table(
+        chromo_list,
+        box,
+        temp,
+        hopping_prefactor=prefactor,
+        use_vrh=use_vrh,
+        boltz=boltz,
+    )["rate"][hops]
+
+    in_cluster = cluster_ids[i] != -1
+    intra = {
+        "c": cluster_ids[i] == cluster_ids[j],
+        "m": edges["intra_mol"][hops],
+    }
+    prop_lists = defaultdict(list)
+    for sp in ["donor", "acceptor"]:
+        sp_hops = edges["species"][hops] == sp
+        for target, hop_type in itertools.product(
+            ["c", "m"], ["intra", "inter"]
+        ):
+            mask = sp_hops & (intra[target] == (hop_type == "intra"))
+            # Only chromophores in a cluster have intra- / inter-cluster hops
+            if target == "c":
+                mask &= in_cluster
+            if np.any(mask):
+                name = f"{hop_type}_{target}"
+                prop_lists[f"{name}r{sp[0]}"] = rates[mask].tolist()
+                prop_lists[f"{name}T{sp[0]}"] = tis[mask].tolist()
+    return prop_lists
+
+
+def get_hop_stats(prop_lists):
+    """Get the statistics of the hop rates.
+
+    Parameters
+    ----------
+    prop_lists : dict
+        The output of `get_hop_properties`.
 
     Returns
     -------
+    dict
+        The number of hops, the proportion of hops, and the mean and standard
+        deviation of the rate for each type of hop (e.g., "inter_mrd_hops").
     """
-    # Create all the empty lists we need
     hop_types = ["intra", "inter"]
     hop_targets = ["c", "m"]
-    # hop_properties = ["r", "T"]
     species = ["d", "a"]
-    prop_lists = defaultdict(list)
-    for i, ichromo in enumerate(chromo_list):
-        imol = chromo_mol_id[i]
-        for ineighbor, ti in enumerate(ichromo.neighbors_ti):
-            if ti is None or ti == 0:
-                continue
-            j = ichromo.neighbors[ineighbor][0]
-            jchromo = chromo_list[j]
-            jmol = chromo_mol_id[j]
-            delta_e = ichromo.neighbors_delta_e[ineighbor]
-            if ichromo.species == jchromo.species:
-                lambda_ij = ichromo.reorganization_energy
-            else:
-                lambda_ij = (
-                    ichromo.reorganization_energy
-                    + jchromo.reorganization_energy
-                ) / 2
-            # Now take into account the various behaviours we can have from
-            # the parameter file
-            prefactor = 1.0
-            # Apply the koopmans prefactor
-            if koopmans is not None:
-                prefactor *= koopmans
-            # Apply the distance penalty due to VRH
-            if use_vrh:
-                vrh = 1.0 / ichromo.vrh_delocalization
-                rel_image = ichromo.neighbors[ineighbor][1]
-                jchromo_center = jchromo.center + rel_image * box
-                rij = np.linalg.norm(ichromo.center - jchromo_center) * 1e-10
-                rate = hf.get_hop_rate(
-                    lambda_ij,
-                    ti,
-                    delta_e,
-                    prefactor,
-                    temp,
-                    use_vrh=use_vrh,
-                    rij=rij,
-                    vrh=vrh,
-                    boltz=boltz,
-                )
-            else:
-                rate = hf.get_hop_rate(
-                    lambda_ij, ti, delta_e, prefactor, temp, boltz=boltz
-                )
-            if j < i:
-                continue
-            # Do intra- / inter- clusters
-            if ichromo.species == "acceptor":
-                if clusters[1] is not None:
-                    for cluster in clusters[1].cluster_keys:
-                        if i in cluster and j in cluster:
-                            prop_lists["intra_cra"].append(rate)
-                            prop_lists["intra_cTa"].append(ti)
-                            break
-                        else:
-                            prop_lists["inter_cra"].append(rate)
-                            prop_lists["inter_cTa"].append(ti)
-            else:
-                if clusters[0] is not None:
-                    for cluster in clusters[0].cluster_keys:
-                        if i in cluster and j in cluster:
-                            prop_lists["intra_crd"].append(rate)
-                            prop_lists["intra_cTd"].append(ti)
-                            break
-                        else:
-                            prop_lists["inter_crd"].append(rate)
-                            prop_lists["inter_cTd"].append(ti)
-            # Now do intra- / inter- molecules
-            if imol == jmol:
-                if ichromo.species == "acceptor":
-                    prop_lists["intra_mra"].append(rate)
-                    prop_lists["intra_mTa"].append(ti)
-                else:
-                    prop_lists["intra_mrd"].append(rate)
-                    prop_lists["intra_mTd"].append(ti)
-            else:
-                if ichromo.species == "acceptor":
-                    prop_lists["inter_mra"].append(rate)
-                    prop_lists["inter_mTa"].append(ti)
-                else:
-                    prop_lists["inter_mrd"].append(rate)
-                    prop_lists["inter_mTd"].append(ti)
-    # Donor cluster Plots:
-    if prop_lists["intra_crd"]:
-        val = prop_lists["intra_crd"]
-        mean = np.mean(val)
-        avg_std = np.std(val) / len(val)
-        print(f"Mean intra-cluster donor rate: {mean:.3e}+/-{avg_std:.3e}")
-
-    if prop_lists["inter_crd"]:
-        val = prop_lists["inter_crd"]
-        mean = np.mean(val)
-        avg_std = np.std(val) / len(val)
-        print(f"Mean inter-cluster donor rate: {mean:.3e}+/-{avg_std:.3e}")
-
-    if prop_lists["intra_crd"] or prop_lists["inter_crd"]:
-        plot_stacked_hist_rates(
-            prop_lists["intra_crd"],
-            prop_lists["inter_crd"],
-            ["Intra-cluster", "Inter-cluster"],
-            "donor",
-            path,
-        )
-        plot_stacked_hist_tis(
-            prop_lists["intra_cTd"],
-            prop_lists["inter_cTd"],
-            ["Intra-cluster", "Inter-cluster"],
-            "donor",
-            cutoff_dict["ti"][0],
-            path,
-        )
-    # Acceptor cluster Plots:
-    if prop_lists["intra_cra"]:
-        val = prop_lists["intra_cra"]
-        mean = np.mean(val)
-        avg_std = np.std(val) / len(val)
-        print(f"Mean intra-cluster acceptor rate: {mean:.3e}+/-{avg_std:.3e}")
-
-    if prop_lists["inter_cra"]:
-        val = prop_lists["inter_cra"]
-        mean = np.mean(val)
-        avg_std = np.std(val) / len(val)
-        print(f"Mean inter-cluster acceptor rate: {mean:.3e}+/-{avg_std:.3e}")
-
-    if prop_lists["intra_cra"] or prop_lists["inter_cra"]:
-        plot_stacked_hist_rates(
-            prop_lists["intra_cra"],
-            prop_lists["inter_cra"],
-            ["Intra-cluster", "Inter-cluster"],
-            "acceptor",
-            path,
-        )
-        plot_stacked_hist_tis(
-            ["intra_cTa"],
-            prop_lists["inter_cTa"],
-            ["Intra-cluster", "Inter-cluster"],
-            "acceptor",
-            cutoff_dict["ti"][1],
-            path,
-        )
-    # Donor Mol Plots:
-    if prop_lists["intra_mrd"]:
-        val = prop_lists["intra_mrd"]
-        mean = np.mean(val)
-        avg_std = np.std(val) / len(val)
-        print(f"Mean intra-molecular donor rate: {mean:.3e}+/-{avg_std:.3e}")
-
-    if prop_lists["inter_mrd"]:
-        val = prop_lists["inter_mrd"]
-        mean = np.mean(val)
-        avg_std = np.std(val) / len(val)
-        print(f"Mean inter-molecular donor rate: {mean:.3e}+/-{avg_std:.3e}")
-
-    if prop_lists["intra_mrd"] or prop_lists["inter_mrd"]:
-        plot_stacked_hist_rates(
-            prop_lists["intra_mrd"],
-            prop_lists["inter_mrd"],
-            ["Intra-mol", "Inter-mol"],
-            "donor",
-            path,
-        )
-    # Acceptor Mol Plots:
-    if prop_lists["intra_mra"]:
-        val = prop_lists["intra_mra"]
-        mean = np.mean(val)
-        avg_std = np.std(val) / len(val)
-        print(f"Mean intra-molecular acceptor rate: {mean:.3e}+/-{avg_std:.3e}")
-
-    if prop_lists["inter_mra"]:
-        val = prop_lists["inter_mra"]
-        mean = np.mean(val)
-        avg_std = np.std(val) / len(val)
-        print(f"Mean inter-molecular acceptor rate: {mean:.3e}+/-{avg_std:.3e}")
-
-    if prop_lists["intra_mra"] or prop_lists["inter_mra"]:
-        plot_stacked_hist_rates(
-            prop_lists["intra_mra"],
-            prop_lists["inter_mra"],
-            ["Intra-mol", "Inter-mol"],
-            "acceptor",
-            path,
-        )
-    # Update the dataDict
+    data_dict = {}
     for hop_type, target, sp in itertools.product(
         hop_types, hop_targets, species
     ):
         hop_name = f"{hop_type}_{target}r{sp}"
-        n_hops = len(prop_lists[hop_name])
+        n_hops = len(prop_lists.get(hop_name, []))
         if n_hops == 0:
             continue
 
         other_hop = hop_types[hop_types.index(hop_type) * -1 + 1]
         other_hop_name = f"{other_hop}_{target}r{sp}"
 
-        total_hops = n_hops + len(prop_lists[other_hop_name])
+        total_hops = n_hops + len(prop_lists.get(other_hop_name, []))
         proportion = n_hops / total_hops
 
         mean_rate = np.mean(prop_lists[hop_name])
@@ -1517,6 +1983,101 @@ def plot_mixed_hopping_rates(
         data_dict[f"{hop_name}_proportion"] = proportion
         data_dict[f"{hop_name}_rate_mean"] = mean_rate
         data_dict[f"{hop_name}_rate_std"] = stdev_rate
+    return data_dict
+
+
+def plot_mixed_hopping_rates(
+    chromo_list,
+    clusters,
+    chromo_mol_id,
+    data_dict,
+    cutoff_dict,
+    temp,
+    path,
+    use_vrh=False,
+    koopmans=None,
+    boltz=False,
+    box=None,
+    prop_lists=None,
+    edges=None,
+):  # pragma: no cover
+    """Plot the hop rates and transfer integrals by cluster and molecule.
+
+    The statistics from `get_hop_stats` are added to `data_dict`.
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores in the simulation.
+    clusters : list of freud.cluster.Cluster
+        The clusters in the simulation.
+    chromo_mol_id : numpy.ndarray of int
+        The molecule index of each chromophore.
+    data_dict : dict
+        The analysis results.
+    cutoff_dict : dict
+        The cutoffs, as returned by `create_cutoff_dict`.
+    temp : float
+        Simulation temperature in Kelvin.
+    path : path
+        Path to directory where to save the plot.
+    use_vrh : bool, default False
+        Whether to use variable-range hopping.
+    koopmans : float, default None
+        A scaling factor to apply to the rate.
+    boltz : bool, default False
+        Whether to use a Boltzmann energy penalty.
+    box : numpy.ndarray, shape (3,), default None
+        The lengths of the box vectors in Angstroms. Only needed if
+        `prop_lists` is None.
+    prop_lists : dict, default None
+        The output of `get_hop_properties`. If None is given, it will be
+        computed.
+    edges : dict, default None
+        The output of `get_edge_table`, used if `prop_lists` is None.
+    """
+    if prop_lists is None:
+        prop_lists = get_hop_properties(
+            chromo_list,
+            clusters,
+            chromo_mol_id,
+            box,
+            temp,
+            use_vrh=use_vrh,
+            koopmans=koopmans,
+            boltz=boltz,
+            edges=edges,
+        )
+    for sp_i, sp in enumerate(["donor", "acceptor"]):
+        s = sp[0]
+        # Cluster plots
+        if prop_lists[f"intra_cr{s}"] or prop_lists[f"inter_cr{s}"]:
+            plot_stacked_hist_rates(
+                prop_lists[f"intra_cr{s}"],
+                prop_lists[f"inter_cr{s}"],
+                ["Intra-cluster", "Inter-cluster"],
+                sp,
+                path,
+            )
+            plot_stacked_hist_tis(
+                prop_lists[f"intra_cT{s}"],
+                prop_lists[f"inter_cT{s}"],
+                ["Intra-cluster", "Inter-cluster"],
+                sp,
+                cutoff_dict["ti"][sp_i],
+                path,
+            )
+        # Mol plots
+        if prop_lists[f"intra_mr{s}"] or prop_lists[f"inter_mr{s}"]:
+            plot_stacked_hist_rates(
+                prop_lists[f"intra_mr{s}"],
+                prop_lists[f"inter_mr{s}"],
+                ["Intra-mol", "Inter-mol"],
+                sp,
+                path,
+            )
+    # Update the dataDict
+    data_dict.update(get_hop_stats(prop_lists))
 
 
 def plot_stacked_hist_rates(
@@ -1549,7 +2110,7 @@ def plot_stacked_hist_rates(
     plt.gca().set_xscale("log")
     filename = f"{species}_hopping_rate_clusters.png"
     filepath = os.path.join(path, filename)
-    plt.savefig(filepath, dpi=300)
+    plt.savefig(filepath, dpi=dpi)
     plt.close()
     print(f"\tFigure saved as {filename}")
 
@@ -1584,7 +2145,7 @@ def plot_stacked_hist_tis(
 
     filename = f"{species}_transfer_integral_clusters.png"
     filepath = os.path.join(path, filename)
-    plt.savefig(filepath, dpi=300)
+    plt.savefig(filepath, dpi=dpi)
     plt.close()
     print(f"\tFigure saved as {filename}")
 
@@ -1608,6 +2169,68 @@ def write_csv(data_dict, path): # pragma: no cover
     print(f"\tCSV file written to {filepath}")
 
 
+def summarize_mobility(combined_data, temp, error_method=None):
+    """Get the mobility of each carrier type as rows of a table.
+
+    Only the transport metrics are computed (see `analyze_carrier`), so this
+    is much cheaper than `analyze` when many runs are compared.
+
+    Parameters
+    ----------
+    combined_data : dict
+        The data for both carrier types.
+    temp : float
+        Simulation temperature in Kelvin.
+    error_method : str, default None
+        How to estimate the error of the mobility (see `analyze_carrier`).
+
+    Returns
+    -------
+    list of dict
+        For each carrier type which was simulated, the "c_type", the number
+        of carriers ("n_carriers"), "mobility", "mobility_err", "r_squared",
+        and "anisotropy".
+    """
+    rows = []
+    freqcut = [None, None]
+    for c_type, carrier_data in zip(
+        ["hole", "electron"], split_carriers(combined_data)
+    ):
+        if not carrier_data["id"]:
+            continue
+        results = analyze_carrier(
+            c_type, carrier_data, temp, freqcut, error_method=error_method
+        )
+        rows.append(
+            {
+                "c_type": c_type,
+                "n_carriers": len(carrier_data["id"]),
+                "mobility": results["mobility"],
+                "mobility_err": results["mobility_err"],
+                "r_squared": results["r_squared"],
+                "anisotropy": results["anisotropy"],
+            }
+        )
+    return rows
+
+
+def write_table(rows, filepath): # pragma: no cover
+    """Write rows with the same keys to a CSV file with a header.
+
+    Parameters
+    ----------
+    rows : list of dict
+        The rows of the table. The keys of the first row are the columns.
+    filepath : path
+        Path to the CSV file.
+    """
+    with open(filepath, "w") as f:
+        w = csv.DictWriter(f, fieldnames=list(rows[0]))
+        w.writeheader()
+        w.writerows(rows)
+    print(f"\tCSV file written to {filepath}")
+
+
 # TODO EJ
 # this function always seems to get caught with the IndexError...
 # what is this function intended for?
@@ -1675,42 +2298,32 @@ def get_dist_cutoff(
         return None
 
 
-def plot_ti_hist(chromo_list, chromo_mol_id, ticut, path):  # pragma: no cover
+def plot_ti_hist(
+    chromo_list, chromo_mol_id, ticut, path, edges=None
+):  # pragma: no cover
     """Plot the histogram of inter- and intra-molecular transfer interals.
 
     Parameters
     ----------
     chromo_list : list of Chromophore
         The chromophores in the simulation.
-    chromo_mol_id : dict
-        A dictionary that maps the chromophore index to the molecule index.
+    chromo_mol_id : numpy.ndarray of int
+        The molecule index of each chromophore.
     ticut : list of float
         The transfer intergral cutoff for the donor and acceptor species,
         respectively.
     path : path
         Path to directory where to save the plot.
+    edges : dict, default None
+        The output of `get_edge_table`. If None is given, it will be computed.
     """
     # ti_dist [[DONOR], [ACCEPTOR]]
-    ti_intra = [[], []]
-    ti_inter = [[], []]
+    ti_intra, ti_inter = get_neighbor_tis(
+        chromo_list, chromo_mol_id, edges=edges
+    )
     species = ["donor", "acceptor"]
     labels = ["Intra-mol", "Inter-mol"]
     for sp_i, sp in enumerate(species):
-        for i, ichromo in enumerate(chromo_list):
-            if ichromo.species != sp:
-                continue
-            for i_neighbor, (j, img) in enumerate(ichromo.neighbors):
-                jchromo = chromo_list[j]
-                if jchromo.species != sp:
-                    continue
-                if i >= j:
-                    continue
-                ti = ichromo.neighbors_ti[i_neighbor]
-                if ti is not None:
-                    if chromo_mol_id[i] == chromo_mol_id[j]:
-                        ti_intra[sp_i].append(ti)
-                    else:
-                        ti_inter[sp_i].append(ti)
         if not (ti_intra[sp_i] and ti_inter[sp_i]):
             continue
         plt.figure()
@@ -1739,13 +2352,44 @@ def plot_ti_hist(chromo_list, chromo_mol_id, ticut, path):  # pragma: no cover
         plt.legend(loc=1, prop={"size": 18})
         filename = f"{sp}_transfer_integral_mols.png"
         filepath = os.path.join(path, filename)
-        plt.savefig(filepath, dpi=300)
+        plt.savefig(filepath, dpi=dpi)
         plt.close()
         print(f"\tFigure saved as {filename}")
 
 
+def get_hop_frequencies(carrier_history):
+    """Get the total, net, and discrepancy hop frequencies of each path.
+
+    Each path between two chromophores is only considered in one direction:
+    the nonzero entries of the lower triangle (including the diagonal) of the
+    history.
+
+    Parameters
+    ----------
+    carrier_history : scipy.sparse matrix
+        The carrier history.
+
+    Returns
+    -------
+    total, net, discrepancy : numpy.ndarray, numpy.ndarray, numpy.ndarray
+        The number of hops along each path, the absolute difference between
+        the hops along each path and its reverse, and the total hops in both
+        directions minus the net hops.
+    """
+    history = carrier_history.tocsr()
+    coo = history.tocoo()
+    mask = (coo.row >= coo.col) & (coo.data != 0)
+    rows = coo.row[mask]
+    cols = coo.col[mask]
+    total = coo.data[mask]
+    reverse = np.asarray(history[cols, rows]).ravel()
+    net = np.abs(total - reverse)
+    discrepancy = total + reverse - net
+    return total, net, discrepancy
+
+
 def plot_frequency_dist(
-    c_type, carrier_history, freqcut, path
+    c_type, carrier_history, freqcut, path, hop_freqs=None
 ):  # pragma: no cover
     """Plot the histogram of frequency distributions.
 
@@ -1759,16 +2403,15 @@ def plot_frequency_dist(
         The frequency cutoff for the donor and acceptor species, respectively.
     path : path
         Path to directory where to save the plot.
+    hop_freqs : tuple of numpy.ndarray, default None
+        The output of `get_hop_frequencies`. If None is given, it will be
+        computed from `carrier_history`.
     """
     c_ind = ["hole", "electron"].index(c_type)
-    nonzero = list(zip(*carrier_history.nonzero()))
-    frequencies = []
-    for i, j in nonzero:
-        if i < j:
-            # Only consider hops in one direction
-            continue
-        frequency = carrier_history[i, j]
-        frequencies.append(np.log10(frequency))
+    if hop_freqs is None:
+        hop_freqs = get_hop_frequencies(carrier_history)
+    total, _, _ = hop_freqs
+    frequencies = np.log10(total)
     plt.figure()
     n, bin_edges, _ = plt.hist(frequencies, bins=60, color="b")
     bin_centers = (bin_edges[1:] + bin_edges[:-1]) / 2.0
@@ -1793,12 +2436,14 @@ def plot_frequency_dist(
     plt.ylabel("Frequency (Arb. U.)")
     filename = f"total_hop_freq_{c_type}.png"
     filepath = os.path.join(path, filename)
-    plt.savefig(filepath, dpi=300)
+    plt.savefig(filepath, dpi=dpi)
     plt.close()
     print(f"\tFigure saved as {filename}")
 
 
-def plot_net_frequency_dist(c_type, carrier_history, path):  # pragma: no cover
+def plot_net_frequency_dist(
+    c_type, carrier_history, path, hop_freqs=None
+):  # pragma: no cover
     """Plot the frequency distribution.
 
     Parameters
@@ -1809,17 +2454,15 @@ def plot_net_frequency_dist(c_type, carrier_history, path):  # pragma: no cover
         The carrier history.
     path : path
         Path to directory where to save the plot.
+    hop_freqs : tuple of numpy.ndarray, default None
+        The output of `get_hop_frequencies`. If None is given, it will be
+        computed from `carrier_history`.
     """
-    nonzero = list(zip(*carrier_history.nonzero()))
-    frequencies = []
-    for i, j in nonzero:
-        if i < j:
-            # Only consider hops in one direction
-            continue
-        frequency = np.abs(carrier_history[i, j] - carrier_history[j, i])
-        if frequency > 0:
-            frequencies.append(np.log10(frequency))
-    if frequencies:
+    if hop_freqs is None:
+        hop_freqs = get_hop_frequencies(carrier_history)
+    _, net, _ = hop_freqs
+    frequencies = np.log10(net[net > 0])
+    if frequencies.size:
         plt.figure()
         plt.hist(frequencies, bins=60, color="b")
         plt.xlabel(f"Net {c_type} hops (Arb. U.)")
@@ -1830,7 +2473,7 @@ def plot_net_frequency_dist(c_type, carrier_history, path):  # pragma: no cover
         plt.ylabel("Frequency (Arb. U.)")
         filename = f"net_hop_freq_{c_type}.png"
         filepath = os.path.join(path, filename)
-        plt.savefig(filepath, dpi=300)
+        plt.savefig(filepath, dpi=dpi)
         plt.close()
         print(f"\tFigure saved as {filename}")
     else:
@@ -1838,7 +2481,7 @@ def plot_net_frequency_dist(c_type, carrier_history, path):  # pragma: no cover
 
 
 def plot_discrepancy_frequency_dist(
-    c_type, carrier_history, path
+    c_type, carrier_history, path, hop_freqs=None
 ):  # pragma: no cover
     """Plot the frequency discrepancy distribution.
 
@@ -1850,25 +2493,16 @@ def plot_discrepancy_frequency_dist(
         The carrier history.
     path : path
         Path to directory where to save the plot.
+    hop_freqs : tuple of numpy.ndarray, default None
+        The output of `get_hop_frequencies`. If None is given, it will be
+        computed from `carrier_history`.
     """
-    nonzero = list(zip(*carrier_history.nonzero()))
-    frequencies = []
-    net_equals_total = 0
-    net_near_total = 0
-    for i, j in nonzero:
-        if i < j:
-            # Only consider hops in one direction
-            continue
-        total_hops = carrier_history[i, j] + carrier_history[j, i]
-        net_hops = np.abs(carrier_history[i, j] - carrier_history[j, i])
-        frequency = total_hops - net_hops
-        if frequency == 0:
-            net_equals_total += 1
-            net_near_total += 1
-        else:
-            if frequency < 10:
-                net_near_total += 1
-            frequencies.append(np.log10(frequency))
+    if hop_freqs is None:
+        hop_freqs = get_hop_frequencies(carrier_history)
+    _, _, discrepancy = hop_freqs
+    net_equals_total = np.count_nonzero(discrepancy == 0)
+    net_near_total = np.count_nonzero(discrepancy < 10)
+    frequencies = np.log10(discrepancy[discrepancy > 0])
     plt.figure()
     plt.hist(frequencies, bins=60, color="b")
     plt.xlabel("Discrepancy (Arb. U.)")
@@ -1879,7 +2513,7 @@ def plot_discrepancy_frequency_dist(
     plt.ylabel("Frequency (Arb. U.)")
     filename = f"hop_discrepancy_{c_type}.png"
     filepath = os.path.join(path, filename)
-    plt.savefig(filepath, dpi=300)
+    plt.savefig(filepath, dpi=dpi)
     plt.close()
     print(f"\tThere are {net_equals_total} paths with one-way transport.")
     print(f"\tThere are {net_near_total} paths with total - net < 10.")
@@ -1920,20 +2554,19 @@ def plot_mobility_msd(
     mobility, mob_error, r_squared = plot_msd(
         times, msds, time_stderr, msd_stderr, c_type, temp, path
     )
-    print("\t----------------------------------------")
-    print(
-        f"\t{c_type.capitalize()} mobility = {mobility:.2E} ",
-        f"+/- {mob_error:.2E} cm^2 V^-1 s^-1",
-    )
-    print("\t----------------------------------------")
     plt.close()
     return mobility, mob_error, r_squared
 
 
-def carrier_plots(
-    c_type, carrier_data, chromo_list, snap, freqcut, three_d, temp, path
-): # pragma: no cover
-    """Wrap the plotting functions for each carrier type.
+def analyze_carrier(
+    c_type, carrier_data, temp, freqcut=[None, None], error_method=None
+):
+    """Compute the transport metrics of one carrier type.
+
+    If the carriers were run with checkpoints, the MSDs are calculated at the
+    checkpoint times (see `get_checkpoint_msds`). If the carriers were run
+    with an applied field, the mobility is measured from their drift (see
+    `get_drift_mobility`) and "r_squared" is NaN.
 
     Parameters
     ----------
@@ -1941,87 +2574,414 @@ def carrier_plots(
         The carrier type, "electron" or "hole".
     carrier_data : dict
         The data for one carrier type.
-    chromo_list : list of Chromophore
-        The chromophores in the simulation.
-    snap : gsd.hoomd.Snapshot
-        The simulation snapshot.
-    freqcut : list of int
-        The frequency cutoff for the donor and acceptor species, respectively.
-    three_d : bool
-        Whether to create 3D plots.
     temp : float
         Simulation temperature in Kelvin.
-    path : path
-        Path to directory where to save the plot.
+    freqcut : list of int, default [None, None]
+        The frequency cutoff for the donor and acceptor species, respectively.
+        If None is given, `get_dist_cutoff` will be used to choose a value and
+        the list is updated.
+    error_method : str, default None
+        How to estimate the error of the mobility. If None is given, the
+        standard errors of the MSDs and lifetimes are propagated (see
+        `calc_mobility`). Otherwise "bootstrap" or "jackknife" is passed to
+        `get_mobility_error`.
 
     Returns
     -------
-    anisotropy, mobility, mob_error, r_squared : float, float, float, float
-        The anisotropy, the mobility in centimeters^2/(Volt second), the
-        standard error of the mobility, and the r-squared value of the linear
-        fit.
+    dict
+        The carrier data ("data"), history ("history"), lifetimes ("times"),
+        MSDs ("msds") and their standard errors ("time_stderr",
+        "msd_stderr"), "mobility", "mobility_err", "r_squared", final carrier
+        positions ("xyzs"), "anisotropy", and the output of
+        `get_hop_frequencies` ("hop_freqs", None if there is no history), and
+        the drift velocity in meters/second ("drift_velocity", None if there
+        was no field).
     """
     print(f"Considering the transport of {c_type}...")
-    if c_type == "hole":
-        carrier_history = carrier_data["hole_history"]
-    else:
-        carrier_history = carrier_data["electron_history"]
+    c_ind = ["hole", "electron"].index(c_type)
+    carrier_history = carrier_data[f"{c_type}_history"]
 
     print("Obtaining mean squared displacements...")
-    times, msds, time_stderr, msd_stderr = get_times_msds(carrier_data)
-
-    print(f"Plotting distribution of {c_type} displacements")
-    plot_displacement_dist(carrier_data, c_type, path)
+    if _has_checkpoints(carrier_data):
+        times, msds, time_stderr, msd_stderr = get_checkpoint_msds(
+            carrier_data
+        )
+    else:
+        times, msds, time_stderr, msd_stderr = get_times_msds(carrier_data)
 
     print("Calculating mobility...")
-    mobility, mob_error, r_squared = plot_mobility_msd(
-        c_type, times, msds, time_stderr, msd_stderr, temp, path
+    mobility, mob_error, r_squared = get_mobility(
+        times, msds, time_stderr, msd_stderr, temp
+    )
+    drift_velocity = None
+    field = _get_field(carrier_data)
+    if field is not None:
+        mobility, mob_error, drift_velocity = get_drift_mobility(
+            carrier_data, field
+        )
+        r_squared = np.nan
+        print(f"\tDrift velocity {drift_velocity} m/s along the field")
+    elif error_method is not None:
+        mob_error = get_mobility_error(carrier_data, temp, error_method)
+    print("\t----------------------------------------")
+    print(
+        f"\t{c_type.capitalize()} mobility = {mobility:.2E} ",
+        f"+/- {mob_error:.2E} cm^2 V^-1 s^-1",
     )
+    print("\t----------------------------------------")
 
     print(f"Calculating {c_type} trajectory anisotropy...")
-    anisotropy = plot_anisotropy(carrier_data, c_type, three_d, path)
+    xyzs = get_carrier_positions(carrier_data)
+    anisotropy = get_anisotropy(xyzs)
+    print("\t----------------------------------------")
+    print(
+        f"\t{c_type.capitalize()} charge transport anisotropy: {anisotropy:.3f}"
+    )
+    print("\t----------------------------------------")
 
-    if three_d:
-        print("Plotting hop vector distribution")
-        plot_hop_vectors(carrier_data, chromo_list, snap, c_type, path)
+    hop_freqs = None
+    if carrier_history is not None:
+        hop_freqs = get_hop_frequencies(carrier_history)
+        if freqcut[c_ind] is None:
+            print("\tDYNAMIC CUT")
+            freqcut[c_ind] = get_hist_cutoff(
+                np.log10(hop_freqs[0]), 60, min_i=-1, at_least=100, log=True
+            )
+            print(
+                "\tCluster cut-off based on hop frequency set to "
+                f"{freqcut[c_ind]}"
+            )
 
-        if carrier_history is not None:
-            print("Determining carrier hopping connections...")
-            plot_connections(chromo_list, carrier_history, c_type, path)
+    return {
+        "data": carrier_data,
+        "history": carrier_history,
+        "times": times,
+        "msds": msds,
+        "time_stderr": time_stderr,
+        "msd_stderr": msd_stderr,
+        "mobility": mobility,
+        "mobility_err": mob_error,
+        "r_squared": r_squared,
+        "xyzs": xyzs,
+        "anisotropy": anisotropy,
+        "hop_freqs": hop_freqs,
+        "drift_velocity": drift_velocity,
+    }
 
-    if carrier_history is not None:
-        print(f"Plotting {c_type} hop frequency distribution...")
-        plot_frequency_dist(c_type, carrier_history, freqcut, path)
 
-        print(f"Plotting {c_type} net hop frequency distribution...")
-        plot_net_frequency_dist(c_type, carrier_history, path)
+def _carrier_render_tasks(
+    c_type, carrier_results, chromo_list, snap, freqcut, three_d, temp, path
+):
+    """Get the plotting tasks for the results of `analyze_carrier`.
 
-        print("Plotting (total - net hops) discrepancy distribution...")
-        plot_discrepancy_frequency_dist(c_type, carrier_history, path)
-    else:
-        print(f"No history for {c_type}. Skipping frequency analysis.")
+    See `render_carrier` for the parameters.
 
-    return anisotropy, mobility, mob_error, r_squared
+    Returns
+    -------
+    list of tuple
+        Each task is a (message, function, args, kwargs) tuple which can be
+        run with `_run_render_task`.
+    """
+    carrier_data = carrier_results["data"]
+    carrier_history = carrier_results["history"]
 
+    tasks = [
+        (
+            f"Plotting distribution of {c_type} displacements",
+            plot_displacement_dist,
+            (carrier_data, c_type, path),
+            {},
+        ),
+        (
+            f"Plotting {c_type} mean squared displacements...",
+            plot_mobility_msd,
+            (
+                c_type,
+                carrier_results["times"],
+                carrier_results["msds"],
+                carrier_results["time_stderr"],
+                carrier_results["msd_stderr"],
+                temp,
+                path,
+            ),
+            {},
+        ),
+    ]
 
-def main(
-    combined_data,
-    temp,
-    chromo_list,
-    snap,
-    path,
-    three_d=False,
+    if three_d:
+        tasks += [
+            (None, plot_anisotropy, (carrier_data, c_type, three_d, path), {}),
+            (
+                "Plotting hop vector distribution",
+                plot_hop_vectors,
+                (carrier_data, chromo_list, snap, c_type, path),
+                {},
+            ),
+        ]
+        if carrier_history is not None:
+            tasks.append(
+                (
+                    "Determining carrier hopping connections...",
+                    plot_connections,
+                    (
+                        chromo_list,
+                        carrier_history,
+                        c_type,
+                        path,
+                        snap.configuration.box[:3],
+                    ),
+                    {},
+                )
+            )
+
+    if carrier_history is not None:
+        hop_freqs = carrier_results["hop_freqs"]
+        tasks += [
+            (
+                f"Plotting {c_type} hop frequency distribution...",
+                plot_frequency_dist,
+                (c_type, carrier_history, freqcut, path),
+                {"hop_freqs": hop_freqs},
+            ),
+            (
+                f"Plotting {c_type} net hop frequency distribution...",
+                plot_net_frequency_dist,
+                (c_type, carrier_history, path),
+                {"hop_freqs": hop_freqs},
+            ),
+            (
+                "Plotting (total - net hops) discrepancy distribution...",
+                plot_discrepancy_frequency_dist,
+                (c_type, carrier_history, path),
+                {"hop_freqs": hop_freqs},
+            ),
+        ]
+    else:
+        print(f"No history for {c_type}. Skipping frequency analysis.")
+    return tasks
+
+
+def _run_render_task(task):  # pragma: no cover
+    """Run one plotting task starting from a clean figure state.
+
+    All figures are closed before and after the plot so the output does not
+    depend on which tasks were run before it (or in which process).
+
+    Parameters
+    ----------
+    task : tuple
+        A (message, function, args, kwargs) tuple.
+    """
+    message, func, args, kwargs = task
+    if message is not None:
+        print(message)
+    plt.close("all")
+    func(*args, **kwargs)
+    plt.close("all")
+
+
+def _picklable_clusters(clusters):
+    """Copy the cluster attributes used by the plots into picklable objects.
+
+    freud.cluster.Cluster objects cannot be pickled, so they cannot be sent to
+    the `render` worker processes.
+
+    Parameters
+    ----------
+    clusters : list of freud.cluster.Cluster
+        The clusters for the donor and acceptor species, respectively. None is
+        given for a species which is not present.
+
+    Returns
+    -------
+    list of types.SimpleNamespace
+        Objects with the "cluster_idx", "cluster_keys", and "num_clusters"
+        attributes of each cluster.
+    """
+    return [
+        None
+        if cl is None
+        else SimpleNamespace(
+            cluster_idx=np.array(cl.cluster_idx),
+            cluster_keys=[list(i) for i in cl.cluster_keys],
+            num_clusters=cl.num_clusters,
+        )
+        for cl in clusters
+    ]
+
+
+# The plotting tasks of a render worker process, set by `_init_render_worker`
+_render_tasks = None
+
+
+def _init_render_worker(tasks, fig_dpi):  # pragma: no cover
+    """Set up a process in the `render` pool.
+
+    The task list is sent once to each worker so the shared data (e.g., the
+    chromophore list and snapshot) is not pickled for every plot.
+
+    Parameters
+    ----------
+    tasks : list of tuple
+        The tasks created by `render`.
+    fig_dpi : int
+        The resolution of the saved figures in dots per inch.
+    """
+    global plt
+    global p3
+    global dpi
+    global _render_tasks
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    try:
+        import mpl_toolkits.mplot3d as p3
+    except ImportError:
+        pass
+
+    dpi = fig_dpi
+    _render_tasks = tasks
+
+
+def _render_worker(i):  # pragma: no cover
+    """Run task `i` of `_render_tasks` in a render worker process."""
+    _run_render_task(_render_tasks[i])
+
+
+def _run_render_tasks(tasks, nprocs=1):  # pragma: no cover
+    """Run plotting tasks serially or in a pool of `nprocs` processes."""
+    if nprocs > 1:
+        with get_context("spawn").Pool(
+            processes=nprocs,
+            initializer=_init_render_worker,
+            initargs=(tasks, dpi),
+        ) as p:
+            p.map(_render_worker, range(len(tasks)), chunksize=1)
+    else:
+        for task in tasks:
+            _run_render_task(task)
+
+
+def render_carrier(
+    c_type,
+    carrier_results,
+    chromo_list,
+    snap,
+    freqcut,
+    three_d,
+    temp,
+    path,
+    nprocs=1,
+): # pragma: no cover
+    """Plot the results of `analyze_carrier`.
+
+    Parameters
+    ----------
+    c_type : str
+        The carrier type, "electron" or "hole".
+    carrier_results : dict
+        The output of `analyze_carrier`.
+    chromo_list : list of Chromophore
+        The chromophores in the simulation.
+    snap : gsd.hoomd.Snapshot
+        The simulation snapshot.
+    freqcut : list of int
+        The frequency cutoff for the donor and acceptor species, respectively.
+    three_d : bool
+        Whether to create 3D plots.
+    temp : float
+        Simulation temperature in Kelvin.
+    path : path
+        Path to directory where to save the plot.
+    nprocs : int, default 1
+        Number of processes used to render the figures, as in `render`.
+    """
+    tasks = _carrier_render_tasks(
+        c_type, carrier_results, chromo_list, snap, freqcut, three_d, temp, path
+    )
+    _run_render_tasks(tasks, nprocs)
+
+
+def carrier_plots(
+    c_type,
+    carrier_data,
+    chromo_list,
+    snap,
+    freqcut,
+    three_d,
+    temp,
+    path,
+    nprocs=1,
+): # pragma: no cover
+    """Wrap the analysis and plotting functions for each carrier type.
+
+    Parameters
+    ----------
+    c_type : str
+        The carrier type, "electron" or "hole".
+    carrier_data : dict
+        The data for one carrier type.
+    chromo_list : list of Chromophore
+        The chromophores in the simulation.
+    snap : gsd.hoomd.Snapshot
+        The simulation snapshot.
+    freqcut : list of int
+        The frequency cutoff for the donor and acceptor species, respectively.
+    three_d : bool
+        Whether to create 3D plots.
+    temp : float
+        Simulation temperature in Kelvin.
+    path : path
+        Path to directory where to save the plot.
+    nprocs : int, default 1
+        Number of processes used to render the figures. If greater than 1, the
+        plots are rendered concurrently with the Agg backend, as in `render`.
+
+    Returns
+    -------
+    anisotropy, mobility, mob_error, r_squared : float, float, float, float
+        The anisotropy, the mobility in centimeters^2/(Volt second), the
+        standard error of the mobility, and the r-squared value of the linear
+        fit.
+    """
+    results = analyze_carrier(c_type, carrier_data, temp, freqcut)
+    render_carrier(
+        c_type,
+        results,
+        chromo_list,
+        snap,
+        freqcut,
+        three_d,
+        temp,
+        path,
+        nprocs=nprocs,
+    )
+    return (
+        results["anisotropy"],
+        results["mobility"],
+        results["mobility_err"],
+        results["r_squared"],
+    )
+
+
+def analyze(
+    combined_data,
+    temp,
+    chromo_list,
+    snap,
     freqcut=[None, None],
     sepcut=[None, None],
     ocut=[None, None],
     ticut=[None, None],
-    generate_tcl=False,
-    backend=None,
     use_vrh=False,
     koopmans=None,
     boltz=False,
-):  # pragma: no cover
-    """Wrap all plotting functions.
+    chromo_mol_id=None,
+    error_method=None,
+):
+    """Compute the results of the KMC simulation without plotting.
 
     Parameters
     ----------
@@ -2033,10 +2993,6 @@ def main(
         The chromophores in the simulation.
     snap : gsd.hoomd.Snapshot
         The simulation snapshot.
-    path : path
-        Path to directory where to save the plot.
-    three_d : bool, default False
-        Whether to create 3D plots.
     freqcut : list of int, default [None, None]
         The frequency cutoff for the donor and acceptor species, respectively.
         If None is given, `get_dist_cutoff` will be used to choose a value.
@@ -2051,15 +3007,199 @@ def main(
         The transfer intergral cutoff for the donor and acceptor species,
         respectively. If None is given, `get_dist_cutoff` will be used to choose
         a value.
-    generate_tcl : bool, False
-        Whether to create a tcl file for VMD.
-    backend : str, default None
-        The name of a matplotlib backend.
     use_vrh : bool, default False
+        Whether to use variable-range hopping.
     koopmans : float, default None
         A scaling factor to apply to the rate.
     boltz : bool, default False
         Whether to use a Boltzmann energy penalty.
+    chromo_mol_id : numpy.ndarray of int, default None
+        The molecule index of each chromophore, as returned by
+        `morphct.mobility_kmc.get_molecule_ids`. If None is given, it will be
+        computed from the snapshot.
+    error_method : str, default None
+        How to estimate the error of the mobility. If None is given, the
+        standard errors of the MSDs and lifetimes are propagated (see
+        `calc_mobility`). Otherwise "bootstrap" or "jackknife" is passed to
+        `get_mobility_error`.
+
+    Returns
+    -------
+    dict
+        The analysis results. "data" contains the metrics which are written to
+        "results.csv" by `main` (e.g., "hole_mobility"). The other items
+        ("temp", "carriers", "chromo_mol_id", "energy_levels",
+        "orientations", "edges", "cutoffs", "clusters", and "hop_properties")
+        are the intermediate results needed by `render`.
+    """
+    # Copy the cutoffs so the defaults are not modified
+    freqcut, sepcut, ocut, ticut = [
+        list(i) for i in [freqcut, sepcut, ocut, ticut]
+    ]
+    box = snap.configuration.box[:3]
+    data_dict = {}
+    carriers = {}
+    for c_type, carrier_data in zip(
+        ["hole", "electron"], split_carriers(combined_data)
+    ):
+        if not carrier_data["id"]:
+            continue
+        results = analyze_carrier(
+            c_type, carrier_data, temp, freqcut, error_method=error_method
+        )
+        carriers[c_type] = results
+        data_dict[f"{c_type}_anisotropy"] = results["anisotropy"]
+        data_dict[f"{c_type}_mobility"] = results["mobility"]
+        data_dict[f"{c_type}_mobility_err"] = results["mobility_err"]
+        data_dict[f"{c_type}_mobility_r_squared"] = results["r_squared"]
+
+    if chromo_mol_id is None:
+        chromo_mol_id = get_molecule_ids(snap, chromo_list)
+
+    energy_levels = get_energy_levels(chromo_list)
+    energy_stats = get_energy_stats(energy_levels)
+    data_dict.update(energy_stats)
+    if "donor_homo_mean" in energy_stats:
+        print(
+            f"Donor HOMO Level = {energy_stats['donor_homo_mean']:.3f} "
+            f"+/- {energy_stats['donor_homo_err']:.3f}"
+        )
+        print(
+            "Donor Delta E_ij mean = "
+            f"{energy_stats['donor_delta_eij_mean']:.3f} "
+            f"+/- {energy_stats['donor_delta_eij_err']:.3f}"
+        )
+    if "acceptor_lumo_mean" in energy_stats:
+        print(
+            f"Acceptor LUMO Level = {energy_stats['acceptor_lumo_mean']:.3f} "
+            f"+/- {energy_stats['acceptor_lumo_err']:.3f}"
+        )
+        print(
+            "Acceptor Delta E_ij mean = "
+            f"{energy_stats['acceptor_delta_eij_mean']:.3f} "
+            f"+/- {energy_stats['acceptor_delta_eij_err']:.3f}"
+        )
+
+    orientations = get_orientations(chromo_list, snap)
+    edges = get_edge_table(chromo_list, chromo_mol_id, box, orientations)
+
+    # Choose the cutoffs the same way the histograms do
+    seps = get_neighbor_separations(
+        chromo_list, chromo_mol_id, box, edges=edges
+    )
+    orients = get_neighbor_orientations(
+        chromo_list, chromo_mol_id, orientations, edges=edges
+    )
+    ti_intra, ti_inter = get_neighbor_tis(
+        chromo_list, chromo_mol_id, edges=edges
+    )
+    for sp_i, sp in enumerate(["donor", "acceptor"]):
+        if sepcut[sp_i] is None and seps[sp_i]:
+            sepcut[sp_i] = get_hist_cutoff(
+                seps[sp_i], 40, pad=True, min_i=0, at_least=100
+            )
+        if ocut[sp_i] is None and orients[sp_i]:
+            ocut[sp_i] = get_hist_cutoff(
+                orients[sp_i], 40, pad=True, max_i=0, at_least=100
+            )
+        if ticut[sp_i] is None and ti_intra[sp_i] and ti_inter[sp_i]:
+            tis = ti_intra[sp_i] + ti_inter[sp_i]
+            ticut[sp_i] = get_hist_cutoff(
+                tis,
+                np.linspace(0, np.max(tis), 20),
+                min_i=-1,
+                at_least=100,
+            )
+    cutoff_dict = create_cutoff_dict(sepcut, ocut, ticut, freqcut)
+
+    clusters = get_clusters(chromo_list, snap)
+    for sp, cl in zip(["donor", "acceptor"], clusters):
+        if cl is None:
+            continue
+        n_clusters, n_large, largest, psi = get_cluster_stats(cl)
+        data_dict[f"{sp}_clusters"] = n_clusters
+        data_dict[f"{sp}_large_clusters"] = n_large
+        data_dict[f"{sp}_largest_cluster"] = largest
+        data_dict[f"{sp}_large_cluster_ratio"] = psi
+
+    prop_lists = get_hop_properties(
+        chromo_list,
+        clusters,
+        chromo_mol_id,
+        box,
+        temp,
+        use_vrh=use_vrh,
+        koopmans=koopmans,
+        boltz=boltz,
+        edges=edges,
+    )
+    for hop_type, target, sp in itertools.product(
+        ["intra", "inter"],
+        [("c", "cluster"), ("m", "molecular")],
+        ["donor", "acceptor"],
+    ):
+        val = prop_lists[f"{hop_type}_{target[0]}r{sp[0]}"]
+        if val:
+            mean = np.mean(val)
+            avg_std = np.std(val) / len(val)
+            print(
+                f"Mean {hop_type}-{target[1]} {sp} rate: "
+                f"{mean:.3e}+/-{avg_std:.3e}"
+            )
+    data_dict.update(get_hop_stats(prop_lists))
+
+    return {
+        "data": data_dict,
+        "temp": temp,
+        "carriers": carriers,
+        "chromo_mol_id": chromo_mol_id,
+        "energy_levels": energy_levels,
+        "orientations": orientations,
+        "edges": edges,
+        "cutoffs": cutoff_dict,
+        "clusters": clusters,
+        "hop_properties": prop_lists,
+    }
+
+
+def render(
+    results,
+    chromo_list,
+    snap,
+    path,
+    three_d=False,
+    generate_tcl=False,
+    backend=None,
+    dpi=300,
+    nprocs=1,
+):  # pragma: no cover
+    """Plot the results of `analyze`.
+
+    Figures are saved in a "figures" directory in `path`.
+
+    Parameters
+    ----------
+    results : dict
+        The output of `analyze`.
+    chromo_list : list of Chromophore
+        The chromophores in the simulation.
+    snap : gsd.hoomd.Snapshot
+        The simulation snapshot.
+    path : path
+        Path to directory where to save the plots.
+    three_d : bool, default False
+        Whether to create 3D plots.
+    generate_tcl : bool, False
+        Whether to create a tcl file for VMD.
+    backend : str, default None
+        The name of a matplotlib backend.
+    dpi : int, default 300
+        The resolution of the saved figures in dots per inch.
+    nprocs : int, default 1
+        Number of processes used to render the figures. If greater than 1, the
+        independent plots are rendered concurrently in a multiprocessing.Pool
+        with the Agg backend. The saved figures are the same as when they are
+        rendered serially.
     """
     # Load the matplotlib backend and the plotting subroutines
     global plt
@@ -2076,93 +3216,224 @@ def main(
         print("Could not import 3D plotting engine!")
         three_d = False
 
+    globals()["dpi"] = dpi
+
     # Create the figures path if it doesn't already exist
     fig_dir = os.path.join(path, "figures")
     os.makedirs(fig_dir, exist_ok=True)
-    # Load in all the required data
-    data_dict = {}
-    print("---------- KMC_ANALYZE ----------")
     print(f"All figures saved in {fig_dir}")
-    print("---------------------------------")
 
     box = snap.configuration.box[:3]
-    hole_data, elec_data = split_carriers(combined_data)
-    # Calculate the mobilities
-    if hole_data["id"]:
-        c_type = "hole"
-        carrier_data = hole_data
-
-        anisotropy, mobility, mob_error, r_squared = carrier_plots(
+    temp = results["temp"]
+    cutoff_dict = results["cutoffs"]
+    chromo_mol_id = results["chromo_mol_id"]
+    # The serial and parallel paths plot the same (picklable) inputs
+    clusters = _picklable_clusters(results["clusters"])
+    edges = results["edges"]
+    tasks = []
+    for c_type, carrier_results in results["carriers"].items():
+        tasks += _carrier_render_tasks(
             c_type,
-            carrier_data,
+            carrier_results,
             chromo_list,
             snap,
-            freqcut,
+            cutoff_dict["freq"],
             three_d,
             temp,
             fig_dir,
         )
 
-        data_dict[f"{c_type}_anisotropy"] = anisotropy
-        data_dict[f"{c_type}_mobility"] = mobility
-        data_dict[f"{c_type}_mobility_err"] = mob_error
-        data_dict[f"{c_type}_mobility_r_squared"] = r_squared
-
-    if elec_data["id"]:
-        c_type = "electron"
-        carrier_data = elec_data
+    tasks += [
+        (
+            None,
+            plot_energy_levels,
+            (chromo_list, {}, fig_dir),
+            {"energy_levels": results["energy_levels"]},
+        ),
+        (
+            None,
+            plot_neighbor_hist,
+            (
+                chromo_list,
+                chromo_mol_id,
+                box,
+                cutoff_dict["separation"],
+                fig_dir,
+            ),
+            {"edges": edges},
+        ),
+        (
+            None,
+            plot_orientation_hist,
+            (
+                chromo_list,
+                chromo_mol_id,
+                results["orientations"],
+                cutoff_dict["orientation"],
+                fig_dir,
+            ),
+            {"edges": edges},
+        ),
+        (
+            None,
+            plot_ti_hist,
+            (chromo_list, chromo_mol_id, cutoff_dict["ti"], fig_dir),
+            {"edges": edges},
+        ),
+    ]
 
-        anisotropy, mobility, mob_error, r_squared = carrier_plots(
-            c_type,
-            carrier_data,
-            chromo_list,
-            snap,
-            freqcut,
-            three_d,
-            temp,
-            fig_dir,
+    if three_d:
+        tasks.append(
+            (
+                "Plotting 3D cluster location plot...",
+                plot_clusters_3D,
+                (chromo_list, clusters, box, generate_tcl, path),
+                {},
+            )
         )
 
-        data_dict[f"{c_type}_anisotropy"] = anisotropy
-        data_dict[f"{c_type}_mobility"] = mobility
-        data_dict[f"{c_type}_mobility_err"] = mob_error
-        data_dict[f"{c_type}_mobility_r_squared"] = r_squared
-
-    # Now plot the distributions!
-    chromo_mol_id = get_molecule_ids(snap, chromo_list)
-
-    plot_energy_levels(chromo_list, data_dict, fig_dir)
+    tasks += [
+        (
+            None,
+            plot_mixed_hopping_rates,
+            (
+                chromo_list,
+                clusters,
+                chromo_mol_id,
+                {},
+                cutoff_dict,
+                temp,
+                fig_dir,
+            ),
+            {"prop_lists": results["hop_properties"]},
+        ),
+        (
+            "Plotting cluster size distribution...",
+            plot_cluster_size_dist,
+            (clusters, fig_dir),
+            {},
+        ),
+    ]
 
-    orientations = get_orientations(chromo_list, snap)
+    _run_render_tasks(tasks, nprocs)
 
-    plot_neighbor_hist(chromo_list, chromo_mol_id, box, sepcut, fig_dir)
-    plot_orientation_hist(
-        chromo_list, chromo_mol_id, orientations, ocut, fig_dir
-    )
-    plot_ti_hist(chromo_list, chromo_mol_id, ticut, fig_dir)
-    cutoff_dict = create_cutoff_dict(sepcut, ocut, ticut, freqcut)
 
-    clusters = get_clusters(chromo_list, snap)
+def main(
+    combined_data,
+    temp,
+    chromo_list,
+    snap,
+    path,
+    three_d=False,
+    freqcut=[None, None],
+    sepcut=[None, None],
+    ocut=[None, None],
+    ticut=[None, None],
+    generate_tcl=False,
+    backend=None,
+    use_vrh=False,
+    koopmans=None,
+    boltz=False,
+    chromo_mol_id=None,
+    plot=True,
+    dpi=300,
+    plot_nprocs=1,
+    error_method=None,
+):  # pragma: no cover
+    """Analyze the KMC results and optionally plot them.
 
-    if three_d:
-        print("Plotting 3D cluster location plot...")
-        plot_clusters_3D(chromo_list, clusters, box, generate_tcl, path)
+    Parameters
+    ----------
+    combined_data : dict
+        The data for both carrier types.
+    temp : float
+        Simulation temperature in Kelvin.
+    chromo_list : list of Chromophore
+        The chromophores in the simulation.
+    snap : gsd.hoomd.Snapshot
+        The simulation snapshot.
+    path : path
+        Path to directory where to save the plot.
+    three_d : bool, default False
+        Whether to create 3D plots.
+    freqcut : list of int, default [None, None]
+        The frequency cutoff for the donor and acceptor species, respectively.
+        If None is given, `get_dist_cutoff` will be used to choose a value.
+    sepcut : list of float, default [None, None]
+        The cutoff distances for the donor and acceptor species, respectively.
+        If None is given, `get_dist_cutoff` will be used to choose a value.
+    ocut : list of float, default [None, None]
+        The cutoff orientation angles for the donor and acceptor species,
+        respectively. If None is given, `get_dist_cutoff` will be used to choose
+        a value.
+    ticut : list of float, default [None, None]
+        The transfer intergral cutoff for the donor and acceptor species,
+        respectively. If None is given, `get_dist_cutoff` will be used to choose
+        a value.
+    generate_tcl : bool, False
+        Whether to create a tcl file for VMD.
+    backend : str, default None
+        The name of a matplotlib backend.
+    use_vrh : bool, default False
+    koopmans : float, default None
+        A scaling factor to apply to the rate.
+    boltz : bool, default False
+        Whether to use a Boltzmann energy penalty.
+    chromo_mol_id : numpy.ndarray of int, default None
+        The molecule index of each chromophore, as returned by
+        `morphct.mobility_kmc.get_molecule_ids`. If None is given, it will be
+        computed from the snapshot.
+    plot : bool, default True
+        Whether to plot the results. If False, only the metrics are computed
+        and matplotlib is never imported.
+    dpi : int, default 300
+        The resolution of the saved figures in dots per inch.
+    plot_nprocs : int, default 1
+        Number of processes used to render the figures (see `render`).
+    error_method : str, default None
+        How to estimate the error of the mobility. If None is given, the
+        standard errors of the MSDs and lifetimes are propagated (see
+        `calc_mobility`). Otherwise "bootstrap" or "jackknife" is passed to
+        `get_mobility_error`.
 
-    plot_mixed_hopping_rates(
-        chromo_list,
-        clusters,
-        chromo_mol_id,
-        data_dict,
-        cutoff_dict,
+    Returns
+    -------
+    dict
+        The analysis results which are also written to "results.csv".
+    """
+    print("---------- KMC_ANALYZE ----------")
+    results = analyze(
+        combined_data,
         temp,
-        fig_dir,
+        chromo_list,
+        snap,
+        freqcut=freqcut,
+        sepcut=sepcut,
+        ocut=ocut,
+        ticut=ticut,
         use_vrh=use_vrh,
         koopmans=koopmans,
         boltz=boltz,
+        chromo_mol_id=chromo_mol_id,
+        error_method=error_method,
     )
+    print("---------------------------------")
 
-    print("Plotting cluster size distribution...")
-    plot_cluster_size_dist(clusters, fig_dir)
+    if plot:
+        render(
+            results,
+            chromo_list,
+            snap,
+            path,
+            three_d=three_d,
+            generate_tcl=generate_tcl,
+            backend=backend,
+            dpi=dpi,
+            nprocs=plot_nprocs,
+        )
 
+    data_dict = results["data"]
     print("Writing CSV Output File...")
+    os.makedirs(path, exist_ok=True)
     write_csv(data_dict, path)
+    return data_dict
@@ -0,0 +1,268 @@
+import inspect
+
+import numpy as np
+from scipy.sparse import coo_matrix, diags
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import LinearOperator, lgmres, spilu, spsolve
+
+from morphct.mobility_kmc import get_rate_table
+
+# The relative tolerance of lgmres was renamed in newer versions of scipy
+if "rtol" in inspect.signature(lgmres).parameters:
+    _tol_kwarg = "rtol"
+else:  # pragma: no cover
+    _tol_kwarg = "tol"
+
+
+def get_rate_matrix(rate_table, n):
+    """Get the sparse matrix of the hop rates.
+
+    Parameters
+    ----------
+    rate_table : dict
+        The hop rates of every neighbor pair, as returned by
+        `morphct.mobility_kmc.get_rate_table`.
+    n : int
+        The number of chromophores.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix (n, n)
+        The rate of hopping from chromophore i to chromophore j in inverse
+        seconds, summed over the periodic images of j. Hops without a transfer
+        integral have no entry.
+    """
+    rates = np.nan_to_num(rate_table["rate"])
+    rate_matrix = coo_matrix(
+        (rates, (rate_table["i"], rate_table["j"])), shape=(n, n)
+    ).tocsr()
+    rate_matrix.eliminate_zeros()
+    return rate_matrix
+
+
+def get_steady_state(rate_matrix, solver="iterative", tol=1e-10):
+    """Solve the master equation for the steady-state occupations.
+
+    The occupation probabilities p satisfy sum_i p_i W_ij = p_j sum_k W_jk.
+    The occupation of the first chromophore is fixed, which makes the system
+    nonsingular, and the result is normalized.
+
+    Parameters
+    ----------
+    rate_matrix : scipy.sparse.csr_matrix (n, n)
+        The hop rates, as returned by `get_rate_matrix`. The rate graph must
+        be strongly connected.
+    solver : str, default "iterative"
+        "iterative" uses LGMRES with an incomplete LU preconditioner and falls
+        back to a direct solve if it does not converge, and "direct" uses a
+        sparse direct solve.
+    tol : float, default 1e-10
+        The relative tolerance of the iterative solver.
+
+    Returns
+    -------
+    numpy.ndarray (n,)
+        The occupation probability of each chromophore.
+    """
+    if solver not in ["iterative", "direct"]:
+        raise ValueError(
+            f"Unknown solver {solver}. Use 'iterative' or 'direct'."
+        )
+    n = rate_matrix.shape[0]
+    if n == 1:
+        return np.ones(1)
+    out_rates = np.asarray(rate_matrix.sum(axis=1)).ravel()
+    # Divide by the fastest rate so the matrix entries are of order one
+    scale = out_rates.max()
+    matrix = ((rate_matrix.T - diags(out_rates)) / scale).tocsc()
+    a = matrix[1:, 1:].tocsc()
+    b = -matrix[1:, 0].toarray().ravel()
+
+    x = None
+    if solver == "iterative":
+        try:
+            ilu = spilu(a, drop_tol=1e-6, fill_factor=20)
+        except RuntimeError:
+            # The incomplete factorization is singular
+            ilu = None
+        if ilu is not None:
+            precond = LinearOperator(a.shape, ilu.solve)
+            x, info = lgmres(a, b, M=precond, atol=0, **{_tol_kwarg: tol})
+            if info != 0:
+                x = None
+    if x is None:
+        x = spsolve(a, b)
+
+    occupations = np.concatenate([[1.0], x])
+    # Round-off can make tiny occupations negative
+    occupations = np.clip(occupations, 0, None)
+    return occupations / occupations.sum()
+
+
+def get_transport_sites(rate_matrix, sites):
+    """Get the largest strongly connected group of the chromophores.
+
+    Carriers can reach every chromophore of a strongly connected group from
+    every other, so this is where the steady state is found. The other
+    chromophores are either traps or only visited on the way into the group.
+
+    Parameters
+    ----------
+    rate_matrix : scipy.sparse.csr_matrix (n, n)
+        The hop rates, as returned by `get_rate_matrix`.
+    sites : numpy.ndarray of int
+        The indices of the chromophores which are considered, e.g. the
+        donors for holes.
+
+    Returns
+    -------
+    numpy.ndarray of int
+        The sorted indices of the chromophores in the largest strongly
+        connected group.
+    """
+    sites = np.asarray(sites, dtype=int)
+    sub_matrix = rate_matrix[sites][:, sites]
+    _, labels = connected_components(
+        sub_matrix, directed=True, connection="strong"
+    )
+    largest = np.argmax(np.bincount(labels))
+    return sites[labels == largest]
+
+
+def get_drift_velocity(rate_table, centers, box, occupations):
+    """Get the drift velocity of a carrier from its occupations.
+
+    Parameters
+    ----------
+    rate_table : dict
+        The hop rates of every neighbor pair, as returned by
+        `morphct.mobility_kmc.get_rate_table`.
+    centers : numpy.ndarray (n, 3)
+        The chromophore centers in Angstroms.
+    box : numpy.ndarray, shape (3,)
+        The lengths of the box vectors in Angstroms.
+    occupations : numpy.ndarray (n,)
+        The occupation probability of each chromophore.
+
+    Returns
+    -------
+    numpy.ndarray (3,)
+        The drift velocity in meters/second.
+    """
+    i = rate_table["i"]
+    j = rate_table["j"]
+    hop_vectors = (centers[j] + rate_table["image"] * box - centers[i]) * 1e-10
+    fluxes = occupations[i] * np.nan_to_num(rate_table["rate"])
+    return fluxes @ hop_vectors
+
+
+def get_mobility_tensor(
+    chromo_list,
+    box,
+    temp,
+    c_type="hole",
+    field=1e5,
+    hopping_prefactor=1.0,
+    use_vrh=False,
+    boltz=False,
+    solver="iterative",
+    tol=1e-10,
+):
+    """Get the mobility tensor of non-interacting carriers without KMC.
+
+    The steady-state occupations of a carrier under a small field along each
+    axis, and the opposite field, are found from the master equation (see
+    `get_steady_state`). The mobility is the change in the drift velocity
+    with the field, which has no statistical noise. Only the largest strongly
+    connected group of chromophores of the carrier species is used (see
+    `get_transport_sites`).
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores in the simulation, with their energies set.
+    box : numpy.ndarray, shape (3,)
+        The lengths of the box vectors in Angstroms. Box is assumed to be
+        orthogonal.
+    temp : float
+        The temperature in Kelvin.
+    c_type : str, default "hole"
+        The carrier type, "electron" (on acceptors) or "hole" (on donors).
+    field : float, default 1e5
+        The strength of the applied field in Volts/meter. It must be small
+        enough that the drift velocity is linear in the field.
+    hopping_prefactor : float, default 1.0
+        A prefactor to the rate equation.
+    use_vrh : bool, default False
+        Whether to use variable-range hopping.
+    boltz : bool, default False
+        Whether to use a Boltzmann energy penalty.
+    solver : str, default "iterative"
+        The linear solver, see `get_steady_state`.
+    tol : float, default 1e-10
+        The relative tolerance of the iterative solver.
+
+    Returns
+    -------
+    dict
+        The mobility tensor ("mobility_tensor", where element (a, b) is the
+        drift velocity along a per unit field along b) and its average
+        diagonal element ("mobility") in centimeters^2/(Volt second), the
+        indices of the chromophores used ("chromo_ids"), and their
+        steady-state occupations without a field ("occupations").
+    """
+    if c_type not in ["hole", "electron"]:
+        raise ValueError(f"Unknown carrier type {c_type}.")
+    species = "donor" if c_type == "hole" else "acceptor"
+    rate_kwargs = {
+        "hopping_prefactor": hopping_prefactor,
+        "use_vrh": use_vrh,
+        "boltz": boltz,
+    }
+    n = len(chromo_list)
+    centers = np.array([chromo.center for chromo in chromo_list])
+    box = np.asarray(box)
+
+    rate_table = get_rate_table(chromo_list, box, temp, **rate_kwargs)
+    sites = [
+        i for i, chromo in enumerate(chromo_list) if chromo.species == species
+    ]
+    if not sites:
+        raise ValueError(f"There are no {species} chromophores.")
+    chromo_ids = get_transport_sites(get_rate_matrix(rate_table, n), sites)
+
+    def _solve(rate_table):
+        rate_matrix = get_rate_matrix(rate_table, n)
+        rate_matrix = rate_matrix[chromo_ids][:, chromo_ids]
+        occupations = np.zeros(n)
+        occupations[chromo_ids] = get_steady_state(
+            rate_matrix, solver=solver, tol=tol
+        )
+        return occupations
+
+    # Holes drift along the field and electrons against it
+    sign = 1 if c_type == "hole" else -1
+    tensor = np.zeros((3, 3))
+    for axis in range(3):
+        velocities = []
+        for direction in [1, -1]:
+            field_vector = np.zeros(3)
+            field_vector[axis] = direction * field
+            field_table = get_rate_table(
+                chromo_list, box, temp, field=field_vector, **rate_kwargs
+            )
+            velocities.append(
+                get_drift_velocity(
+                    field_table, centers, box, _solve(field_table)
+                )
+            )
+        # m^2/(V s) -> cm^2/(V s)
+        tensor[:, axis] = sign * (velocities[0] - velocities[1]) / (2 * field)
+    tensor *= 1e4
+
+    return {
+        "mobility_tensor": tensor,
+        "mobility": np.trace(tensor) / 3,
+        "chromo_ids": chromo_ids,
+        "occupations": _solve(rate_table)[chromo_ids],
+    }
@@ -1,3 +1,6 @@
+import heapq
+import itertools
+import json
 import math
 import multiprocessing as mp
 import os
@@ -5,11 +8,11 @@ from sys import platform
 import time
 import warnings
 
-import freud
 import numpy as np
-from scipy.sparse import lil_matrix
+from scipy.sparse import coo_matrix, lil_matrix
 
 from morphct import helper_functions as hf
+from morphct.chromophores import get_neighbor_arrays
 from morphct.helper_functions import v_print
 
 
@@ -42,8 +45,9 @@ class Carrier:
        A maximum number of hops used to kill the KMC run.
     record_history : bool, default True
         Whether to record the carrier history in the form of a sparse matrix.
-    mol_id_dict : dict, default None
-        A dictionary that maps the chromophore index to the molecule index.
+    mol_id_dict : numpy.ndarray of int or dict, default None
+        Maps the chromophore index to the molecule index, as returned by
+        `get_molecule_ids`.
 
         >>> mol_id_dict[chromophore_index]
         ... molecule_index
@@ -63,6 +67,14 @@ class Carrier:
         Whether to use variable-range hopping.
     hopping_prefactor : float, default 1.0
         A prefactor to the rate equation.
+    checkpoint_times : numpy.ndarray, default None
+        Times in seconds at which to record the unwrapped position of the
+        carrier, e.g. from `get_checkpoint_times`. This allows the mean squared
+        displacement at many times to be calculated from one trajectory. If
+        None is given, only the final position is known.
+    field : numpy.ndarray, shape (3,), default None
+        The applied electric field in Volts/meter (see `get_rate_table`). Not
+        supported with `use_avg_hoprates`.
 
     Attributes
     ----------
@@ -92,12 +104,16 @@ class Carrier:
         The carrier type, "electron" or "hole".
     n_hops : int
         The number of hops the carrier has performed.
+    n_unscaled_hops : float
+        The estimated number of hops the carrier would have performed without
+        superbasin rate scaling (see `scale_superbasins`). Each hop within a
+        superbasin whose rates were scaled by alpha counts as 1/alpha hops.
     box : numpy.ndarray
         The lengths of the box vectors of the simulation box.
     displacement : float
         The net displacement of the carrier in Angstroms.
-    mol_id_dict : dict
-        A dictionary that maps the chromophore index to the molecule index.
+    mol_id_dict : numpy.ndarray of int or dict
+        Maps the chromophore index to the molecule index.
     use_avg_hoprates : bool
        Whether to use the average hop rates instead of calculating each hop.
     avg_intra_rate : float
@@ -115,11 +131,27 @@ class Carrier:
         exp(r/vrh_delocalization) when `use_vrh` is True.
     hopping_prefactor : float
         A prefactor to the rate equation.
+    checkpoint_times : numpy.ndarray
+        The sorted checkpoint times in seconds, or None.
+    checkpoint_positions : numpy.ndarray (N_checkpoints, 3)
+        The unwrapped position of the carrier in Angstroms at each checkpoint
+        time, or None. Checkpoints which were not reached (e.g., because of
+        the hop limit) are NaN.
+    field : numpy.ndarray, shape (3,)
+        The applied electric field in Volts/meter, or None.
+    walltime : float
+        The wall time in seconds taken to simulate this carrier.
+    timings : dict of float
+        The wall time in seconds spent in each part of `calculate_hop`:
+        looking up or computing the rates ("rates"), drawing the hop times
+        ("rng"), picking the hop ("selection"), and moving the carrier and
+        updating its history ("history").
 
     Methods
     -------
     update_displacement()
-    calculate_hop(chromo_list, verbose=0)
+    record_checkpoints(until, inclusive=False)
+    calculate_hop(chromo_list, verbose=0, rate_table=None, logger=None)
     perform_hop(destination_chromo, hop_time, rel_image)
     """
     def __init__(
@@ -140,6 +172,8 @@ class Carrier:
         boltz=False,
         use_vrh=False,
         hopping_prefactor=1.0,
+        checkpoint_times=None,
+        field=None,
     ):
         both_rates = avg_inter_rate is None and avg_intra_rate is None
         any_rate = avg_inter_rate is None or avg_intra_rate is None
@@ -162,6 +196,11 @@ class Carrier:
                 "(mol_id_dict) must also be provided"
             )
 
+        if use_avg_hoprates and field is not None:
+            raise ValueError(
+                "An applied field is not supported with use_avg_hoprates"
+            )
+
         self.id = carrier_no
         self.image = np.array([0, 0, 0])
         self.initial_chromo = chromo
@@ -184,6 +223,7 @@ class Carrier:
                 self.electron_history = lil_matrix((n, n), dtype=int)
 
         self.n_hops = 0
+        self.n_unscaled_hops = 0.0
         self.box = box
         self.displacement = 0
         self.mol_id_dict = mol_id_dict
@@ -203,6 +243,22 @@ class Carrier:
             self.vrh_delocalization = self.current_chromo.vrh_delocalization
 
         self.hopping_prefactor = hopping_prefactor
+        self.field = None if field is None else np.asarray(field, dtype=float)
+
+        self.walltime = 0.0
+        self.timings = dict.fromkeys(
+            ["rates", "rng", "selection", "history"], 0.0
+        )
+
+        self.checkpoint_times = None
+        self.checkpoint_positions = None
+        if checkpoint_times is not None:
+            self.checkpoint_times = np.sort(
+                np.asarray(checkpoint_times, dtype=float)
+            )
+            self.checkpoint_positions = np.full(
+                (len(self.checkpoint_times), 3), np.nan
+            )
 
     def update_displacement(self):
         """Update the carrier displacement accounting for periodic boundary.
@@ -215,7 +271,34 @@ class Carrier:
         displacement = final_pos - init_pos + self.image * self.box
         self.displacement = np.linalg.norm(displacement)
 
-    def calculate_hop(self, chromo_list, verbose=0):
+    def record_checkpoints(self, until, inclusive=False):
+        """Record the current position at the checkpoints before `until`.
+
+        The carrier is on the current chromophore from `current_time` until
+        `until`, so this is its position at the checkpoints in between.
+
+        Parameters
+        ----------
+        until : float
+            The time in seconds at which the carrier leaves the current
+            chromophore.
+        inclusive : bool, default False
+            Whether a checkpoint at exactly `until` is included.
+        """
+        if self.checkpoint_times is None:
+            return
+        start = np.searchsorted(self.checkpoint_times, self.current_time)
+        end = np.searchsorted(
+            self.checkpoint_times, until, side="right" if inclusive else "left"
+        )
+        if end > start:
+            self.checkpoint_positions[start:end] = (
+                self.current_chromo.center + self.image * self.box
+            )
+
+    def calculate_hop(
+        self, chromo_list, verbose=0, rate_table=None, logger=None
+    ):
         """Calculate a hop for this carrier.
 
         Parameters
@@ -223,7 +306,15 @@ class Carrier:
         chromo_list : list of Chromophore
             The chromophore objects in the simulation.
         verbose : int, default 0
-            The verbosity level of output.
+            The verbosity level of output. Not used if `logger` is given.
+        rate_table : dict, default None
+            The hop rates of every neighbor pair, as returned by
+            `get_rate_table` with the same parameters as this carrier. If None
+            is given, the rates to the neighbors of the current chromophore
+            are computed for this hop.
+        logger : morphct.helper_functions.Logger, default None
+            The logger of the hop times, which are logged at verbosity above
+            1. If None is given, they are printed to stdout.
 
         Returns
         -------
@@ -234,97 +325,105 @@ class Carrier:
         if self.hop_limit is not None:
             if self.n_hops + 1 > self.hop_limit:
                 return False
+        t0 = time.perf_counter()
         # Determine the hop times to all possible neighbors
-        hop_times = []
+        current_id = self.current_chromo.id
         if self.use_avg_hoprates:
             # Use the average hop values given in the parameter dict to pick a
             # hop
-            for i, img in self.current_chromo.neighbors:
-                neighbor = chromo_list[i]
-                assert neighbor.id == i
-
-                current_mol = self.mol_id_dict[self.current_chromo.id]
-                neighbor_mol = self.mol_id_dict[neighbor.id]
-                if current_mol == neighbor_mol:
-                    hop_rate = self.avg_intra_rate
-                else:
-                    hop_rate = self.avg_inter_rate
-                hop_time = hf.get_event_tau(hop_rate)
-                # Keep track of the chromophoreid and the corresponding tau
-                hop_times.append([neighbor.id, hop_time, img])
+            n_inds = np.array(
+                [n for n, _ in self.current_chromo.neighbors], dtype=int
+            )
+            rel_imgs = np.array(
+                [img for _, img in self.current_chromo.neighbors], dtype=int
+            ).reshape(-1, 3)
+            current_mol = self.mol_id_dict[current_id]
+            rates = np.array(
+                [
+                    self.avg_intra_rate
+                    if self.mol_id_dict[n] == current_mol
+                    else self.avg_inter_rate
+                    for n in n_inds
+                ],
+                dtype=float,
+            )
+            scales = np.ones(len(n_inds))
         else:
-            # Obtain the reorganization energy in J (from eV)
-            for i_neighbor, ti in enumerate(self.current_chromo.neighbors_ti):
-                # Ignore any hops with a NoneType transfer integral
-                if ti is None:
-                    continue
-                # index of the neighbor in the main list
-                n_ind = self.current_chromo.neighbors[i_neighbor][0]
-                delta_E_ij = self.current_chromo.neighbors_delta_e[i_neighbor]
-                # Load the specified hopping prefactor
-                prefactor = self.hopping_prefactor
-                # Get the relative image so we can update the carrier image
-                # after the hop
-                rel_img = self.current_chromo.neighbors[i_neighbor][1]
-                # All of the energies are in eV currently, so convert them to J
-                if self.use_vrh is True:
-                    neighbor_chromo = chromo_list[n_ind]
-                    neighbor_pos = neighbor_chromo.center + rel_img * self.box
-
-                    # Chromophore separation needs converting to m
-                    sep = (
-                        np.linalg.norm(
-                            self.current_chromo.center - neighbor_pos
-                        )
-                        * 1e-10
-                    )
+            if rate_table is None:
+                rate_table = get_rate_table(
+                    chromo_list,
+                    self.box,
+                    self.temp,
+                    hopping_prefactor=self.hopping_prefactor,
+                    use_vrh=self.use_vrh,
+                    boltz=self.boltz,
+                    chromo_ids=[current_id],
+                    field=self.field,
+                )
+                start, end = 0, len(rate_table["j"])
+            else:
+                start = rate_table["indptr"][current_id]
+                end = rate_table["indptr"][current_id + 1]
+            # Ignore any hops with a NoneType transfer integral
+            valid = ~np.isnan(rate_table["rate"][start:end])
+            n_inds = rate_table["j"][start:end][valid]
+            rel_imgs = rate_table["image"][start:end][valid]
+            rates = rate_table["rate"][start:end][valid]
+            if "scale" in rate_table:
+                scales = rate_table["scale"][start:end][valid]
+            else:
+                scales = np.ones(len(n_inds))
+        t1 = time.perf_counter()
+        hop_times = hf.get_event_taus(rates)
+        t2 = time.perf_counter()
+        self.timings["rates"] += t1 - t0
+        self.timings["rng"] += t2 - t1
 
-                    hop_rate = hf.get_hop_rate(
-                        self.lambda_ij,
-                        ti,
-                        delta_E_ij,
-                        prefactor,
-                        self.temp,
-                        use_vrh=True,
-                        rij=sep,
-                        vrh=self.vrh_delocalization,
-                        boltz=self.boltz,
-                    )
-                else:
-                    hop_rate = hf.get_hop_rate(
-                        self.lambda_ij,
-                        ti,
-                        delta_E_ij,
-                        prefactor,
-                        self.temp,
-                        boltz=self.boltz,
-                    )
-                hop_time = hf.get_event_tau(hop_rate)
-                # Keep track of the chromophoreid and the corresponding tau
-                hop_times.append([n_ind, hop_time, rel_img])
-        # Sort by ascending hop time
-        hop_times.sort(key=lambda x: x[1])
         if len(hop_times) == 0:
             # We are trapped here, so create a dummy hop with time 1E99
-            hop_times = [[self.current_chromo.id, 1e99, [0, 0, 0]]]
+            n_inds = np.array([current_id])
+            hop_times = np.array([1e99])
+            rel_imgs = np.zeros((1, 3), dtype=int)
+            scales = np.ones(1)
+        # Take the quickest hop
+        fastest = np.argmin(hop_times)
         # As long as we're not limiting by the number of hops:
         if self.hop_limit is None:
             # Ensure that the next hop does not put the carrier over its
             # lifetime
-            if (self.current_time + hop_times[0][1]) > self.lifetime:
+            if (self.current_time + hop_times[fastest]) > self.lifetime:
+                # The carrier stays here until the end of its lifetime
+                self.record_checkpoints(self.lifetime, inclusive=True)
+                self.timings["selection"] += time.perf_counter() - t2
                 # Send the termination signal to singleCoreRunKMC.py
                 return False
         # Move the carrier and send the contiuation signal to
         # singleCoreRunKMC.py
-        # Take the quickest hop
-        n_ind, hop_time, rel_img = hop_times[0]
-
-        v_print("\thop_times:", verbose, v_level=1)
-        hop_str = "\n".join([f"\t\t{i} {j:.2e} {k}" for (i, j, k) in hop_times])
-        v_print(hop_str, verbose, v_level=1)
-        v_print(f"\tHopping to {n_ind}", verbose, v_level=1)
+        n_ind = n_inds[fastest]
+        self.timings["selection"] += time.perf_counter() - t2
+
+        if logger is None and verbose > 1:
+            logger = hf.Logger(verbose)
+        # Only build the hop table if it will be logged
+        if logger is not None and logger.enabled(v_level=1):
+            # Sort by ascending hop time. Python scalars and lists format
+            # much faster than numpy ones.
+            order = np.argsort(hop_times, kind="stable").tolist()
+            inds = n_inds.tolist()
+            times = hop_times.tolist()
+            imgs = rel_imgs.tolist()
+            hop_str = "\n".join(
+                [f"\t\t{inds[i]} {times[i]:.2e} {imgs[i]}" for i in order]
+            )
+            logger.log("\thop_times:\n{}", hop_str, v_level=1)
+            logger.log("\tHopping to {}", n_ind, v_level=1)
 
-        self.perform_hop(chromo_list[n_ind], hop_time, rel_img)
+        t4 = time.perf_counter()
+        self.n_unscaled_hops += 1 / scales[fastest]
+        self.perform_hop(
+            chromo_list[n_ind], hop_times[fastest], rel_imgs[fastest]
+        )
+        self.timings["history"] += time.perf_counter() - t4
         return True
 
     def perform_hop(self, destination_chromo, hop_time, rel_image):
@@ -341,6 +440,7 @@ class Carrier:
         """
         init_id = self.current_chromo.id
         dest_id = destination_chromo.id
+        self.record_checkpoints(self.current_time + hop_time)
         self.image += rel_image
         # Carrier image now sorted, so update its current position
         self.current_chromo = destination_chromo
@@ -355,6 +455,258 @@ class Carrier:
             self.electron_history[init_id, dest_id] += 1
 
 
+def get_valid_carriers(lifetimes, current_times, n_hops):
+    """Find the carriers which are used to calculate the mobility.
+
+    Carriers whose final time is more than double (or less than half of) their
+    lifetime, or which only hopped once, are discarded.
+
+    Parameters
+    ----------
+    lifetimes : float or numpy.ndarray
+        The carrier lifetimes in seconds.
+    current_times : float or numpy.ndarray
+        The final times of the carriers in seconds.
+    n_hops : int or numpy.ndarray
+        The number of hops of the carriers.
+
+    Returns
+    -------
+    bool or numpy.ndarray of bool
+        Whether each carrier is kept.
+    """
+    lifetimes = np.asarray(lifetimes)
+    current_times = np.asarray(current_times)
+    return (
+        (current_times <= lifetimes * 2)
+        & (current_times >= lifetimes / 2)
+        & (np.asarray(n_hops) != 1)
+    )
+
+
+class MobilityAccumulator:
+    """Running estimates of the carrier mobilities.
+
+    The mean squared displacement of each carrier type and lifetime is updated
+    with Welford's algorithm as carriers finish, so the mobility and its
+    standard error are available at any time without storing the carriers.
+    The same carriers are used as in `morphct.kmc_analyze.get_times_msds`
+    (see `get_valid_carriers`).
+
+    A carrier with checkpoints adds to the MSD at every checkpoint, so these
+    MSDs are correlated. The MSD slope of each such carrier is then also
+    accumulated, and the error of the mobility is found from the spread of
+    these slopes, like the jackknife of
+    `morphct.kmc_analyze.get_mobility_error`.
+
+    Parameters
+    ----------
+    temp : float
+        The temperature in Kelvin.
+    c_types : list of str, default []
+        The carrier types which are expected, e.g. ["hole"].
+    lifetimes : list of float, default []
+        The carrier lifetimes which are expected. Every expected combination
+        of carrier type and lifetime must have carriers before `converged`
+        can be True.
+
+    Attributes
+    ----------
+    temp : float
+        The temperature in Kelvin.
+    stats : dict
+        The [count, mean, sum of squared deviations] of the squared
+        displacements in meters^2, keyed by (carrier type, lifetime).
+    slope_stats : dict
+        The [count, mean, sum of squared deviations] of the MSD slopes in
+        meters^2/second of the carriers with checkpoints, keyed by carrier
+        type.
+    n_discarded : int
+        The number of carriers which were not used.
+
+    Methods
+    -------
+    add(carrier)
+    get_msds(c_type)
+    get_mobility(c_type)
+    converged(target_rse, min_carriers=10)
+    """
+
+    def __init__(self, temp, c_types=[], lifetimes=[]):
+        self.temp = temp
+        self.stats = {
+            key: [0, 0.0, 0.0]
+            for key in itertools.product(c_types, sorted(set(lifetimes)))
+        }
+        self.slope_stats = {}
+        self.n_discarded = 0
+
+    def add(self, carrier):
+        """Add the displacement of a finished carrier.
+
+        If the carrier has checkpoints, the displacement at every checkpoint
+        which was reached is added with the checkpoint time as its lifetime.
+
+        Parameters
+        ----------
+        carrier : Carrier
+            The carrier, after `Carrier.update_displacement` has been called.
+        """
+        if getattr(carrier, "checkpoint_times", None) is not None:
+            disps = carrier.checkpoint_positions - carrier.initial_chromo.center
+            reached = np.isfinite(disps[:, 0])
+            if not np.any(reached):
+                self.n_discarded += 1
+                return
+            # A -> m
+            squared_disps = np.sum(disps[reached] ** 2, axis=1) * 1e-20
+            times = carrier.checkpoint_times[reached]
+            for t, squared_disp in zip(times, squared_disps):
+                self._update(carrier.c_type, t, squared_disp)
+            if len(times) > 1:
+                centered = times - times.mean()
+                weights = centered / np.sum(centered ** 2)
+                stats = self.slope_stats.setdefault(
+                    carrier.c_type, [0, 0.0, 0.0]
+                )
+                _welford(stats, weights @ squared_disps)
+            return
+        if not get_valid_carriers(
+            carrier.lifetime, carrier.current_time, carrier.n_hops
+        ):
+            self.n_discarded += 1
+            return
+        # A -> m
+        squared_disp = (carrier.displacement * 1e-10) ** 2
+        self._update(carrier.c_type, carrier.lifetime, squared_disp)
+
+    def _update(self, c_type, lifetime, squared_disp):
+        stats = self.stats.setdefault((c_type, lifetime), [0, 0.0, 0.0])
+        _welford(stats, squared_disp)
+
+    def get_msds(self, c_type):
+        """Get the current mean squared displacements of a carrier type.
+
+        Parameters
+        ----------
+        c_type : str
+            The carrier type, "electron" or "hole".
+
+        Returns
+        -------
+        lifetimes, counts, msds, msd_stderr : numpy.ndarray
+            The lifetimes in seconds (sorted), the number of carriers, the
+            mean squared displacements in meters^2, and their standard errors
+            (NaN if there are fewer than two carriers).
+        """
+        keys = sorted(lt for c, lt in self.stats if c == c_type)
+        stats = np.array(
+            [self.stats[(c_type, lt)] for lt in keys], dtype=float
+        ).reshape(-1, 3)
+        counts = stats[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = np.where(
+                counts > 1, stats[:, 2] / (counts - 1), np.nan
+            )
+            stderr = np.sqrt(variance / counts)
+        return np.array(keys), counts, stats[:, 1], stderr
+
+    def get_mobility(self, c_type):
+        """Get the current mobility estimate of a carrier type.
+
+        The mobility is calculated from the least-squares slope of the MSD
+        against the lifetime. Its error is found from the standard errors of
+        the MSDs or, if the carriers have checkpoints, from the spread of the
+        slopes of the carriers.
+
+        Parameters
+        ----------
+        c_type : str
+            The carrier type, "electron" or "hole".
+
+        Returns
+        -------
+        mobility, mob_error : float, float
+            The mobility and its standard error in centimeters^2/(Volt
+            second). Both are NaN if fewer than two lifetimes have carriers.
+        """
+        lifetimes, counts, msds, stderr = self.get_msds(c_type)
+        lifetimes = lifetimes[counts > 0]
+        msds = msds[counts > 0]
+        stderr = stderr[counts > 0]
+        if len(lifetimes) < 2:
+            return np.nan, np.nan
+        # slope = sum(weights * msds) is the least-squares slope
+        centered = lifetimes - lifetimes.mean()
+        weights = centered / np.sum(centered ** 2)
+        slope = np.sum(weights * msds)
+        if c_type in self.slope_stats:
+            n, _, m2 = self.slope_stats[c_type]
+            slope_err = np.sqrt(m2 / (n - 1) / n) if n > 1 else np.nan
+        else:
+            slope_err = np.sqrt(np.sum((weights * stderr) ** 2))
+        return (
+            hf.msd_slope_to_mobility(slope, self.temp),
+            hf.msd_slope_to_mobility(slope_err, self.temp),
+        )
+
+    def converged(self, target_rse, min_carriers=10):
+        """Check whether the mobility of every carrier type has converged.
+
+        Parameters
+        ----------
+        target_rse : float
+            The target relative standard error of the mobility.
+        min_carriers : int, default 10
+            The minimum number of carriers of each lifetime.
+
+        Returns
+        -------
+        bool
+            True if, for every carrier type, each lifetime has at least
+            `min_carriers` carriers and the relative standard error of the
+            mobility is below `target_rse`.
+        """
+        c_types = {c_type for c_type, _ in self.stats}
+        if not c_types:
+            return False
+        for c_type in c_types:
+            _, counts, _, _ = self.get_msds(c_type)
+            mobility, mob_error = self.get_mobility(c_type)
+            if np.any(counts < min_carriers) or not (
+                mob_error < target_rse * abs(mobility)
+            ):
+                return False
+        return True
+
+
+def _welford(stats, value):
+    """Update [count, mean, sum of squared deviations] with a value."""
+    stats[0] += 1
+    delta = value - stats[1]
+    stats[1] += delta / stats[0]
+    stats[2] += delta * (value - stats[1])
+
+
+def get_checkpoint_times(lifetimes, n_checkpoints):
+    """Get logarithmically spaced checkpoint times for carrier trajectories.
+
+    Parameters
+    ----------
+    lifetimes : list of float
+        The carrier lifetimes in seconds. The checkpoints span from the
+        shortest to the longest lifetime.
+    n_checkpoints : int
+        The number of checkpoints.
+
+    Returns
+    -------
+    numpy.ndarray
+        The checkpoint times in seconds.
+    """
+    return np.geomspace(min(lifetimes), max(lifetimes), n_checkpoints)
+
+
 def run_single_kmc(
     jobs,
     kmc_directory,
@@ -366,6 +718,11 @@ def run_single_kmc(
     seed=None,
     send_end=None,
     verbose=1,
+    mol_ids=None,
+    rate_table=None,
+    queue=None,
+    stop_event=None,
+    append_log=False,
 ):
     """Run a single KMC simulation process.
 
@@ -394,13 +751,33 @@ def run_single_kmc(
         result.
     verbose : int, default 0
         The verbosity level of output.
+    mol_ids : numpy.ndarray of int, default None
+        The molecule index of each chromophore, as returned by
+        `get_molecule_ids`. Only used if "use_avg_hoprates" is True in
+        `carrier_kwargs`. If None is given, it will be computed from the
+        snapshot.
+    rate_table : dict, default None
+        The hop rates of every neighbor pair, as returned by `get_rate_table`
+        with the parameters in `carrier_kwargs`. Not used if
+        "use_avg_hoprates" is True in `carrier_kwargs`. If None is given, it
+        will be computed.
+    queue : multiprocessing.Queue, default None
+        If given, each carrier is put on the queue as soon as it finishes and
+        None is put on the queue when this process is done, instead of sending
+        the carrier list to `send_end`.
+    stop_event : multiprocessing.Event, default None
+        If given and set, no more carriers are started.
+    append_log : bool, default False
+        Whether to append to an existing log file of this `cpu_rank` instead
+        of starting a new one.
 
     Returns
     -------
     list of Carrier
-        if send_end is None (this function is being run on its own), the
-        carrier_list is returned. Otherwise it is assumed this function is being
-        as part of a multiprocessing run and nothing is returned.
+        if send_end and queue are None (this function is being run on its
+        own), the carrier_list is returned. Otherwise it is assumed this
+        function is being as part of a multiprocessing run and nothing is
+        returned.
     """
     if seed is not None:
         np.random.seed(seed)
@@ -409,12 +786,13 @@ def run_single_kmc(
         # If we're running on multiple cpus, don't print to std out
         # print to a log file instead and start fresh: remove it if it exists
         filename = os.path.join(kmc_directory, f"kmc_{cpu_rank:02d}.log")
-        if os.path.exists(filename):
+        if os.path.exists(filename) and not append_log:
             os.remove(filename)
     else:
         filename = None
+    logger = hf.Logger(verbose, filename=filename)
 
-    v_print(f"Found {len(jobs):d} jobs to run", verbose, filename=filename)
+    logger.log("Found {:d} jobs to run", len(jobs))
 
     try:
         use_avg_hoprates = carrier_kwargs["use_avg_hoprates"]
@@ -424,16 +802,25 @@ def run_single_kmc(
     if use_avg_hoprates:
         # Chosen to split hopping by inter-intra molecular hops, so get
         # molecule data
-        mol_id_dict = get_molecule_ids(snap, chromo_list)
-        # molidDict is a dictionary where the keys are the chromoids, and
-        # the vals are the molids
+        if mol_ids is None:
+            mol_ids = get_molecule_ids(snap, chromo_list)
+        mol_id_dict = mol_ids
     else:
         mol_id_dict = None
+    box = snap.configuration.box[:3]
+    if not use_avg_hoprates and rate_table is None:
+        rate_table = get_rate_table(
+            chromo_list, box, temp, **_rate_kwargs(carrier_kwargs)
+        )
     t0 = time.perf_counter()
     carrier_list = []
-    box = snap.configuration.box[:3]
     for i_job, [carrier_no, lifetime, ctype] in enumerate(jobs):
-        v_print(f"starting job {i_job}", verbose, filename=filename)
+        if stop_event is not None and stop_event.is_set():
+            logger.log(
+                "Stopping early, {} jobs were not run", len(jobs) - i_job
+            )
+            break
+        logger.log("starting job {}", i_job)
         t1 = time.perf_counter()
         # Find a random position to start the carrier in
         while True:
@@ -457,27 +844,38 @@ def run_single_kmc(
         )
         continue_sim = True
         while continue_sim:
-            continue_sim = i_carrier.calculate_hop(chromo_list, verbose=verbose)
+            continue_sim = i_carrier.calculate_hop(
+                chromo_list, rate_table=rate_table, logger=logger
+            )
         # Now the carrier has finished hopping, let's calculate its vitals
         i_carrier.update_displacement()
 
         t2 = time.perf_counter()
         elapsed_time = float(t2) - float(t1)
-        time_str = hf.time_units(elapsed_time)
-
-        v_print(
-            f"\t{i_carrier.c_type} hopped {i_carrier.n_hops} times over "
-            + f"{i_carrier.current_time:.2e} seconds "
-            + f"into image {i_carrier.image} for a displacement of"
-            + f"\n\t{i_carrier.displacement:.2f} (took walltime {time_str})",
-            verbose,
-            filename=filename,
+        i_carrier.walltime = elapsed_time
+
+        logger.log(
+            "\t{} hopped {} times over {:.2e} seconds into image {} for a "
+            "displacement of\n\t{:.2f} (took walltime {})",
+            i_carrier.c_type,
+            i_carrier.n_hops,
+            i_carrier.current_time,
+            i_carrier.image,
+            i_carrier.displacement,
+            hf.time_units(elapsed_time),
         )
+        # Write the log once per carrier rather than once per line
+        logger.flush()
         carrier_list.append(i_carrier)
+        if queue is not None:
+            queue.put(i_carrier)
     t3 = time.perf_counter()
     elapsed_time = float(t3) - float(t0)
     time_str = hf.time_units(elapsed_time)
-    if send_end is not None:
+    logger.close()
+    if queue is not None:
+        queue.put(None)
+    elif send_end is not None:
         send_end.send(carrier_list)
     else:
         return carrier_list
@@ -487,7 +885,9 @@ def snap_molecule_indices(snap):
     """Find molecule index for each particle.
 
     Given a snapshot from a trajectory, compute clusters of bonded molecules
-    and return an array of the molecule index of each particle.
+    and return an array of the molecule index of each particle. Molecules are
+    the connected components of the bond graph (see
+    `morphct.helper_functions.get_bonded_clusters`).
 
     Parameters
     ----------
@@ -498,19 +898,7 @@ def snap_molecule_indices(snap):
     -------
     numpy.ndarray (N_particles,)
     """
-    system = freud.AABBQuery.from_system(snap)
-    n_query_pts = n_pts = snap.bonds.N
-    query_pt_inds = np.sort(snap.bonds.group[:, 0])
-    pt_inds = snap.bonds.group[:, 1]
-    distances = system.box.compute_distances(
-        system.points[query_pt_inds], system.points[pt_inds]
-    )
-    nlist = freud.NeighborList.from_arrays(
-        n_query_pts, n_pts, query_pt_inds, pt_inds, distances
-    )
-    cluster = freud.cluster.Cluster()
-    cluster.compute(system=system, neighbors=nlist)
-    return cluster.cluster_idx
+    return hf.get_bonded_clusters(snap.particles.N, snap.bonds.group)
 
 
 def get_molecule_ids(snap, chromo_list):
@@ -525,17 +913,481 @@ def get_molecule_ids(snap, chromo_list):
 
     Returns
     -------
-    dict
-        A dictionary that maps the chromophore index to the molecule index.
+    numpy.ndarray (N_chromophores,) of int
+        The molecule index of each chromophore.
     """
-    print("Determining molecule IDs...")
     # Determine molecules based on bonds
     molecules = snap_molecule_indices(snap)
-    # Convert to chromo_mol_id
-    chromo_mol_id = {}
-    for i, chromo in enumerate(chromo_list):
-        chromo_mol_id[i] = molecules[chromo.atom_ids[0]]
-    return chromo_mol_id
+    first_atoms = [chromo.atom_ids[0] for chromo in chromo_list]
+    return molecules[np.array(first_atoms, dtype=int)]
+
+
+def get_rate_table(
+    chromo_list,
+    box,
+    temp,
+    hopping_prefactor=1.0,
+    use_vrh=False,
+    boltz=False,
+    chromo_ids=None,
+    field=None,
+):
+    """Get the hop rates of every neighbor pair.
+
+    The rates are computed with `morphct.helper_functions.get_hop_rates` for
+    all pairs at once. The reorganization energy of a hop is that of the
+    starting chromophore if both chromophores are the same species, otherwise
+    it is the average of the two. The variable-range hopping length is the
+    `vrh_delocalization` of the starting chromophore.
+
+    An applied electric field changes the energy difference of a hop by
+    -F.r for a hole (starting on a donor) and +F.r for an electron (starting
+    on an acceptor), where r is the hop vector.
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores in the simulation. The index of each chromophore in
+        the list must be its id.
+    box : numpy.ndarray, shape (3,)
+        The lengths of the box vectors in Angstroms. Box is assumed to be
+        orthogonal.
+    temp : float
+        The temperature in Kelvin.
+    hopping_prefactor : float, default 1.0
+        A prefactor to the rate equation.
+    use_vrh : bool, default False
+        Whether to use variable-range hopping.
+    boltz : bool, default False
+        Whether to use a Boltzmann energy penalty.
+    chromo_ids : list of int, default None
+        The indices of the chromophores whose neighbor pairs are included. If
+        None is given, all chromophores are used.
+    field : numpy.ndarray, shape (3,), default None
+        The applied electric field in Volts/meter. If None is given, there is
+        no field.
+
+    Returns
+    -------
+    dict of numpy.ndarray
+        The pairs are stored in the same order as the chromophores and their
+        `neighbors` lists (see
+        `morphct.chromophores.get_neighbor_arrays`). "i" and "j" are the
+        indices of the chromophore and its neighbor, "image" is the relative
+        image of the neighbor, and "rate" is the hop rate in inverse seconds
+        (NaN if the transfer integral is None). The pairs of the n-th included
+        chromophore are at indices "indptr"[n] to "indptr"[n+1].
+    """
+    return get_rate_tables(
+        chromo_list,
+        box,
+        [temp],
+        hopping_prefactor=hopping_prefactor,
+        use_vrh=use_vrh,
+        boltz=boltz,
+        chromo_ids=chromo_ids,
+        field=field,
+    )[0]
+
+
+def get_rate_tables(
+    chromo_list,
+    box,
+    temps,
+    hopping_prefactor=1.0,
+    use_vrh=False,
+    boltz=False,
+    chromo_ids=None,
+    field=None,
+):
+    """Get the hop rates of every neighbor pair at several temperatures.
+
+    The neighbor pairs are only found once and the rates at all of the
+    temperatures are computed in one call to
+    `morphct.helper_functions.get_hop_rates`.
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores in the simulation. The index of each chromophore in
+        the list must be its id.
+    box : numpy.ndarray, shape (3,)
+        The lengths of the box vectors in Angstroms. Box is assumed to be
+        orthogonal.
+    temps : list of float
+        The temperatures in Kelvin.
+    hopping_prefactor : float, default 1.0
+        A prefactor to the rate equation.
+    use_vrh : bool, default False
+        Whether to use variable-range hopping.
+    boltz : bool, default False
+        Whether to use a Boltzmann energy penalty.
+    chromo_ids : list of int, default None
+        The indices of the chromophores whose neighbor pairs are included. If
+        None is given, all chromophores are used.
+    field : numpy.ndarray, shape (3,), default None
+        The applied electric field in Volts/meter. If None is given, there is
+        no field.
+
+    Returns
+    -------
+    list of dict
+        The rate table at each temperature, as returned by `get_rate_table`.
+        The tables share their "indptr", "i", "j", and "image" arrays.
+    """
+    points = [
+        {
+            "temp": temp,
+            "hopping_prefactor": hopping_prefactor,
+            "use_vrh": use_vrh,
+            "boltz": boltz,
+        }
+        for temp in temps
+    ]
+    return get_rate_grid(
+        chromo_list, box, points, chromo_ids=chromo_ids, field=field
+    )
+
+
+def get_grid_points(grid):
+    """Expand a grid of rate-law parameters into a list of points.
+
+    Parameters
+    ----------
+    grid : dict of list
+        The values of each parameter. The valid parameters are "temp",
+        "hopping_prefactor", "use_vrh", "boltz", "reorganization_energy",
+        "vrh_delocalization", "use_avg_hoprates", "avg_intra_rate", and
+        "avg_inter_rate". "temp" is required.
+
+    Returns
+    -------
+    list of dict
+        Every combination of the parameter values. The last parameter varies
+        fastest.
+    """
+    valid_keys = [
+        "temp",
+        "hopping_prefactor",
+        "use_vrh",
+        "boltz",
+        "reorganization_energy",
+        "vrh_delocalization",
+        "use_avg_hoprates",
+        "avg_intra_rate",
+        "avg_inter_rate",
+    ]
+    invalid = set(grid) - set(valid_keys)
+    if invalid:
+        raise ValueError(
+            f"Unknown grid parameters {sorted(invalid)}. Valid parameters are "
+            f"{valid_keys}."
+        )
+    if "temp" not in grid:
+        raise ValueError("The grid must include 'temp'.")
+    keys = list(grid)
+    return [
+        dict(zip(keys, values))
+        for values in itertools.product(*[grid[key] for key in keys])
+    ]
+
+
+def get_rate_grid(chromo_list, box, points, chromo_ids=None, field=None):
+    """Get the hop rates of every neighbor pair at several parameter points.
+
+    The neighbor pairs and their energies are only found once. The rates of
+    all the points with the same "use_vrh" and "boltz" are then computed in
+    one call to `morphct.helper_functions.get_hop_rates`.
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores in the simulation. The index of each chromophore in
+        the list must be its id.
+    box : numpy.ndarray, shape (3,)
+        The lengths of the box vectors in Angstroms. Box is assumed to be
+        orthogonal.
+    points : list of dict
+        The rate-law parameters of each point, as returned by
+        `get_grid_points`. "temp" is required and "hopping_prefactor",
+        "use_vrh", and "boltz" default to the values of `get_rate_table`.
+        A "reorganization_energy" (in eV) or "vrh_delocalization" (in meters)
+        which is not None replaces the value of every chromophore. Other keys
+        are ignored.
+    chromo_ids : list of int, default None
+        The indices of the chromophores whose neighbor pairs are included. If
+        None is given, all chromophores are used.
+    field : numpy.ndarray, shape (3,), default None
+        The applied electric field in Volts/meter. If None is given, there is
+        no field.
+
+    Returns
+    -------
+    list of dict
+        The rate table at each point, as returned by `get_rate_table`. The
+        tables share their "indptr", "i", "j", and "image" arrays.
+    """
+    if chromo_ids is None:
+        sources = chromo_list
+    else:
+        sources = [chromo_list[i] for i in chromo_ids]
+    i, j, images, tis, delta_es = get_neighbor_arrays(sources)
+    i = np.array([chromo.id for chromo in sources], dtype=int)[i]
+    indptr = np.zeros(len(sources) + 1, dtype=int)
+    indptr[1:] = np.cumsum([len(chromo.neighbors) for chromo in sources])
+
+    if chromo_ids is None:
+        chromos = chromo_list
+        li, lj = i, j
+    else:
+        # Only gather the properties of the sources and their neighbors, so a
+        # table for a few chromophores does not scale with the system size
+        needed, inverse = np.unique(
+            np.concatenate([i, j]).astype(int), return_inverse=True
+        )
+        chromos = [chromo_list[n] for n in needed]
+        li, lj = inverse[:len(i)], inverse[len(i):]
+
+    lambdas = np.array([chromo.reorganization_energy for chromo in chromos])
+    species = np.array([chromo.species for chromo in chromos])
+    lambda_ij = np.where(
+        species[li] == species[lj], lambdas[li], (lambdas[li] + lambdas[lj]) / 2
+    )
+    # Chromophore separations need converting to m
+    centers = np.array([chromo.center for chromo in chromos]).reshape(-1, 3)
+    hop_vectors = (centers[lj] + images * box - centers[li]) * 1e-10
+    rij = np.linalg.norm(hop_vectors, axis=1)
+    vrh = np.array([chromo.vrh_delocalization for chromo in chromos])[li]
+    if field is not None:
+        # V/m * m -> eV for a unit charge
+        charge = np.where(species[li] == "acceptor", -1.0, 1.0)
+        delta_es = delta_es - charge * (hop_vectors @ np.asarray(field))
+
+    # Ignore any hops with a NoneType transfer integral
+    valid = np.flatnonzero(~np.isnan(tis))
+    rates = np.full((len(points), len(i)), np.nan)
+
+    def _pair_values(group, key, values):
+        # One row per point of the pair values, or of the point's override
+        return np.array(
+            [
+                values[valid]
+                if point.get(key) is None
+                else np.full(len(valid), point[key], dtype=float)
+                for point in group
+            ]
+        )
+
+    modes = {}
+    for n, point in enumerate(points):
+        mode = (point.get("use_vrh", False), point.get("boltz", False))
+        modes.setdefault(mode, []).append(n)
+    for (use_vrh, boltz), indices in modes.items():
+        group = [points[n] for n in indices]
+        rates[np.ix_(indices, valid)] = hf.get_hop_rates(
+            _pair_values(group, "reorganization_energy", lambda_ij),
+            tis[valid],
+            delta_es[valid],
+            np.array(
+                [[point.get("hopping_prefactor", 1.0)] for point in group]
+            ),
+            np.array([[point["temp"]] for point in group], dtype=float),
+            use_vrh=use_vrh,
+            rij=rij[valid],
+            vrh=_pair_values(group, "vrh_delocalization", vrh),
+            boltz=boltz,
+        )
+    return [
+        {"indptr": indptr, "i": i, "j": j, "image": images, "rate": rate}
+        for rate in rates
+    ]
+
+
+def _escape_rate(rate_matrix, sites):
+    """Get the largest total rate from any of the sites to outside of them."""
+    rows = rate_matrix[sites]
+    outside = ~np.isin(rows.indices, sites)
+    row_inds = np.repeat(np.arange(len(sites)), np.diff(rows.indptr))
+    escape = np.bincount(
+        row_inds[outside], rows.data[outside], minlength=len(sites)
+    )
+    return escape.max()
+
+
+def _wraps(rate_table, sites):
+    """Check whether the sites connect to their own periodic image."""
+    indptr = rate_table["indptr"]
+    edges = np.concatenate([np.arange(indptr[s], indptr[s + 1]) for s in sites])
+    edges = edges[
+        np.isin(rate_table["j"][edges], sites) & (rate_table["rate"][edges] > 0)
+    ]
+    images = {sites[0]: np.zeros(3, dtype=int)}
+    # Propagate the image of each site until every site is placed
+    while len(images) < len(sites):
+        n_placed = len(images)
+        for e in edges:
+            i = rate_table["i"][e]
+            j = rate_table["j"][e]
+            if i in images and j not in images:
+                images[j] = images[i] + rate_table["image"][e]
+            elif j in images and i not in images:
+                images[i] = images[j] - rate_table["image"][e]
+        if len(images) == n_placed:
+            break
+    for e in edges:
+        i = rate_table["i"][e]
+        j = rate_table["j"][e]
+        if i in images and j in images:
+            if np.any(images[i] + rate_table["image"][e] != images[j]):
+                return True
+    return False
+
+
+def get_superbasins(rate_table, ratio=10.0, max_size=100):
+    """Find the superbasins of the rate graph.
+
+    A superbasin is a group of chromophores connected by fast hops in both
+    directions, e.g. neighboring chromophores on a chain, where a carrier
+    would hop back and forth many times before escaping. The chromophores are
+    clustered by single linkage on the mutual rate (the smaller of the two
+    hop rates of a pair), from the fastest down. A cluster is a superbasin if
+    the mutual rate at which it formed (its slowest link) is at least `ratio`
+    times the largest total rate from any of its chromophores to outside of
+    it (which must be nonzero), and it does not connect to its own periodic
+    image (where the hops within it would carry the carrier through the box).
+    The largest such clusters are kept.
+
+    Parameters
+    ----------
+    rate_table : dict
+        The hop rates of every neighbor pair, as returned by `get_rate_table`
+        for all chromophores.
+    ratio : float, default 10.0
+        The required separation between the hop rates within a superbasin and
+        the escape rates. Larger values give less bias and less speedup.
+    max_size : int, default 100
+        The largest number of chromophores in a superbasin.
+
+    Returns
+    -------
+    dict
+        The superbasin index of each chromophore ("basin", -1 if it is not in
+        a superbasin) and, for each superbasin, the number of chromophores
+        ("size"), the slowest link ("min_rate") and the escape rate
+        ("escape_rate") in inverse seconds, the rate scale factor ("scale",
+        see `scale_superbasins`), and the ratio of the slowest link to the
+        escape rate before scaling ("separation", at least `ratio`). The
+        scaling brings the separation of every superbasin down to `ratio`, so
+        superbasins with a larger separation are sped up more.
+    """
+    n = len(rate_table["indptr"]) - 1
+    rates = np.nan_to_num(rate_table["rate"])
+    # Sum the rates over periodic images
+    rate_matrix = coo_matrix(
+        (rates, (rate_table["i"], rate_table["j"])), shape=(n, n)
+    ).tocsr()
+    rate_matrix.eliminate_zeros()
+    mutual = rate_matrix.minimum(rate_matrix.T).tocoo()
+    upper = mutual.row < mutual.col
+    pair_i = mutual.row[upper]
+    pair_j = mutual.col[upper]
+    pair_rates = mutual.data[upper]
+
+    parent = np.arange(n)
+    sizes = np.ones(n, dtype=int)
+    members = {a: [a] for a in range(n)}
+    # The superbasins (members, slowest link, escape rate) in each cluster
+    basins = {}
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    for k in np.argsort(-pair_rates, kind="stable"):
+        a = find(pair_i[k])
+        b = find(pair_j[k])
+        if a == b:
+            continue
+        if sizes[a] < sizes[b]:
+            a, b = b, a
+        parent[b] = a
+        sizes[a] += sizes[b]
+        found = basins.pop(a, []) + basins.pop(b, [])
+        members_a = members.pop(a, None)
+        members_b = members.pop(b, None)
+        if sizes[a] <= max_size:
+            merged = members_a + members_b
+            members[a] = merged
+            escape_rate = _escape_rate(rate_matrix, merged)
+            # A cluster which cannot be escaped is not a superbasin
+            if (
+                0 < ratio * escape_rate <= pair_rates[k]
+                and not _wraps(rate_table, merged)
+            ):
+                found = [(merged, pair_rates[k], escape_rate)]
+        basins[a] = found
+
+    found = [basin for root in sorted(basins) for basin in basins[root]]
+    labels = np.full(n, -1)
+    for i_basin, (sites, _, _) in enumerate(found):
+        labels[sites] = i_basin
+    sizes = np.array([len(sites) for sites, _, _ in found], dtype=int)
+    min_rates = np.array([rate for _, rate, _ in found], dtype=float)
+    escape_rates = np.array([rate for _, _, rate in found], dtype=float)
+    separations = min_rates / escape_rates
+    scales = np.minimum(1, ratio / separations)
+    return {
+        "basin": labels,
+        "size": sizes,
+        "min_rate": min_rates,
+        "escape_rate": escape_rates,
+        "scale": scales,
+        "separation": separations,
+    }
+
+
+def scale_superbasins(rate_table, basins):
+    """Scale down the hop rates within each superbasin.
+
+    Following Chatterjee and Voter (J. Chem. Phys. 132, 194101 (2010)), the
+    hops within a superbasin are slowed down by the same factor in both
+    directions. This keeps the relative occupations of the chromophores in the
+    superbasin and, as long as the hops within it stay much faster than the
+    escapes, the rate and destination of the escapes, while a carrier makes
+    far fewer hops inside it.
+
+    Parameters
+    ----------
+    rate_table : dict
+        The hop rates of every neighbor pair, as returned by `get_rate_table`
+        for all chromophores.
+    basins : dict
+        The superbasins, as returned by `get_superbasins`.
+
+    Returns
+    -------
+    dict
+        A copy of `rate_table` with the scaled rates ("rate") and the scale
+        factor of each hop ("scale", 1 for hops which are not within a
+        superbasin).
+    """
+    labels = basins["basin"]
+    i_basin = labels[rate_table["i"]]
+    intra = (i_basin >= 0) & (i_basin == labels[rate_table["j"]])
+    scale = np.ones(len(rate_table["i"]))
+    scale[intra] = basins["scale"][i_basin[intra]]
+    return {**rate_table, "rate": rate_table["rate"] * scale, "scale": scale}
+
+
+def _rate_kwargs(carrier_kwargs):
+    """Get the `get_rate_table` keyword arguments from the Carrier ones."""
+    return {
+        key: carrier_kwargs[key]
+        for key in ["hopping_prefactor", "use_vrh", "boltz", "field"]
+        if key in carrier_kwargs
+    }
 
 
 def get_jobslist(sim_times, n_holes=0, n_elec=0, nprocs=None, seed=None):
@@ -596,9 +1448,45 @@ def run_kmc(
     combine=True,
     carrier_kwargs={},
     verbose=1,
+    mol_ids=None,
+    target_rse=None,
+    min_carriers=10,
+    checkpoints=None,
+    basin_ratio=None,
+    field=None,
     ): # pragma: no cover
     """Run KMC simulation using multiprocessing.
 
+    Unless average hop rates are used, the hop rates of every neighbor pair are
+    computed once with `get_rate_table` and shared with every process.
+
+    If `target_rse` is given, the carriers are collected as they finish and a
+    `MobilityAccumulator` is updated with each one. Once the mobility of every
+    carrier type has converged, the processes stop starting new carriers, so
+    fewer carriers than requested may be returned. Which carriers finish first
+    depends on the timing of the processes, so these runs are not exactly
+    reproducible. With `checkpoints`, the error of the mobility is found from
+    the MSD slopes of whole trajectories (see `MobilityAccumulator`).
+
+    If `checkpoints` is given, every carrier runs to the longest lifetime and
+    its position is recorded at `checkpoints` logarithmically spaced times
+    (see `get_checkpoint_times`), so each carrier contributes to the mean
+    squared displacement at every checkpoint time.
+
+    If `basin_ratio` is given, the hop rates within superbasins, where
+    carriers would hop back and forth many times before escaping, are scaled
+    down (see `get_superbasins` and `scale_superbasins`). The speedup is
+    estimated from the number of hops the carriers would have made without
+    scaling ("n_unscaled_hops").
+
+    If `field` is given, the hop rates include the applied field, so the
+    mobility can be measured from the drift of the carriers (see
+    `morphct.kmc_analyze.get_drift_mobility`).
+
+    The throughput of each process and where the time of the hops was spent
+    are written to "kmc_performance.json" in `kmc_directory` (see
+    `get_performance`).
+
     Parameters
     ----------
     lifetimes : list of float
@@ -628,6 +1516,30 @@ def run_kmc(
         Additional keyword arguments to be passed to the carrier instances.
     verbose : int, default 0
         The verbosity level of output.
+    mol_ids : numpy.ndarray of int, default None
+        The molecule index of each chromophore, as returned by
+        `get_molecule_ids`. Only used if "use_avg_hoprates" is True in
+        `carrier_kwargs`. If None is given, it is computed once here and
+        shared with every process.
+    target_rse : float, default None
+        The target relative standard error of the mobility, e.g. 0.05. If None
+        is given, all the carriers are run.
+    min_carriers : int, default 10
+        The minimum number of carriers of each type and lifetime before the
+        mobility can be considered converged. Only used with `target_rse`.
+    checkpoints : int, default None
+        The number of checkpoint times at which the carrier positions are
+        recorded. If None is given, only the final carrier positions are
+        recorded and each carrier has one of `lifetimes`.
+    basin_ratio : float, default None
+        The required separation between the hop rates within a superbasin and
+        the escape rates, e.g. 10. Smaller values give more speedup and more
+        bias. If None is given, the rates are not scaled. Not used if
+        "use_avg_hoprates" is True in `carrier_kwargs`.
+    field : numpy.ndarray, shape (3,), default None
+        The applied electric field in Volts/meter, e.g. [1e7, 0, 0]. If None
+        is given, there is no field. Not supported with `target_rse`, which
+        estimates the mobility from diffusion.
 
     Returns
     -------
@@ -638,60 +1550,865 @@ def run_kmc(
         'hop_limit', 'temp', 'lifetime', 'current_time', 'hole_history',
         'electron_history', 'c_type', 'n_hops', 'box', 'displacement',
         'mol_id_dict', 'use_avg_hoprates', 'avg_intra_rate', 'avg_inter_rate',
-        'use_koopmans', 'boltz', 'use_vrh', 'hopping_prefactor'
+        'use_koopmans', 'boltz', 'use_vrh', 'hopping_prefactor',
+        'checkpoint_times', 'checkpoint_positions', 'n_unscaled_hops',
+        'field', 'walltime', 'timings'
     """
+    if field is not None:
+        if target_rse is not None:
+            raise ValueError("target_rse is not supported with a field.")
+        carrier_kwargs = {
+            **carrier_kwargs, "field": np.asarray(field, dtype=float)
+        }
+    if checkpoints is not None:
+        checkpoint_times = get_checkpoint_times(lifetimes, checkpoints)
+        carrier_kwargs = {
+            **carrier_kwargs, "checkpoint_times": checkpoint_times
+        }
+        job_lifetimes = [max(lifetimes)]
+        # The accumulator collects the displacements at each checkpoint
+        lifetimes = checkpoint_times
+    else:
+        job_lifetimes = lifetimes
     jobs_list = get_jobslist(
-        lifetimes, n_holes=n_holes, n_elec=n_elec, seed=seed
+        job_lifetimes, n_holes=n_holes, n_elec=n_elec, nprocs=nprocs, seed=seed
     )
     running_jobs = []
     pipes = []
 
+    # Quantities shared by all the carriers are computed once here
+    rate_table = None
+    if carrier_kwargs.get("use_avg_hoprates", False):
+        if mol_ids is None:
+            mol_ids = get_molecule_ids(snap, chromo_list)
+    else:
+        rate_table = get_rate_table(
+            chromo_list,
+            snap.configuration.box[:3],
+            temp,
+            **_rate_kwargs(carrier_kwargs),
+        )
+        if basin_ratio is not None:
+            basins = get_superbasins(rate_table, ratio=basin_ratio)
+            rate_table = scale_superbasins(rate_table, basins)
+            v_print(
+                f"Found {len(basins['size'])} superbasins containing "
+                f"{np.sum(basins['size'])} chromophores",
+                verbose,
+            )
+            if len(basins["size"]):
+                v_print(
+                    "\tseparations from the escape rates "
+                    f"{basins['separation'].min():.1f} to "
+                    f"{basins['separation'].max():.1f}, scaled to "
+                    f"{basin_ratio:.1f}",
+                    verbose,
+                )
+
+    if target_rse is not None:
+        queue = mp.Queue()
+        stop_event = mp.Event()
     for cpu_rank, jobs in enumerate(jobs_list):
         child_seed = np.random.randint(0, 2 ** 32)
 
-        recv_end, send_end = mp.Pipe(False)
+        kwargs = {
+            "carrier_kwargs": carrier_kwargs,
+            "seed": child_seed,
+            "verbose": verbose,
+            "cpu_rank": cpu_rank,
+            "mol_ids": mol_ids,
+            "rate_table": rate_table,
+        }
+        if target_rse is None:
+            recv_end, send_end = mp.Pipe(False)
+            kwargs["send_end"] = send_end
+            pipes.append(recv_end)
+        else:
+            kwargs["queue"] = queue
+            kwargs["stop_event"] = stop_event
         p = mp.Process(
             target=run_single_kmc,
             args=(jobs, kmc_directory, chromo_list, snap, temp),
-            kwargs={
-                "carrier_kwargs": carrier_kwargs,
-                "seed": child_seed,
-                "send_end": send_end,
-                "verbose": verbose,
-                "cpu_rank": cpu_rank,
-            },
+            kwargs=kwargs,
         )
         running_jobs.append(p)
-        pipes.append(recv_end)
 
+    t_start = time.perf_counter()
     for p in running_jobs:
         p.start()
 
-    carriers_lists = [x.recv() for x in pipes]
+    if target_rse is None:
+        carriers_lists = [x.recv() for x in pipes]
+    else:
+        c_types = [c for c, n in [("hole", n_holes), ("electron", n_elec)] if n]
+        accumulator = MobilityAccumulator(temp, c_types, lifetimes)
+        carriers_lists = [[]]
+        n_running = len(running_jobs)
+        while n_running:
+            carrier = queue.get()
+            if carrier is None:
+                n_running -= 1
+                continue
+            carriers_lists[0].append(carrier)
+            accumulator.add(carrier)
+            if not stop_event.is_set() and accumulator.converged(
+                target_rse, min_carriers
+            ):
+                stop_event.set()
+                v_print(
+                    f"Mobility converged after {len(carriers_lists[0])} "
+                    "carriers:",
+                    verbose,
+                )
+                for c_type in c_types:
+                    mobility, mob_error = accumulator.get_mobility(c_type)
+                    v_print(
+                        f"\t{c_type} mobility = {mobility:.2E} +/- "
+                        f"{mob_error:.2E} cm^2 V^-1 s^-1",
+                        verbose,
+                    )
+        for p in running_jobs:
+            p.join()
 
     carriers = [item for sublist in carriers_lists for item in sublist]
     # Now combine the carrier data
     v_print("All KMC jobs completed!", verbose)
+    performance = get_performance(
+        carriers, jobs_list, time.perf_counter() - t_start
+    )
+    write_performance(performance, kmc_directory)
+    v_print(
+        f"{performance['n_hops']} hops in {performance['wall_time']:.1f} s "
+        f"({performance['hops_per_second']:.3g} hops/s)",
+        verbose,
+    )
+    n_hops = performance["n_hops"]
+    # The speedup is undefined if no carrier hopped
+    if basin_ratio is not None and rate_table is not None and n_hops:
+        n_unscaled = sum(carrier.n_unscaled_hops for carrier in carriers)
+        v_print(
+            f"Superbasin scaling: {n_hops} hops were made instead of an "
+            f"estimated {n_unscaled:.0f} (speedup {n_unscaled / n_hops:.2f}x)",
+            verbose,
+        )
     if combine:
         v_print("Combining outputs...", verbose)
+        return combine_carriers(carriers)
+    return carriers
+
+
+def combine_carriers(carriers):
+    """Combine the attributes of the carriers into one dictionary.
 
-        combined_data = {}
-        for carrier in carriers:
-            d = carrier.__dict__
-            for key, val in d.items():
-                if key in ["initial_chromo", "current_chromo"]:
-                    val = val.center
-                    key = key.split("_")[0] + "_position"
-                if key not in ["hole_history", "electron_history"]:
-                    val = [val]
-                if key not in combined_data:
+    Parameters
+    ----------
+    carriers : list of Carrier
+        The finished carriers.
+
+    Returns
+    -------
+    dict
+        The list of the values of each Carrier attribute (see `run_kmc`). The
+        chromophores are replaced by their centers ("initial_position" and
+        "current_position") and the histories are summed.
+    """
+    combined_data = {}
+    for carrier in carriers:
+        d = carrier.__dict__
+        for key, val in d.items():
+            if key in ["initial_chromo", "current_chromo"]:
+                val = val.center
+                key = key.split("_")[0] + "_position"
+            if key not in ["hole_history", "electron_history"]:
+                val = [val]
+            if key not in combined_data:
+                combined_data[key] = val
+            else:
+                try:
+                    combined_data[key] += val
+                except TypeError:
+                    # catch errors trying to add None and None
                     combined_data[key] = val
-                else:
-                    try:
-                        combined_data[key] += val
-                    except TypeError:
-                        # catch errors trying to add None and None
-                        combined_data[key] = val
-        return combined_data
+    return combined_data
+
+
+
+def _log_histogram(values):
+    """Histogram positive values in bins whose edges are powers of two.
+
+    Parameters
+    ----------
+    values : array-like of float
+        The values, e.g. the number of hops of each carrier.
+
+    Returns
+    -------
+    dict
+        The number of values which are not positive ("n_zero"), and the bin
+        "edges" and "counts" of the positive values.
+    """
+    values = np.asarray(values, dtype=float)
+    positive = values[values > 0]
+    if len(positive) == 0:
+        return {"n_zero": len(values), "edges": [], "counts": []}
+    low = np.floor(np.log2(positive.min()))
+    high = np.floor(np.log2(positive.max())) + 1
+    edges = 2.0 ** np.arange(low, high + 1)
+    counts, _ = np.histogram(positive, edges)
+    return {
+        "n_zero": int(len(values) - len(positive)),
+        "edges": edges.tolist(),
+        "counts": counts.tolist(),
+    }
+
+
+def get_performance(carriers, jobs_list, wall_time):
+    """Summarize the performance of a KMC run.
+
+    Parameters
+    ----------
+    carriers : list of Carrier
+        The finished carriers.
+    jobs_list : list of list of (int, float, str)
+        The jobs of each process, as returned by `get_jobslist`. These are
+        used to find which process ran each carrier.
+    wall_time : float
+        The wall time in seconds from starting the processes until all the
+        carriers were received.
+
+    Returns
+    -------
+    dict
+        The "wall_time", number of carriers ("n_carriers") and hops
+        ("n_hops"), the overall "hops_per_second", the time spent in each
+        part of the hops ("timings", see `Carrier.timings`), log-binned
+        histograms (see `_log_histogram`) of the hops ("hops_per_carrier") and
+        wall time ("walltime_per_carrier") of the carriers, and for each
+        process ("workers") its "cpu_rank", "n_carriers", "n_hops",
+        "busy_time" simulating carriers, "idle_time" otherwise,
+        "hops_per_second" while busy, and "timings".
+    """
+    rank_of = {
+        tuple(job): cpu_rank
+        for cpu_rank, jobs in enumerate(jobs_list)
+        for job in jobs
+    }
+    phases = ["rates", "rng", "selection", "history"]
+
+    def _summary(group):
+        busy = sum(carrier.walltime for carrier in group)
+        n_hops = sum(carrier.n_hops for carrier in group)
+        return {
+            "n_carriers": len(group),
+            "n_hops": int(n_hops),
+            "busy_time": busy,
+            "hops_per_second": n_hops / busy if busy > 0 else 0.0,
+            "timings": {
+                phase: sum(carrier.timings[phase] for carrier in group)
+                for phase in phases
+            },
+        }
+
+    workers = []
+    for cpu_rank in range(len(jobs_list)):
+        group = [
+            c
+            for c in carriers
+            if rank_of.get((c.id, c.lifetime, c.c_type)) == cpu_rank
+        ]
+        worker = {"cpu_rank": cpu_rank, **_summary(group)}
+        worker["idle_time"] = max(wall_time - worker["busy_time"], 0.0)
+        workers.append(worker)
+
+    total = _summary(carriers)
+    return {
+        "wall_time": wall_time,
+        "n_carriers": total["n_carriers"],
+        "n_hops": total["n_hops"],
+        "hops_per_second": total["n_hops"] / wall_time if wall_time else 0.0,
+        "timings": total["timings"],
+        "hops_per_carrier": _log_histogram([c.n_hops for c in carriers]),
+        "walltime_per_carrier": _log_histogram(
+            [c.walltime for c in carriers]
+        ),
+        "workers": workers,
+    }
+
+
+def write_performance(performance, kmc_directory): # pragma: no cover
+    """Write the performance summary to "kmc_performance.json".
+
+    Parameters
+    ----------
+    performance : dict
+        The summary returned by `get_performance`.
+    kmc_directory : path
+        The path to the directory where the KMC logs are saved.
+    """
+    filepath = os.path.join(kmc_directory, "kmc_performance.json")
+    with open(filepath, "w") as f:
+        json.dump(performance, f, indent=2)
+
+
+def _run_condition_jobs(
+    jobs,
+    conditions,
+    kmc_directory,
+    chromo_list,
+    snap,
+    cpu_rank=None,
+    seed=None,
+    send_end=None,
+    verbose=1,
+    mol_ids=None,
+):
+    """Run the KMC jobs of several conditions in one process.
+
+    Parameters
+    ----------
+    jobs : list of (int, int, float, str)
+        The index of the condition, the carrier index, lifetime, and species
+        of each job.
+    conditions : list of (float, dict, dict)
+        The temperature, carrier keyword arguments and rate table (None if
+        average hop rates are used) of each condition.
+    cpu_rank : int, default None
+        The cpu rank of this process. Its log is written to "kmc_<rank>.log".
+
+    See `run_single_kmc` for the other parameters.
+
+    Returns
+    -------
+    list of (int, Carrier)
+        If send_end is None, the index of the condition and the finished
+        carrier of each job. Otherwise the list is sent to `send_end`.
+    """
+    if seed is not None:
+        np.random.seed(seed)
+    if cpu_rank is not None:
+        filename = os.path.join(kmc_directory, f"kmc_{cpu_rank:02d}.log")
+        if os.path.exists(filename):
+            os.remove(filename)
+
+    results = []
+    for i_cond, (temp, carrier_kwargs, rate_table) in enumerate(conditions):
+        cond_jobs = [job[1:] for job in jobs if job[0] == i_cond]
+        if not cond_jobs:
+            continue
+        carriers = run_single_kmc(
+            cond_jobs,
+            kmc_directory,
+            chromo_list,
+            snap,
+            temp,
+            carrier_kwargs=carrier_kwargs,
+            cpu_rank=cpu_rank,
+            verbose=verbose,
+            mol_ids=mol_ids,
+            rate_table=rate_table,
+            append_log=True,
+        )
+        results += [(i_cond, carrier) for carrier in carriers]
+    if send_end is not None:
+        send_end.send(results)
+    else:
+        return results
+
+
+def _run_conditions(
+    conditions,
+    lifetimes,
+    kmc_directory,
+    chromo_list,
+    snap,
+    n_holes=0,
+    n_elec=0,
+    seed=42,
+    nprocs=None,
+    verbose=1,
+    mol_ids=None,
+): # pragma: no cover
+    """Run the carriers of several KMC conditions in one set of processes.
+
+    The jobs of all the conditions are shuffled together and split between
+    the processes, so each process runs a mix of the conditions.
+
+    Parameters
+    ----------
+    conditions : list of (float, dict, dict)
+        The temperature, carrier keyword arguments and rate table (None if
+        average hop rates are used) of each condition.
+    nprocs : int, default None
+        The number of processes. If None is given, the number of cpus is used.
+
+    See `run_kmc` for the other parameters.
+
+    Returns
+    -------
+    list of list of Carrier
+        The finished carriers of each condition.
+    """
+    if seed is not None:
+        np.random.seed(seed)
+    if nprocs is None:
+        nprocs = mp.cpu_count()
+    jobs = [
+        (i_cond,) + tuple(job)
+        for i_cond in range(len(conditions))
+        for job in get_jobslist(lifetimes, n_holes, n_elec, nprocs=1)[0]
+    ]
+    np.random.shuffle(jobs)
+    step = math.ceil(len(jobs) / nprocs)
+    jobs_list = [jobs[i : i + step] for i in range(0, len(jobs), step)]
+    v_print(
+        f"Running {len(jobs)} jobs of {len(conditions)} conditions on "
+        f"{len(jobs_list)} processes",
+        verbose,
+    )
+
+    running_jobs = []
+    pipes = []
+    for cpu_rank, rank_jobs in enumerate(jobs_list):
+        recv_end, send_end = mp.Pipe(False)
+        p = mp.Process(
+            target=_run_condition_jobs,
+            args=(rank_jobs, conditions, kmc_directory, chromo_list, snap),
+            kwargs={
+                "cpu_rank": cpu_rank,
+                "seed": np.random.randint(0, 2 ** 32),
+                "send_end": send_end,
+                "verbose": verbose,
+                "mol_ids": mol_ids,
+            },
+        )
+        running_jobs.append(p)
+        pipes.append(recv_end)
+
+    for p in running_jobs:
+        p.start()
+
+    carriers = [[] for _ in conditions]
+    for recv_end in pipes:
+        for i_cond, carrier in recv_end.recv():
+            carriers[i_cond].append(carrier)
+    for p in running_jobs:
+        p.join()
+    v_print("All KMC jobs completed!", verbose)
     return carriers
 
+
+def run_kmc_sweep(
+    temps,
+    lifetimes,
+    kmc_directory,
+    chromo_list,
+    snap,
+    n_holes=0,
+    n_elec=0,
+    seed=42,
+    nprocs=None,
+    carrier_kwargs={},
+    verbose=1,
+    mol_ids=None,
+): # pragma: no cover
+    """Run KMC simulations at several temperatures.
+
+    The rate tables at every temperature are computed at once with
+    `get_rate_tables`, and the carriers of all the temperatures are run in
+    one set of processes.
+
+    Parameters
+    ----------
+    temps : list of float
+        The simulation temperatures in Kelvin.
+    lifetimes : list of float
+        The potential lifetimes of the carriers. A value from these will be
+        randomly assigned to each run.
+    kmc_directory : path
+        The path to the directory where the KMC logs will be saved.
+    chromo_list : list of Chromphore
+        The chromophores in the simulation.
+    snap : gsd.hoomd.Snapshot
+        The simulation snapshot.
+    n_holes : int, default 0
+        The number of holes to simulate at each temperature.
+    n_elec : int, default 0
+        The number of electrons to simulate at each temperature.
+    seed : int, default 42
+        A seed for the random processes.
+    nprocs : int, default None
+        The number of processes. If None is given, the number of cpus is used.
+    carrier_kwargs : dict, default {}
+        Additional keyword arguments to be passed to the carrier instances.
+    verbose : int, default 0
+        The verbosity level of output.
+    mol_ids : numpy.ndarray of int, default None
+        The molecule index of each chromophore, as returned by
+        `get_molecule_ids`. Only used if "use_avg_hoprates" is True in
+        `carrier_kwargs`. If None is given, it is computed once here.
+
+    Returns
+    -------
+    list of dict
+        The combined carrier data (see `combine_carriers`) at each
+        temperature.
+    """
+    if carrier_kwargs.get("use_avg_hoprates", False):
+        if mol_ids is None:
+            mol_ids = get_molecule_ids(snap, chromo_list)
+        rate_tables = [None] * len(temps)
+    else:
+        rate_tables = get_rate_tables(
+            chromo_list,
+            snap.configuration.box[:3],
+            temps,
+            **_rate_kwargs(carrier_kwargs),
+        )
+    conditions = [
+        (temp, carrier_kwargs, rate_table)
+        for temp, rate_table in zip(temps, rate_tables)
+    ]
+    carriers = _run_conditions(
+        conditions,
+        lifetimes,
+        kmc_directory,
+        chromo_list,
+        snap,
+        n_holes=n_holes,
+        n_elec=n_elec,
+        seed=seed,
+        nprocs=nprocs,
+        verbose=verbose,
+        mol_ids=mol_ids,
+    )
+    return [combine_carriers(cond_carriers) for cond_carriers in carriers]
+
+
+def run_kmc_grid(
+    grid,
+    lifetimes,
+    kmc_directory,
+    chromo_list,
+    snap,
+    n_holes=0,
+    n_elec=0,
+    seed=42,
+    nprocs=None,
+    carrier_kwargs={},
+    verbose=1,
+    mol_ids=None,
+): # pragma: no cover
+    """Run KMC simulations over a grid of rate-law parameters.
+
+    The rate tables of every grid point are computed from the shared neighbor
+    data with `get_rate_grid`, and the carriers of all the grid points are
+    run in one set of processes.
+
+    Parameters
+    ----------
+    grid : dict of list
+        The values of each rate-law parameter, see `get_grid_points`.
+        "reorganization_energy" and "vrh_delocalization" replace the values of
+        every chromophore, and have no effect on grid points which use the
+        average hop rates.
+    lifetimes : list of float
+        The potential lifetimes of the carriers. A value from these will be
+        randomly assigned to each run.
+    kmc_directory : path
+        The path to the directory where the KMC logs will be saved.
+    chromo_list : list of Chromphore
+        The chromophores in the simulation.
+    snap : gsd.hoomd.Snapshot
+        The simulation snapshot.
+    n_holes : int, default 0
+        The number of holes to simulate at each grid point.
+    n_elec : int, default 0
+        The number of electrons to simulate at each grid point.
+    seed : int, default 42
+        A seed for the random processes.
+    nprocs : int, default None
+        The number of processes. If None is given, the number of cpus is used.
+    carrier_kwargs : dict, default {}
+        Additional keyword arguments to be passed to the carrier instances.
+        The grid values take precedence.
+    verbose : int, default 0
+        The verbosity level of output.
+    mol_ids : numpy.ndarray of int, default None
+        The molecule index of each chromophore, as returned by
+        `get_molecule_ids`. Only used by grid points which use the average hop
+        rates. If None is given, it is computed once here if needed.
+
+    Returns
+    -------
+    points : list of dict
+        The parameters of each grid point, as returned by `get_grid_points`.
+    data : list of dict
+        The combined carrier data (see `combine_carriers`) at each grid point.
+    """
+    points = get_grid_points(grid)
+    carrier_keys = [
+        "hopping_prefactor",
+        "use_vrh",
+        "boltz",
+        "use_avg_hoprates",
+        "avg_intra_rate",
+        "avg_inter_rate",
+    ]
+    point_kwargs = [
+        {
+            **carrier_kwargs,
+            **{key: val for key, val in point.items() if key in carrier_keys},
+        }
+        for point in points
+    ]
+    use_avg = [kwargs.get("use_avg_hoprates", False) for kwargs in point_kwargs]
+    for kwargs, avg in zip(point_kwargs, use_avg):
+        # Check here, as an error in a carrier process would stall the pool
+        if avg and (
+            kwargs.get("avg_inter_rate") is None
+            or kwargs.get("avg_intra_rate") is None
+        ):
+            raise ValueError(
+                "If use_avg_hoprates is True, avg_inter_rate and "
+                "avg_intra_rate must also be provided"
+            )
+    if any(use_avg) and mol_ids is None:
+        mol_ids = get_molecule_ids(snap, chromo_list)
+
+    # Only the grid points which hop with the rates of each pair need tables
+    table_points = [
+        {**kwargs, **point}
+        for point, kwargs, avg in zip(points, point_kwargs, use_avg)
+        if not avg
+    ]
+    tables = iter(
+        get_rate_grid(
+            chromo_list,
+            snap.configuration.box[:3],
+            table_points,
+            field=carrier_kwargs.get("field"),
+        )
+    )
+    conditions = [
+        (point["temp"], kwargs, None if avg else next(tables))
+        for point, kwargs, avg in zip(points, point_kwargs, use_avg)
+    ]
+    carriers = _run_conditions(
+        conditions,
+        lifetimes,
+        kmc_directory,
+        chromo_list,
+        snap,
+        n_holes=n_holes,
+        n_elec=n_elec,
+        seed=seed,
+        nprocs=nprocs,
+        verbose=verbose,
+        mol_ids=mol_ids,
+    )
+    data = [combine_carriers(cond_carriers) for cond_carriers in carriers]
+    return points, data
+
+
+def _in_neighbors(rate_table, n):
+    """Get the chromophores which have each chromophore as a neighbor.
+
+    Parameters
+    ----------
+    rate_table : dict
+        The hop rates of every neighbor pair, as returned by `get_rate_table`.
+    n : int
+        The number of chromophores.
+
+    Returns
+    -------
+    indptr : numpy.ndarray of int (n + 1,)
+    sources : numpy.ndarray of int
+        The chromophores which can hop to chromophore m are
+        sources[indptr[m]:indptr[m+1]].
+    """
+    order = np.argsort(rate_table["j"], kind="stable")
+    indptr = np.zeros(n + 1, dtype=int)
+    indptr[1:] = np.cumsum(np.bincount(rate_table["j"], minlength=n))
+    return indptr, rate_table["i"][order]
+
+
+def run_interacting_kmc(
+    chromo_list,
+    snap,
+    temp,
+    lifetime,
+    n_holes=0,
+    n_elec=0,
+    carrier_kwargs={},
+    rate_table=None,
+    seed=None,
+    verbose=0,
+):
+    """Run a KMC simulation of carriers which exclude each other.
+
+    All of the carriers hop at the same time on one lattice and a carrier
+    cannot hop onto a chromophore which is occupied by another carrier. The
+    occupancy is stored in an array and the next hop of every carrier is kept
+    in a binary heap, so each step takes O(log N) for N carriers. Only the
+    carriers next to the chromophores which were left and entered have their
+    next hop redrawn; as hop times are exponential this gives the same
+    dynamics as redrawing every carrier.
+
+    Each carrier picks its next hop in the same way as
+    `Carrier.calculate_hop` with the occupied chromophores removed, so with
+    one carrier this is the same as `run_single_kmc`.
+
+    Parameters
+    ----------
+    chromo_list : list of Chromophore
+        The chromophores in the simulation.
+    snap : gsd.hoomd.Snapshot
+        The simulation snapshot.
+    temp : float
+        The simulation temperature in Kelvin.
+    lifetime : float
+        The duration of the simulation in seconds, which is the lifetime of
+        every carrier.
+    n_holes : int, default 0
+        The number of holes, which start on distinct random donors.
+    n_elec : int, default 0
+        The number of electrons, which start on distinct random acceptors.
+    carrier_kwargs : dict, default {}
+        The keyword arguments for the Carrier instances. "use_avg_hoprates" is
+        not supported.
+    rate_table : dict, default None
+        The hop rates of every neighbor pair, as returned by `get_rate_table`
+        with the parameters in `carrier_kwargs`. If None is given, it will be
+        computed.
+    seed : int, default None
+        A seed for the random processes.
+    verbose : int, default 0
+        The verbosity level of output.
+
+    Returns
+    -------
+    list of Carrier
+        The finished carriers. Use `combine_carriers` to get the same data as
+        `run_kmc`.
+    """
+    if carrier_kwargs.get("use_avg_hoprates", False):
+        raise ValueError(
+            "use_avg_hoprates is not supported by the interacting KMC."
+        )
+    if seed is not None:
+        np.random.seed(seed)
+    n = len(chromo_list)
+    box = snap.configuration.box[:3]
+    if rate_table is None:
+        rate_table = get_rate_table(
+            chromo_list, box, temp, **_rate_kwargs(carrier_kwargs)
+        )
+    in_indptr, in_sources = _in_neighbors(rate_table, n)
+
+    # The index of the carrier on each chromophore, or -1 if it is empty
+    occupancy = np.full(n, -1, dtype=int)
+    carriers = []
+    for species, n_carriers in [("donor", n_holes), ("acceptor", n_elec)]:
+        sites = [i for i, chromo in enumerate(chromo_list)
+                 if chromo.species == species]
+        if n_carriers > len(sites):
+            raise ValueError(
+                f"Cannot place {n_carriers} carriers on {len(sites)} "
+                f"{species} chromophores."
+            )
+        for i in np.random.choice(sites, n_carriers, replace=False):
+            carrier = Carrier(
+                chromo_list[i],
+                lifetime,
+                len(carriers),
+                box,
+                temp,
+                n,
+                **carrier_kwargs,
+            )
+            occupancy[i] = carrier.id
+            carriers.append(carrier)
+    v_print(f"Placed {len(carriers)} carriers", verbose)
+
+    # Each carrier's next hop is stored with a version number; heap entries
+    # with an old version were superseded and are skipped
+    next_hops = [None] * len(carriers)
+    versions = np.zeros(len(carriers), dtype=int)
+    heap = []
+
+    def _schedule(carrier, now):
+        versions[carrier.id] += 1
+        next_hops[carrier.id] = None
+        hop_limit = carrier.hop_limit
+        if hop_limit is not None and carrier.n_hops + 1 > hop_limit:
+            return
+        start = rate_table["indptr"][carrier.current_chromo.id]
+        end = rate_table["indptr"][carrier.current_chromo.id + 1]
+        rates = rate_table["rate"][start:end]
+        # Ignore any hops with a NoneType transfer integral or onto
+        # an occupied chromophore
+        free = ~np.isnan(rates) & (occupancy[rate_table["j"][start:end]] < 0)
+        if not free.any():
+            return
+        hop_times = hf.get_event_taus(rates[free])
+        fastest = np.argmin(hop_times)
+        if hop_times[fastest] >= 1e99:
+            return
+        edge = start + np.flatnonzero(free)[fastest]
+        hop_time = now + hop_times[fastest]
+        next_hops[carrier.id] = (hop_time, edge)
+        heapq.heappush(heap, (hop_time, carrier.id, versions[carrier.id]))
+
+    for carrier in carriers:
+        _schedule(carrier, 0.0)
+
+    t0 = time.perf_counter()
+    n_steps = 0
+    while heap:
+        hop_time, carrier_id, version = heapq.heappop(heap)
+        if version != versions[carrier_id]:
+            continue
+        carrier = carriers[carrier_id]
+        if carrier.hop_limit is None and hop_time > lifetime:
+            break
+        _, edge = next_hops[carrier_id]
+        source = carrier.current_chromo.id
+        dest = rate_table["j"][edge]
+        if "scale" in rate_table:
+            carrier.n_unscaled_hops += 1 / rate_table["scale"][edge]
+        else:
+            carrier.n_unscaled_hops += 1
+        carrier.perform_hop(
+            chromo_list[dest],
+            hop_time - carrier.current_time,
+            rate_table["image"][edge],
+        )
+        occupancy[source] = -1
+        occupancy[dest] = carrier_id
+        n_steps += 1
+
+        # Redraw the next hops of the carriers which could hop to either
+        # chromophore
+        neighbors = np.concatenate(
+            [
+                in_sources[in_indptr[source] : in_indptr[source + 1]],
+                in_sources[in_indptr[dest] : in_indptr[dest + 1]],
+            ]
+        )
+        affected = set(occupancy[neighbors][occupancy[neighbors] >= 0])
+        affected.add(carrier_id)
+        for i_carrier in sorted(affected):
+            _schedule(carriers[i_carrier], hop_time)
+
+    for carrier in carriers:
+        if carrier.hop_limit is None:
+            carrier.record_checkpoints(lifetime, inclusive=True)
+        carrier.update_displacement()
+    elapsed = hf.time_units(time.perf_counter() - t0)
+    v_print(
+        f"{len(carriers)} interacting carriers performed {n_steps} hops "
+        f"(took walltime {elapsed})",
+        verbose,
+    )
+    return carriers
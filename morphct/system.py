@@ -1,14 +1,26 @@
+import csv
 import os
 import time
 
 import gsd, gsd.hoomd
 import numpy as np
 
-from morphct.chromophores import Chromophore, set_neighbors_voronoi
+from morphct.chromophores import (
+    Chromophore, get_chromo_centers, set_neighbors_voronoi, set_qcc_inputs
+)
 from morphct.execute_qcc import (
     singles_homolumo, dimer_homolumo, set_energyvalues
 )
-from morphct.mobility_kmc import run_kmc
+from morphct.master_equation import get_mobility_tensor
+from morphct.mobility_kmc import (
+    combine_carriers,
+    get_checkpoint_times,
+    get_molecule_ids,
+    run_interacting_kmc,
+    run_kmc,
+    run_kmc_grid,
+    run_kmc_sweep,
+)
 from morphct import kmc_analyze
 
 
@@ -23,7 +35,8 @@ class System():  # pragma: no cover
         The path to a directory where output files will be saved. If the path
         does not exist, it will be created.
     frame : int
-        The frame number of the gsdfile to use.
+        The frame number of the gsdfile to use. Other frames can be analyzed
+        later with `iter_frames` or `run_trajectory`.
     scale : float
         Scaling factor to convert the lengthscale in the gsdfile to Angstrom.
     conversion_dict : dict
@@ -44,6 +57,10 @@ class System():  # pragma: no cover
     qcc_pairs : list of ((int, int), str)
         QCC input for the pairs. Each list item contains a tuple of the pair
         indices and the QCC input string.
+    frame : int
+        The frame number of the gsdfile currently loaded in `snap`.
+    molecule_ids : numpy.ndarray of int
+        The molecule index of each chromophore.
 
     Methods
     -------
@@ -55,6 +72,18 @@ class System():  # pragma: no cover
         Set the computed energies.
     run_kmc
         Run the KMC simulation.
+    run_interacting_kmc
+        Run the KMC simulation with carriers which exclude each other.
+    run_kmc_sweep
+        Run the KMC simulation at several temperatures.
+    run_kmc_grid
+        Run the KMC simulation over a grid of rate-law parameters.
+    solve_mobility
+        Get the mobility tensor from the master equation instead of KMC.
+    iter_frames
+        Iterate over frames of the trajectory, updating the chromophores.
+    run_trajectory
+        Run the energy and KMC calculations for multiple frames.
     visualize_qcc_input
         Visualize the input to QCC.
     visualize_system
@@ -75,12 +104,10 @@ class System():  # pragma: no cover
         with gsd.hoomd.open(name=gsdfile, mode="rb") as f:
             snap = f[frame]
 
-        # It is expected that the snapshot is in the Angstrom length scale.
-        # If not, the scaling factor is used to adjust
-        snap.particles.position *= scale
-        snap.configuration.box[:3] *= scale
-
-        self.snap = snap
+        self.gsdfile = gsdfile
+        self.scale = scale
+        self.frame = frame
+        self.snap = self._scale_snap(snap)
         self.conversion_dict = conversion_dict
         if not os.path.exists(outpath):
             os.makedirs(outpath)
@@ -91,12 +118,38 @@ class System():  # pragma: no cover
         self.qcc_pairs = None
         self._dinds = []
         self._ainds = []
+        self._molecule_ids = None
+        # QCC results of each backend keyed by (qcc_input, charge) so that
+        # chromophores and pairs whose geometry has not changed are not
+        # recalculated. Only the results of the latest frame are kept.
+        self._qcc_cache = {}
+
+    def _scale_snap(self, snap):
+        # It is expected that the snapshot is in the Angstrom length scale.
+        # If not, the scaling factor is used to adjust
+        # Frames read from a gsd file can have read-only arrays
+        snap.particles.position = snap.particles.position * self.scale
+        box = np.array(snap.configuration.box, dtype=float)
+        box[:3] *= self.scale
+        snap.configuration.box = box
+        return snap
 
     @property
     def chromophores(self):
         """Return the chromophores in the system."""
         return self._chromophores
 
+    @property
+    def molecule_ids(self):
+        """Return the molecule index of each chromophore.
+
+        The molecules only depend on the bond topology, so they are computed
+        once and reused (e.g., for every frame of a trajectory).
+        """
+        if self._molecule_ids is None:
+            self._molecule_ids = get_molecule_ids(self.snap, self.chromophores)
+        return self._molecule_ids
+
     @property
     def carrier_data(self):
         """Return the carrier data for data inspecting purposes"""
@@ -114,8 +167,20 @@ class System():  # pragma: no cover
             Chromophore species ("donor" or "acceptor").
         chromophore_kwargs : dict, default {}
             Additional keywrod arguments to be passed to the Chromophore class.
+
+        Note
+        ----
+        The chromophore centers are computed for all indices at once and
+        writing the QCC inputs is deferred until they are needed (see
+        `set_qcc_inputs`), so many chromophores can be added quickly.
         """
+        if len(indices) == 0:
+            return
+        self._molecule_ids = None
         start = len(self.chromophores)
+        unwrapped_centers, images, centers = get_chromo_centers(
+            self.snap, indices
+        )
         for i, ind in enumerate(indices):
             self._chromophores.append(
                 Chromophore(
@@ -124,6 +189,10 @@ class System():  # pragma: no cover
                     ind,
                     species,
                     self.conversion_dict,
+                    unwrapped_center=unwrapped_centers[i],
+                    image=images[i],
+                    center=centers[i],
+                    write_qcc=False,
                     **chromophore_kwargs
                 )
             )
@@ -132,40 +201,71 @@ class System():  # pragma: no cover
         else:
             self._dinds += indices
 
-    def compute_energies(self, dcut=None):
+    def compute_energies(self, dcut=None, path=None, backend="mindo3"):
         """Compute the energies of the chromophores in the system.
 
+        Results are cached by their QCC input, so only chromophores and pairs
+        whose geometry has changed since the previous call with the same
+        backend are recalculated. The cache only keeps the results used by the
+        latest call, so it does not grow over a trajectory.
+
         Parameters
         ----------
         dcut : float, default None
             The distance cutoff for chromophore neighbors. If None is provided,
             the cutoff will be set to half the smallest box length of the
             snapshot.
+        path : path, default None
+            The directory where the energy files will be saved. If None is
+            provided, `outpath` is used.
+        backend : str or callable, default "mindo3"
+            How the energies are calculated. Use "surrogate" to exercise the
+            pipeline without quantum chemistry (see
+            `morphct.execute_qcc.get_qcc_backend`).
         """
         if dcut is None:
             dcut = min(self.snap.configuration.box[:3]/2)
+        cache = self._qcc_cache.setdefault(backend, {})
+        set_qcc_inputs(self.chromophores, self.snap, self.conversion_dict)
         self.qcc_pairs = set_neighbors_voronoi(
             self.chromophores, self.snap, self.conversion_dict, d_cut=dcut
         )
         print(f"There are {len(self.qcc_pairs)} chromophore pairs")
 
-        s_filename = os.path.join(self.outpath, "singles_energies.txt")
-        d_filename = os.path.join(self.outpath, "dimer_energies.txt")
+        if path is None:
+            path = self.outpath
+        s_filename = os.path.join(path, "singles_energies.txt")
+        d_filename = os.path.join(path, "dimer_energies.txt")
 
         t0 = time.perf_counter()
         print("Starting singles energy calculation...")
-        data = singles_homolumo(self.chromophores, s_filename)
+        data = singles_homolumo(
+            self.chromophores, s_filename, cache=cache, backend=backend
+        )
         t1 = time.perf_counter()
         print(f"Finished in {t1-t0:.2f} s. Output written to {s_filename}.")
 
         print("Starting dimer energy calculation...")
         dimer_data = dimer_homolumo(
-            self.qcc_pairs, self.chromophores, d_filename
+            self.qcc_pairs,
+            self.chromophores,
+            d_filename,
+            cache=cache,
+            backend=backend,
         )
         t2 = time.perf_counter()
         print(f"Finished in {t2-t1:.2f} s. Output written to {d_filename}.")
 
-    def set_energies(self, dcut=None):
+        # Drop the results of geometries which are no longer present
+        chromos = self.chromophores
+        used = {(chromo.qcc_input, chromo.charge) for chromo in chromos}
+        used.update(
+            (qcc_input, chromos[i].charge + chromos[j].charge)
+            for (i, j), qcc_input in self.qcc_pairs
+        )
+        self._qcc_cache[backend] = {key: cache[key] for key in used}
+
+    def set_energies(self, dcut=None, path=None):
         """Set the computed energies.
 
         Parameters
@@ -174,6 +274,9 @@ class System():  # pragma: no cover
             The distance cutoff for chromophore neighbors. If None is provided,
             the cutoff will be set to half the smallest box length of the
             snapshot.
+        path : path, default None
+            The directory where the energy files were saved. If None is
+            provided, `outpath` is used.
         """
         if self.qcc_pairs is None:
             if dcut is None:
@@ -182,8 +285,10 @@ class System():  # pragma: no cover
                 self.chromophores, self.snap, self.conversion_dict, d_cut=dcut
             )
 
-        s_filename = os.path.join(self.outpath, "singles_energies.txt")
-        d_filename = os.path.join(self.outpath, "dimer_energies.txt")
+        if path is None:
+            path = self.outpath
+        s_filename = os.path.join(path, "singles_energies.txt")
+        d_filename = os.path.join(path, "dimer_energies.txt")
 
         if not (os.path.isfile(s_filename) and os.path.isfile(d_filename)):
             raise FileNotFoundError(
@@ -201,7 +306,14 @@ class System():  # pragma: no cover
         n_elec=0,
         seed=42,
         carrier_kwargs={},
-        verbose=0
+        verbose=0,
+        path=None,
+        plot=True,
+        plot_nprocs=1,
+        target_rse=None,
+        checkpoints=None,
+        basin_ratio=None,
+        field=None,
     ):
         """Run the KMC simulation.
 
@@ -222,8 +334,41 @@ class System():  # pragma: no cover
             Additional keyword arguments to be passed to the carrier instances.
         verbose : int, default 0
             The verbosity level of output.
+        path : path, default None
+            The directory in which the "kmc" output directory will be created.
+            If None is provided, `outpath` is used.
+        plot : bool, default True
+            Whether to plot the results. If False, only the metrics are
+            computed (see `morphct.kmc_analyze.main`).
+        plot_nprocs : int, default 1
+            Number of processes used to render the figures (see
+            `morphct.kmc_analyze.render`).
+        target_rse : float, default None
+            If given, stop starting new carriers once the relative standard
+            error of the mobility is below this value (see
+            `morphct.mobility_kmc.run_kmc`).
+        checkpoints : int, default None
+            If given, each carrier runs to the longest lifetime and its
+            position is recorded at this many logarithmically spaced times
+            (see `morphct.mobility_kmc.run_kmc`).
+        basin_ratio : float, default None
+            If given, the hop rates within superbasins are scaled down with
+            this separation from the escape rates (see
+            `morphct.mobility_kmc.get_superbasins`).
+        field : numpy.ndarray, shape (3,), default None
+            The applied electric field in Volts/meter. If given, the mobility
+            is measured from the drift of the carriers (see
+            `morphct.kmc_analyze.get_drift_mobility`).
+
+        Returns
+        -------
+        dict
+            The results of `morphct.kmc_analyze.main`, e.g., the mobility and
+            anisotropy of each carrier type.
         """
-        kmc_dir = os.path.join(self.outpath, "kmc")
+        if path is None:
+            path = self.outpath
+        kmc_dir = os.path.join(path, "kmc")
         if not os.path.exists(kmc_dir):
             os.makedirs(kmc_dir)
         data = run_kmc(
@@ -236,11 +381,466 @@ class System():  # pragma: no cover
             n_elec=n_elec,
             seed=seed,
             carrier_kwargs=carrier_kwargs,
-            verbose=verbose
+            verbose=verbose,
+            mol_ids=self.molecule_ids,
+            target_rse=target_rse,
+            checkpoints=checkpoints,
+            basin_ratio=basin_ratio,
+            field=field,
+        )
+
+        self._carrier_data = data
+        return kmc_analyze.main(
+            data,
+            temp,
+            self.chromophores,
+            self.snap,
+            kmc_dir,
+            chromo_mol_id=self.molecule_ids,
+            plot=plot,
+            plot_nprocs=plot_nprocs,
+        )
+
+    def run_interacting_kmc(
+        self,
+        lifetimes,
+        temp,
+        n_holes=0,
+        n_elec=0,
+        seed=42,
+        carrier_kwargs={},
+        verbose=0,
+        path=None,
+        plot=True,
+        plot_nprocs=1,
+        checkpoints=10,
+    ):
+        """Run the KMC simulation with carriers which exclude each other.
+
+        All of the carriers hop at the same time and cannot share a
+        chromophore (see `morphct.mobility_kmc.run_interacting_kmc`), so the
+        carrier density is n_holes (or n_elec) over the number of donors (or
+        acceptors). The simulation runs to the longest lifetime and the
+        positions of the carriers are recorded at checkpoint times from which
+        the mobility is found, as with `checkpoints` in `run_kmc`.
+
+        Parameters
+        ----------
+        lifetimes : list of float
+            The times in seconds spanned by the checkpoints. The simulation
+            runs to the longest one.
+        temp : float
+            The simulation temperature in Kelvin.
+        n_holes : int, default 0
+            The number of holes to simulate.
+        n_elec : int, default 0
+            The number of electrons to simulate.
+        seed : int, default 42
+            A seed for the random processes.
+        carrier_kwargs : dict, default {}
+            Additional keyword arguments to be passed to the carrier instances.
+        verbose : int, default 0
+            The verbosity level of output.
+        path : path, default None
+            The directory in which the "kmc_interacting" output directory will
+            be created. If None is provided, `outpath` is used.
+        plot : bool, default True
+            Whether to plot the results. If False, only the metrics are
+            computed (see `morphct.kmc_analyze.main`).
+        plot_nprocs : int, default 1
+            Number of processes used to render the figures (see
+            `morphct.kmc_analyze.render`).
+        checkpoints : int, default 10
+            The number of logarithmically spaced checkpoint times (see
+            `morphct.mobility_kmc.get_checkpoint_times`).
+
+        Returns
+        -------
+        dict
+            The results of `morphct.kmc_analyze.main`, e.g., the mobility and
+            anisotropy of each carrier type.
+        """
+        if path is None:
+            path = self.outpath
+        kmc_dir = os.path.join(path, "kmc_interacting")
+        if not os.path.exists(kmc_dir):
+            os.makedirs(kmc_dir)
+        carrier_kwargs = {
+            **carrier_kwargs,
+            "checkpoint_times": get_checkpoint_times(lifetimes, checkpoints),
+        }
+        carriers = run_interacting_kmc(
+            self.chromophores,
+            self.snap,
+            temp,
+            max(lifetimes),
+            n_holes=n_holes,
+            n_elec=n_elec,
+            carrier_kwargs=carrier_kwargs,
+            seed=seed,
+            verbose=verbose,
         )
+        data = combine_carriers(carriers)
 
         self._carrier_data = data
-        kmc_analyze.main(data, temp, self.chromophores, self.snap, kmc_dir)
+        return kmc_analyze.main(
+            data,
+            temp,
+            self.chromophores,
+            self.snap,
+            kmc_dir,
+            chromo_mol_id=self.molecule_ids,
+            plot=plot,
+            plot_nprocs=plot_nprocs,
+        )
+
+    def run_kmc_sweep(
+        self,
+        temps,
+        lifetimes,
+        n_holes=0,
+        n_elec=0,
+        seed=42,
+        carrier_kwargs={},
+        verbose=0,
+        path=None,
+        nprocs=None,
+        error_method=None,
+    ):
+        """Run the KMC simulation at several temperatures.
+
+        The carriers of all the temperatures are run in one set of processes
+        (see `morphct.mobility_kmc.run_kmc_sweep`) and the mobilities are
+        written to "sweep_results.csv" in the "kmc_sweep" output directory.
+
+        Parameters
+        ----------
+        temps : list of float
+            The simulation temperatures in Kelvin.
+        lifetimes : list of float
+            The potential lifetimes of the carriers. A value from these will be
+            randomly assigned to each run.
+        n_holes : int, default 0
+            The number of holes to simulate at each temperature.
+        n_elec : int, default 0
+            The number of electrons to simulate at each temperature.
+        seed : int, default 42
+            A seed for the random processes.
+        carrier_kwargs : dict, default {}
+            Additional keyword arguments to be passed to the carrier instances.
+        verbose : int, default 0
+            The verbosity level of output.
+        path : path, default None
+            The directory in which the "kmc_sweep" output directory will be
+            created. If None is provided, `outpath` is used.
+        nprocs : int, default None
+            The number of processes. If None is given, the number of cpus is
+            used.
+        error_method : str, default None
+            How to estimate the error of the mobility (see
+            `morphct.kmc_analyze.analyze_carrier`).
+
+        Returns
+        -------
+        list of dict
+            One row per temperature and carrier type with the "temp" and the
+            results of `morphct.kmc_analyze.summarize_mobility`.
+        """
+        if path is None:
+            path = self.outpath
+        kmc_dir = os.path.join(path, "kmc_sweep")
+        if not os.path.exists(kmc_dir):
+            os.makedirs(kmc_dir)
+        data = run_kmc_sweep(
+            temps,
+            lifetimes,
+            kmc_dir,
+            self.chromophores,
+            self.snap,
+            n_holes=n_holes,
+            n_elec=n_elec,
+            seed=seed,
+            nprocs=nprocs,
+            carrier_kwargs=carrier_kwargs,
+            verbose=verbose,
+            mol_ids=self.molecule_ids,
+        )
+        rows = [
+            {"temp": temp, **row}
+            for temp, temp_data in zip(temps, data)
+            for row in kmc_analyze.summarize_mobility(
+                temp_data, temp, error_method=error_method
+            )
+        ]
+        kmc_analyze.write_table(
+            rows, os.path.join(kmc_dir, "sweep_results.csv")
+        )
+        return rows
+
+    def run_kmc_grid(
+        self,
+        grid,
+        lifetimes,
+        n_holes=0,
+        n_elec=0,
+        seed=42,
+        carrier_kwargs={},
+        verbose=0,
+        path=None,
+        nprocs=None,
+        error_method=None,
+    ):
+        """Run the KMC simulation over a grid of rate-law parameters.
+
+        The carriers of all the grid points are run in one set of processes
+        (see `morphct.mobility_kmc.run_kmc_grid`) and the mobilities are
+        written to "grid_results.csv" in the "kmc_grid" output directory.
+
+        Parameters
+        ----------
+        grid : dict of list
+            The values of each rate-law parameter, e.g.
+            ``{"temp": [300], "reorganization_energy": [0.2, 0.3],
+            "boltz": [False, True]}``. See
+            `morphct.mobility_kmc.get_grid_points` for the valid parameters.
+        lifetimes : list of float
+            The potential lifetimes of the carriers. A value from these will be
+            randomly assigned to each run.
+        n_holes : int, default 0
+            The number of holes to simulate at each grid point.
+        n_elec : int, default 0
+            The number of electrons to simulate at each grid point.
+        seed : int, default 42
+            A seed for the random processes.
+        carrier_kwargs : dict, default {}
+            Additional keyword arguments to be passed to the carrier instances.
+        verbose : int, default 0
+            The verbosity level of output.
+        path : path, default None
+            The directory in which the "kmc_grid" output directory will be
+            created. If None is provided, `outpath` is used.
+        nprocs : int, default None
+            The number of processes. If None is given, the number of cpus is
+            used.
+        error_method : str, default None
+            How to estimate the error of the mobility (see
+            `morphct.kmc_analyze.analyze_carrier`).
+
+        Returns
+        -------
+        list of dict
+            One row per grid point and carrier type with the grid parameters
+            and the results of `morphct.kmc_analyze.summarize_mobility`.
+        """
+        if path is None:
+            path = self.outpath
+        kmc_dir = os.path.join(path, "kmc_grid")
+        if not os.path.exists(kmc_dir):
+            os.makedirs(kmc_dir)
+        points, data = run_kmc_grid(
+            grid,
+            lifetimes,
+            kmc_dir,
+            self.chromophores,
+            self.snap,
+            n_holes=n_holes,
+            n_elec=n_elec,
+            seed=seed,
+            nprocs=nprocs,
+            carrier_kwargs=carrier_kwargs,
+            verbose=verbose,
+            mol_ids=self.molecule_ids,
+        )
+        rows = [
+            {**point, **row}
+            for point, point_data in zip(points, data)
+            for row in kmc_analyze.summarize_mobility(
+                point_data, point["temp"], error_method=error_method
+            )
+        ]
+        kmc_analyze.write_table(
+            rows, os.path.join(kmc_dir, "grid_results.csv")
+        )
+        return rows
+
+    def solve_mobility(self, temp, c_type="hole", field=1e5, carrier_kwargs={}):
+        """Get the mobility tensor from the master equation instead of KMC.
+
+        Parameters
+        ----------
+        temp : float
+            The simulation temperature in Kelvin.
+        c_type : str, default "hole"
+            The carrier type, "electron" or "hole".
+        field : float, default 1e5
+            The strength of the applied field in Volts/meter.
+        carrier_kwargs : dict, default {}
+            The rate options ("hopping_prefactor", "use_vrh", and "boltz") as
+            they would be given to `run_kmc`. Other keys are ignored.
+
+        Returns
+        -------
+        dict
+            The results of `morphct.master_equation.get_mobility_tensor`.
+        """
+        rate_kwargs = {
+            key: carrier_kwargs[key]
+            for key in ["hopping_prefactor", "use_vrh", "boltz"]
+            if key in carrier_kwargs
+        }
+        return get_mobility_tensor(
+            self.chromophores,
+            self.snap.configuration.box[:3],
+            temp,
+            c_type=c_type,
+            field=field,
+            **rate_kwargs,
+        )
+
+    def iter_frames(self, frames=None):
+        """Iterate over frames of the trajectory, updating the chromophores.
+
+        Frames are read from the gsdfile lazily, one at a time. At each frame
+        the snapshot is replaced and the chromophores are updated in place
+        with `Chromophore.update_geometry`, so the chromophore atom indices and
+        bond topology found for the first frame are reused and only the
+        geometry-dependent quantities are recomputed. Neighbors and energies
+        are reset and must be computed again for each frame, and the QCC inputs
+        are written when `compute_energies` is called.
+
+        Parameters
+        ----------
+        frames : iterable of int, default None
+            The frame numbers to iterate over. If None is provided, every frame
+            in the gsdfile is used.
+
+        Yields
+        ------
+        int
+            The frame number currently loaded in `snap`.
+        """
+        with gsd.hoomd.open(name=self.gsdfile, mode="rb") as f:
+            if frames is None:
+                frames = range(len(f))
+            for frame in frames:
+                self.snap = self._scale_snap(f[frame])
+                self.frame = frame
+                self.qcc_pairs = None
+                self._comp = None
+                for chromo in self.chromophores:
+                    chromo.update_geometry(
+                        self.snap, self.conversion_dict, write_qcc=False
+                    )
+                yield frame
+
+    def run_trajectory(
+        self,
+        lifetimes,
+        temp,
+        frames=None,
+        dcut=None,
+        n_holes=0,
+        n_elec=0,
+        seed=42,
+        carrier_kwargs={},
+        verbose=0,
+        backend="mindo3",
+        plot=True,
+    ):
+        """Run the energy and KMC calculations for multiple frames.
+
+        The output of each frame is saved in a "frame_<n>" directory in
+        `outpath`, and the per-frame results are written to
+        "trajectory_results.csv". QCC results are cached from one frame to the
+        next, so chromophores and pairs whose geometry is unchanged are not
+        recomputed.
+
+        Parameters
+        ----------
+        lifetimes : list of float
+            The potential lifetimes of the carriers. A value from these will be
+            randomly assigned to each run.
+        temp : float
+            The simulation temperature in Kelvin.
+        frames : iterable of int, default None
+            The frame numbers to use. If None is provided, every frame in the
+            gsdfile is used.
+        dcut : float, default None
+            The distance cutoff for chromophore neighbors. If None is provided,
+            the cutoff will be set to half the smallest box length of each
+            snapshot.
+        n_holes : int, default 0
+            The number of holes to simulate in each frame.
+        n_elec : int, default 0
+            The number of electrons to simulate in each frame.
+        seed : int, default 42
+            A seed for the random processes. Frame n uses `seed` + n, so the
+            carriers of different frames are independent.
+        carrier_kwargs : dict, default {}
+            Additional keyword arguments to be passed to the carrier instances.
+        verbose : int, default 0
+            The verbosity level of output.
+        backend : str or callable, default "mindo3"
+            How the energies are calculated (see `compute_energies`).
+        plot : bool, default True
+            Whether to plot the results of each frame (see `run_kmc`).
+
+        Returns
+        -------
+        dict
+            The per-frame results in "frames" (a dict mapping the frame number
+            to the results of `run_kmc`) and, for each carrier type simulated,
+            the mean mobility over the frames and its standard error (e.g.,
+            "hole_mobility" and "hole_mobility_err").
+        """
+        frame_results = {}
+        for frame in self.iter_frames(frames):
+            print(f"---------- FRAME {frame} ----------")
+            frame_dir = os.path.join(self.outpath, f"frame_{frame}")
+            os.makedirs(frame_dir, exist_ok=True)
+            self.compute_energies(dcut=dcut, path=frame_dir, backend=backend)
+            self.set_energies(path=frame_dir)
+            frame_results[frame] = self.run_kmc(
+                lifetimes,
+                temp,
+                n_holes=n_holes,
+                n_elec=n_elec,
+                seed=seed + frame,
+                carrier_kwargs=carrier_kwargs,
+                verbose=verbose,
+                path=frame_dir,
+                plot=plot,
+            )
+
+        results = {"frames": frame_results}
+        for c_type in ["hole", "electron"]:
+            mobs = [
+                d[f"{c_type}_mobility"] for d in frame_results.values()
+                if f"{c_type}_mobility" in d
+            ]
+            if not mobs:
+                continue
+            mob = np.mean(mobs)
+            if len(mobs) > 1:
+                mob_err = np.std(mobs, ddof=1) / np.sqrt(len(mobs))
+            else:
+                mob_err = np.nan
+            results[f"{c_type}_mobility"] = mob
+            results[f"{c_type}_mobility_err"] = mob_err
+            print(
+                f"{c_type.capitalize()} mobility over {len(mobs)} frames = "
+                f"{mob:.2E} +/- {mob_err:.2E} cm^2 V^-1 s^-1"
+            )
+
+        keys = sorted({k for d in frame_results.values() for k in d})
+        filepath = os.path.join(self.outpath, "trajectory_results.csv")
+        with open(filepath, "w") as f:
+            w = csv.writer(f)
+            w.writerow(["frame"] + keys)
+            for frame, d in frame_results.items():
+                w.writerow([frame] + [d.get(k) for k in keys])
+        print(f"Trajectory results written to {filepath}")
+        return results
 
     def visualize_qcc_input(self, i, single=True):
         """Visualize the input for pyscf using mbuild.
@@ -261,6 +861,9 @@ class System():  # pragma: no cover
         import mbuild as mb
 
         if single:
+            set_qcc_inputs(
+                self.chromophores[i:i+1], self.snap, self.conversion_dict
+            )
             qcc_input = self.chromophores[i].qcc_input
         else:
             qcc_input = self.qcc_pairs[i][1]
@@ -45,6 +45,81 @@ class TestChromophores(BaseTest):
         )
         assert chromo.vrh_delocalization == 2e-10
 
+    def test_update_geometry(self, p3ht_snap):
+        from morphct.chromophores import Chromophore, conversion_dict
+
+        atom_ids = np.array([1, 0, 4, 3, 2, 5, 6, 7, 8, 9, 10])
+        chromo = Chromophore(0, p3ht_snap, atom_ids, "donor", conversion_dict)
+        chromo.neighbors.append([1, np.array([0, 0, 0])])
+        chromo.homo = -8.5
+        qcc_input = chromo.qcc_input
+
+        p3ht_snap.particles.position[atom_ids] += np.array([1.0, 0, 0])
+        chromo.update_geometry(p3ht_snap, conversion_dict)
+
+        assert np.allclose(
+            chromo.center, np.array([9.53228682, -27.96646586, -35.07523658])
+        )
+        assert chromo.neighbors == chromo.neighbors_ti == []
+        assert chromo.homo is None
+        assert chromo.qcc_input != qcc_input
+        assert len(chromo.qcc_input.split(";")) == len(qcc_input.split(";"))
+
+    def test_bulk_chromophores(self, p3ht_snap, p3ht_chromo_list):
+        from morphct.chromophores import (
+            Chromophore, conversion_dict, get_chromo_centers, set_qcc_inputs
+        )
+
+        atom_ids = [chromo.atom_ids for chromo in p3ht_chromo_list]
+        unwrapped_centers, images, centers = get_chromo_centers(
+            p3ht_snap, atom_ids
+        )
+        chromo_list = [
+            Chromophore(
+                i,
+                p3ht_snap,
+                ids,
+                "donor",
+                conversion_dict,
+                unwrapped_center=unwrapped_centers[i],
+                image=images[i],
+                center=centers[i],
+                write_qcc=False,
+            )
+            for i, ids in enumerate(atom_ids)
+        ]
+        assert all(chromo.qcc_input is None for chromo in chromo_list)
+
+        set_qcc_inputs(chromo_list, p3ht_snap, conversion_dict)
+        for i, chromo in enumerate(chromo_list):
+            ref = Chromophore(
+                i, p3ht_snap, atom_ids[i], "donor", conversion_dict
+            )
+            assert np.allclose(chromo.center, ref.center, atol=1e-4)
+            assert np.array_equal(chromo.image, ref.image)
+            assert chromo.qcc_input == ref.qcc_input
+
+    def test_chromo_orientations(self, p3ht_snap, p3ht_chromo_list):
+        import freud
+        from morphct.chromophores import get_chromo_orientations
+
+        atom_ids = [chromo.atom_ids for chromo in p3ht_chromo_list]
+        normals = get_chromo_orientations(p3ht_snap, atom_ids)
+        assert normals.shape == (30, 3)
+        assert np.allclose(np.linalg.norm(normals, axis=1), 1)
+
+        box = freud.Box.from_box(p3ht_snap.configuration.box)
+        for ids, normal in zip(atom_ids, normals):
+            pos = box.unwrap(
+                p3ht_snap.particles.position[ids],
+                p3ht_snap.particles.image[ids],
+            )
+            ref = np.linalg.svd(pos - pos.mean(axis=0))[2][-1]
+            assert np.isclose(abs(np.dot(ref, normal)), 1)
+            # Same side as the plane through the first three atoms
+            plane = np.cross(pos[1] - pos[0], pos[2] - pos[0])
+            assert np.dot(plane, normal) > 0
+
     def test_chromos_from_smiles(self, p3ht_snap):
         from morphct.chromophores import get_chromo_ids_smiles, conversion_dict
 
@@ -53,6 +128,47 @@ class TestChromophores(BaseTest):
         assert len(aaids) == 29
         assert np.all([len(i) == 11 for i in aaids])
 
+    def test_chromos_from_smiles_by_molecule(
+        self, p3ht_snap, p3ht_chromo_list
+    ):
+        from morphct.chromophores import get_chromo_ids_smiles, conversion_dict
+
+        p3ht_smarts = "[#6]1[#6][#16][#6][#6]1CCCCCC"
+        aaids = get_chromo_ids_smiles(
+            p3ht_snap, p3ht_smarts, conversion_dict, by_molecule=True
+        )
+        # Both identical chains are matched using the geometry of the first,
+        # which also finds the chromophore missed by the global match
+        assert len(aaids) == 30
+        assert sorted(tuple(sorted(i)) for i in aaids) == sorted(
+            tuple(sorted(c.atom_ids)) for c in p3ht_chromo_list
+        )
+
+    def test_chromos_from_smiles_parallel(self, p3ht_snap):
+        from morphct.chromophores import get_chromo_ids_smiles, conversion_dict
+
+        # Give the last hydrogen a new type so the two chains have different
+        # topologies and are matched on different processes
+        snap = p3ht_snap
+        snap.particles.types = list(snap.particles.types) + ["H2"]
+        h1 = snap.particles.types.index("H1")
+        last_h = np.flatnonzero(snap.particles.typeid == h1)[-1]
+        snap.particles.typeid[last_h] = len(snap.particles.types) - 1
+        conversion = {**conversion_dict, "H2": conversion_dict["H1"]}
+
+        p3ht_smarts = "[#6]1[#6][#16][#6][#6]1CCCCCC"
+        serial = get_chromo_ids_smiles(
+            snap, p3ht_smarts, conversion, by_molecule=True, nprocs=1
+        )
+        parallel = get_chromo_ids_smiles(
+            snap, p3ht_smarts, conversion, by_molecule=True, nprocs=2
+        )
+        assert len(serial) == len(parallel)
+        assert all(np.array_equal(i, j) for i, j in zip(serial, parallel))
+
+        with pytest.raises(ValueError):
+            get_chromo_ids_smiles(snap, p3ht_smarts, conversion, nprocs=2)
+
     def test_set_neighbors_voronoi(self, p3ht_snap, p3ht_chromo_list):
         from morphct.chromophores import set_neighbors_voronoi, conversion_dict
 
@@ -82,3 +198,18 @@ class TestChromophores(BaseTest):
             repr(chromo)
             == "Chromophore 0 (donor): 11 atoms at 8.532 -27.966 -35.075"
         )
+
+    def test_get_neighbor_arrays(self, p3ht_chromo_list_energies):
+        from morphct.chromophores import get_neighbor_arrays
+
+        chromo_list = p3ht_chromo_list_energies
+        i, j, images, tis, delta_es = get_neighbor_arrays(chromo_list)
+        chromo = chromo_list[0]
+        n = len(chromo.neighbors)
+
+        assert len(i) == len(j) == len(images) == len(tis) == len(delta_es)
+        assert np.all(i[:n] == 0)
+        assert list(j[:n]) == [k for k, _ in chromo.neighbors]
+        assert np.array_equal(
+            np.isnan(tis[:n]), [ti is None for ti in chromo.neighbors_ti]
+        )
@@ -1,4 +1,6 @@
 import numpy as np
+import pytest
+
 from base_test import BaseTest
 
 
@@ -21,6 +23,80 @@ class TestEQCC(BaseTest):
             data, np.array([[-9.01337182, -8.5404688, 0.17193304, 0.86523495]])
         )
 
+    def test_singles_homolumo_cache(self, p3ht_chromo_list):
+        from morphct.execute_qcc import singles_homolumo
+
+        chromo = p3ht_chromo_list[0]
+        energies = np.array([-9.0, -8.5, 0.2, 0.9])
+        cache = {(chromo.qcc_input, chromo.charge): energies}
+        data = singles_homolumo([chromo, chromo], cache=cache)
+
+        assert np.array_equal(data, np.array([energies, energies]))
+        assert len(cache) == 1
+
+    def test_surrogate_backend(self, p3ht_chromo_list, p3ht_qcc_pairs):
+        from morphct.execute_qcc import (
+            dimer_homolumo, get_homolumo_surrogate, singles_homolumo
+        )
+
+        chromo = p3ht_chromo_list[0]
+        energies = get_homolumo_surrogate(chromo.qcc_input)
+        assert np.all(np.diff(energies) > 0)
+        data = singles_homolumo([chromo, chromo], backend="surrogate")
+        assert np.array_equal(data, np.array([energies, energies]))
+
+        # The HOMOs of the two chromophores split in the dimer
+        pair, dimer = dimer_homolumo(
+            [p3ht_qcc_pairs[0]], p3ht_chromo_list, backend="surrogate"
+        )[0]
+        assert 0 < dimer[1] - dimer[0] < energies[1] - energies[0]
+
+        def constant(molstr, charge=0):
+            return np.array([-2.0, -1.0, 1.0, 2.0])
+
+        data = singles_homolumo([chromo], nprocs=1, backend=constant)
+        assert np.array_equal(data, [[-2.0, -1.0, 1.0, 2.0]])
+
+        with pytest.raises(ValueError):
+            singles_homolumo([chromo], backend="dft")
+
+        # Chromophores added without their QCC inputs
+        chromo.qcc_input = None
+        with pytest.raises(ValueError, match="set_qcc_inputs"):
+            singles_homolumo([chromo], backend="surrogate")
+
+    def test_get_boundary_bonds(self, p3ht_snap):
+        from morphct.execute_qcc import get_boundary_bonds
+
+        atom_ids = np.array([1, 0, 4, 3, 2, 5, 6, 7, 8, 9, 10])
+        boundary = get_boundary_bonds(p3ht_snap, atom_ids)
+
+        assert np.all(np.isin(boundary[:, 0], atom_ids))
+        assert not np.any(np.isin(boundary[:, 1], atom_ids))
+
+    def test_get_boundary_bonds_bulk(self, p3ht_snap, p3ht_chromo_list):
+        from morphct.execute_qcc import (
+            get_boundary_bonds, get_boundary_bonds_bulk
+        )
+
+        atom_ids = [chromo.atom_ids for chromo in p3ht_chromo_list]
+        boundary = get_boundary_bonds_bulk(p3ht_snap, atom_ids)
+
+        assert len(boundary) == len(atom_ids)
+        for bonds, ids in zip(boundary, atom_ids):
+            assert np.array_equal(bonds, get_boundary_bonds(p3ht_snap, ids))
+
+    def test_get_atom_bonds(self, p3ht_snap):
+        from morphct.execute_qcc import get_atom_bonds
+
+        indptr, bond_inds = get_atom_bonds(p3ht_snap)
+        bonds = np.asarray(p3ht_snap.bonds.group)
+
+        assert len(indptr) == p3ht_snap.particles.N + 1
+        for n in [0, 5, p3ht_snap.particles.N - 1]:
+            expected = np.flatnonzero(np.any(bonds == n, axis=1))
+            assert np.array_equal(bond_inds[indptr[n]:indptr[n+1]], expected)
+
     def test_dimer_homolumo(self, p3ht_qcc_pairs, p3ht_chromo_list):
         from morphct.execute_qcc import dimer_homolumo
 
@@ -33,6 +33,14 @@ class TestHelperFunctions(BaseTest):
             ),
         )
 
+    def test_get_bonded_clusters(self):
+        from morphct.helper_functions import get_bonded_clusters
+
+        bonds = np.array([[4, 5], [0, 2], [2, 1]])
+        assert np.array_equal(
+            get_bonded_clusters(7, bonds), np.array([0, 0, 0, 1, 2, 2, 3])
+        )
+
     def test_time_units(self):
         from morphct.helper_functions import time_units
 
@@ -41,6 +49,27 @@ class TestHelperFunctions(BaseTest):
         assert time_units(10000) == "2.78 hours"
         assert time_units(100000) == "1.16 days"
 
+    def test_logger(self, tmp_path):
+        from morphct.helper_functions import Logger
+
+        class Unformattable:
+            def __format__(self, spec):
+                raise AssertionError("disabled messages must not be formatted")
+
+        filename = tmp_path / "kmc_00.log"
+        logger = Logger(1, filename=filename, buffer_size=3)
+        logger.log("hop {}", 1)
+        logger.log("hop {}", Unformattable(), v_level=1)
+        assert not logger.enabled(v_level=1)
+        assert not filename.exists()
+
+        logger.log("hop {}", 2)
+        logger.log("hop {}", 3)
+        assert filename.read_text() == "hop 1\nhop 2\nhop 3\n"
+        logger.log("done")
+        logger.close()
+        assert filename.read_text().endswith("hop 3\ndone\n")
+
     def test_find_axis(self):
         from morphct.helper_functions import find_axis
 
@@ -118,6 +147,36 @@ class TestHelperFunctions(BaseTest):
             boltz=True,
         ) == pytest.approx(603.98144350, 1e-8)
 
+    def test_get_hop_rates(self):
+        from morphct.helper_functions import (
+            elem_chrg, get_hop_rate, get_hop_rates, k_B
+        )
+
+        tis = np.array([0, 0.2456720694088973, 0.0013270585750558073])
+        deltas = np.array([0.06218457533310762, 0.016112646653095197, -0.02])
+        rates = get_hop_rates(0.3064, tis, deltas, 1, 300)
+        assert rates[0] == 0
+        assert rates[1] == pytest.approx(68518361827044, 1)
+        for ti, delta, rate in zip(tis, deltas, rates):
+            assert get_hop_rate(0.3064, ti, delta, 1, 300) == rate
+
+        rates = get_hop_rates(
+            0.3064,
+            tis,
+            deltas,
+            1,
+            300,
+            use_vrh=True,
+            rij=np.array([4e-10, 4e-10, 8e-10]),
+            vrh=2e-10,
+            boltz=True,
+        )
+        # Only the uphill hop is penalized
+        kT = k_B * 300 / elem_chrg
+        assert rates[2] / rates[1] == pytest.approx(
+            (tis[2] / tis[1]) ** 2 * np.exp(-2) * np.exp(deltas[1] / kT)
+        )
+
     def get_event_tau(self):
         from morphct.helper_functions import get_event_tau
 
@@ -35,6 +35,62 @@ class TestKMC(BaseTest):
         assert np.allclose(mob, 0.092657299520)
         assert np.allclose(mob_err, 0.041287982679)
 
+    def test_get_mobility_error(self, p3ht_combined_carriers):
+        from morphct.kmc_analyze import get_mobility_error
+
+        jackknife = get_mobility_error(
+            p3ht_combined_carriers, 300, method="jackknife"
+        )
+        assert np.isclose(jackknife, 0.195324940493)
+
+        bootstrap = get_mobility_error(p3ht_combined_carriers, 300, seed=1)
+        assert bootstrap == get_mobility_error(
+            p3ht_combined_carriers, 300, seed=1
+        )
+        assert 0.5 < bootstrap / jackknife < 2
+
+        with pytest.raises(ValueError):
+            get_mobility_error(p3ht_combined_carriers, 300, method="mean")
+
+    def test_get_drift_mobility(self):
+        from morphct.kmc_analyze import get_drift_mobility
+
+        field = np.array([1e7, 0, 0])
+        carrier_data = {
+            "box": [np.array([10.0, 10.0, 10.0])] * 3,
+            "image": [np.array([1, 0, 0]), np.array([2, 0, 0]),
+                      np.array([3, 0, 0])],
+            "current_position": [np.zeros(3)] * 3,
+            "initial_position": [np.zeros(3)] * 3,
+            "lifetime": [1e-12] * 3,
+            "current_time": [0.9e-12] * 3,
+            "hop_limit": [None] * 3,
+            "c_type": ["hole"] * 3,
+        }
+        mobility, mob_error, velocity = get_drift_mobility(carrier_data, field)
+        assert np.isclose(mobility, 2.0)
+        assert np.isclose(mob_error, np.sqrt(1 / 3))
+        assert np.allclose(velocity, [2000, 0, 0])
+
+        carrier_data["c_type"] = ["electron"] * 3
+        mobility, _, _ = get_drift_mobility(carrier_data, field)
+        assert np.isclose(mobility, -2.0)
+
+    def test_summarize_mobility(self, p3ht_combined_carriers):
+        from morphct.kmc_analyze import (
+            analyze_carrier, split_carriers, summarize_mobility
+        )
+
+        rows = summarize_mobility(p3ht_combined_carriers, 300)
+        holes, _ = split_carriers(p3ht_combined_carriers)
+        results = analyze_carrier("hole", holes, 300)
+
+        assert len(rows) == 1
+        assert rows[0]["c_type"] == "hole"
+        assert rows[0]["n_carriers"] == 20
+        assert rows[0]["mobility"] == results["mobility"]
+        assert rows[0]["mobility_err"] == results["mobility_err"]
+
     def test_get_connections(
             self, p3ht_chromo_list_energies, p3ht_combined_carriers
             ):
@@ -49,6 +105,19 @@ class TestKMC(BaseTest):
         assert connections.shape == (25,7)
         assert np.allclose(connections[0][0], 8.53228681737)
 
+    def test_get_hop_frequencies(self, p3ht_combined_carriers):
+        from morphct.kmc_analyze import get_hop_frequencies
+
+        history = p3ht_combined_carriers["hole_history"]
+        total, net, discrepancy = get_hop_frequencies(history)
+
+        assert len(total) == len(net) == len(discrepancy) == 24
+        assert np.all(total > 0)
+        assert np.array_equal(discrepancy % 2, np.zeros(24))
+        assert total.sum() == history.tocsr()[
+            np.tril_indices(history.shape[0])
+        ].sum()
+
     def test_get_anisotropy(self, p3ht_combined_carriers):
         from morphct.kmc_analyze import get_anisotropy
 
@@ -106,4 +175,59 @@ class TestKMC(BaseTest):
         orients = get_orientations(chromo_list, p3ht_snap)
 
         assert len(orients) == 30
-        assert np.allclose(orients[0], [0.42126867, 0.55094784,-0.720409])
+        assert np.allclose(orients[0], [0.59057043, 0.51389141, -0.62220751])
+        # The orientations are cached on the chromophores
+        assert chromo_list[0].orientation is orients[0]
+
+    def test_get_edge_table(self, p3ht_chromo_list_energies, p3ht_snap):
+        from morphct.kmc_analyze import (
+            get_edge_table, get_neighbor_tis, get_orientations
+        )
+        from morphct.mobility_kmc import get_molecule_ids
+
+        chromo_list = p3ht_chromo_list_energies
+        box = p3ht_snap.configuration.box[:3]
+        mol_ids = get_molecule_ids(p3ht_snap, chromo_list)
+        orientations = get_orientations(chromo_list, p3ht_snap)
+        edges = get_edge_table(chromo_list, mol_ids, box, orientations)
+
+        assert len(edges["i"]) == 362
+        assert np.all(edges["same_species"])
+        assert edges["i"][5] == 0
+        ichromo = chromo_list[0]
+        j, img = ichromo.neighbors[5]
+        sep = np.linalg.norm(
+            chromo_list[j].center + img * box - ichromo.center
+        )
+        assert np.isclose(edges["separation"][5], sep)
+        assert edges["intra_mol"][5] == (mol_ids[ichromo.id] == mol_ids[j])
+
+        ti_intra, ti_inter = get_neighbor_tis(chromo_list, mol_ids, edges)
+        assert len(ti_intra[0]) + len(ti_inter[0]) == 181
+        assert ti_intra[1] == ti_inter[1] == []
+
+    def test_analyze(
+            self, p3ht_combined_carriers, p3ht_chromo_list_energies, p3ht_snap
+            ):
+        from morphct.kmc_analyze import analyze
+
+        freqcut = [None, None]
+        results = analyze(
+            p3ht_combined_carriers,
+            300,
+            p3ht_chromo_list_energies,
+            p3ht_snap,
+            freqcut=freqcut,
+        )
+        data = results["data"]
+
+        assert np.allclose(data["hole_mobility"], 0.092657299520)
+        assert np.allclose(data["hole_mobility_err"], 0.041287982679)
+        assert np.allclose(data["hole_anisotropy"], 0.416638588839)
+        assert np.allclose(data["donor_delta_eij_std"], 0.142674)
+        assert data["donor_clusters"] == 2
+        assert data["intra_mrd_hops"] + data["inter_mrd_hops"] == 95
+        assert "electron_mobility" not in data
+        assert list(results["carriers"]) == ["hole"]
+        # The cutoffs passed in are not modified
+        assert freqcut == [None, None]
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from base_test import BaseTest
+
+
+class TestMasterEquation(BaseTest):
+    def test_steady_state(self):
+        from scipy.sparse import csr_matrix
+        from morphct.master_equation import get_steady_state
+
+        # Rates which satisfy detailed balance with occupations 1 : 2 : 4
+        rates = csr_matrix(
+            np.array([[0, 2e12, 4e10], [1e12, 0, 2e10], [1e10, 1e10, 0]])
+        )
+        expected = np.array([1, 2, 4]) / 7
+        for solver in ["iterative", "direct"]:
+            occupations = get_steady_state(rates, solver=solver)
+            assert np.allclose(occupations, expected)
+
+        with pytest.raises(ValueError):
+            get_steady_state(rates, solver="cg")
+
+    def test_mobility_tensor(self, p3ht_chromo_list_energies, p3ht_snap):
+        from morphct.master_equation import get_mobility_tensor
+
+        chromo_list = p3ht_chromo_list_energies
+        box = p3ht_snap.configuration.box[:3]
+        results = get_mobility_tensor(chromo_list, box, 300)
+        tensor = results["mobility_tensor"]
+
+        # Only the x direction percolates through the periodic box
+        assert np.isclose(tensor[0, 0], 0.0410472, rtol=1e-5)
+        assert np.allclose(tensor.ravel()[1:], 0, atol=1e-8)
+        assert np.isclose(results["mobility"], np.trace(tensor) / 3)
+        assert len(results["chromo_ids"]) == 30
+        assert np.isclose(results["occupations"].sum(), 1)
+
+        direct = get_mobility_tensor(chromo_list, box, 300, solver="direct")
+        assert np.allclose(direct["mobility_tensor"], tensor, atol=1e-8)
+
+        with pytest.raises(ValueError):
+            get_mobility_tensor(chromo_list, box, 300, c_type="electron")
@@ -64,6 +64,352 @@ class TestKMC(BaseTest):
         assert len(jobs) == n
         assert jobs[0][0] == (9, 1e-13, 'electron')
 
+    def test_get_molecule_ids(self, p3ht_chromo_list, p3ht_snap):
+        from morphct.mobility_kmc import get_molecule_ids
+
+        mol_ids = get_molecule_ids(p3ht_snap, p3ht_chromo_list)
+
+        assert isinstance(mol_ids, np.ndarray)
+        assert len(mol_ids) == len(p3ht_chromo_list)
+        assert np.array_equal(np.bincount(mol_ids), [15, 15])
+
+    def test_get_rate_table(self, p3ht_chromo_list_energies):
+        from morphct.helper_functions import get_hop_rate
+        from morphct.mobility_kmc import get_rate_table
+
+        chromo_list = p3ht_chromo_list_energies
+        box = np.array([85.18963, 85.18963, 85.18963])
+        table = get_rate_table(chromo_list, box, 300)
+
+        assert table["indptr"][-1] == len(table["rate"]) == 362
+        chromo = chromo_list[3]
+        start, end = table["indptr"][3:5]
+        neighbors = [n for n, _ in chromo.neighbors]
+        assert np.array_equal(table["j"][start:end], neighbors)
+        for rate, ti, delta_e in zip(
+            table["rate"][start:end],
+            chromo.neighbors_ti,
+            chromo.neighbors_delta_e,
+        ):
+            if ti is None:
+                assert np.isnan(rate)
+            else:
+                assert rate == get_hop_rate(
+                    chromo.reorganization_energy, ti, delta_e, 1.0, 300
+                )
+
+        single = get_rate_table(chromo_list, box, 300, chromo_ids=[3])
+        assert np.array_equal(
+            single["rate"], table["rate"][start:end], equal_nan=True
+        )
+
+        # A field along x lowers the energy of hole hops along x
+        field = get_rate_table(chromo_list, box, 300, field=[1e6, 0, 0])
+        centers = np.array([chromo.center for chromo in chromo_list])
+        pairs = zip(
+            chromo.neighbors, chromo.neighbors_ti, chromo.neighbors_delta_e
+        )
+        for n, ((j, image), ti, delta_e) in enumerate(pairs):
+            if ti is None:
+                continue
+            dx = (centers[j] + image * box - chromo.center)[0] * 1e-10
+            expected = get_hop_rate(
+                chromo.reorganization_energy, ti, delta_e - dx * 1e6, 1.0, 300
+            )
+            assert np.isclose(field["rate"][start + n], expected)
+
+        # Only the sources and their neighbors are gathered for a subset
+        kwargs = {"use_vrh": True, "field": [1e6, 0, 0]}
+        full = get_rate_table(chromo_list, box, 300, **kwargs)
+        subset = get_rate_table(
+            chromo_list, box, 300, chromo_ids=[17, 3], **kwargs
+        )
+        edges = np.r_[
+            full["indptr"][17]:full["indptr"][18],
+            full["indptr"][3]:full["indptr"][4],
+        ]
+        assert np.array_equal(subset["i"], full["i"][edges])
+        assert np.array_equal(
+            subset["rate"], full["rate"][edges], equal_nan=True
+        )
+
+    def test_get_rate_tables(self, p3ht_chromo_list_energies):
+        from morphct.mobility_kmc import get_rate_table, get_rate_tables
+
+        chromo_list = p3ht_chromo_list_energies
+        box = np.array([85.18963, 85.18963, 85.18963])
+        temps = [200, 300, 400]
+        tables = get_rate_tables(chromo_list, box, temps, boltz=True)
+
+        assert len(tables) == 3
+        for temp, table in zip(temps, tables):
+            single = get_rate_table(chromo_list, box, temp, boltz=True)
+            assert np.array_equal(table["j"], single["j"])
+            assert np.allclose(
+                table["rate"], single["rate"], rtol=1e-12, equal_nan=True
+            )
+        assert tables[0]["i"] is tables[1]["i"]
+
+    def test_get_rate_grid(self, p3ht_chromo_list_energies):
+        from copy import deepcopy
+        from morphct.mobility_kmc import (
+            get_grid_points, get_rate_grid, get_rate_table
+        )
+
+        chromo_list = p3ht_chromo_list_energies
+        box = np.array([85.18963, 85.18963, 85.18963])
+        grid = {
+            "temp": [300],
+            "boltz": [False, True],
+            "reorganization_energy": [None, 0.2],
+        }
+        points = get_grid_points(grid)
+        tables = get_rate_grid(chromo_list, box, points)
+
+        assert len(points) == 4
+        assert points[1] == {
+            "temp": 300, "boltz": False, "reorganization_energy": 0.2
+        }
+        modified = deepcopy(chromo_list)
+        for chromo in modified:
+            chromo.reorganization_energy = 0.2
+        for point, table in zip(points, tables):
+            chromos = chromo_list
+            if point["reorganization_energy"]:
+                chromos = modified
+            single = get_rate_table(chromos, box, 300, boltz=point["boltz"])
+            assert np.allclose(
+                table["rate"], single["rate"], rtol=1e-12, equal_nan=True
+            )
+
+        with pytest.raises(ValueError):
+            get_grid_points({"temp": [300], "lambda": [0.2]})
+        with pytest.raises(ValueError):
+            get_grid_points({"boltz": [True]})
+
+    def test_run_interacting_kmc(self, p3ht_chromo_list_energies, p3ht_snap):
+        from morphct.mobility_kmc import combine_carriers, run_interacting_kmc
+
+        chromo_list = p3ht_chromo_list_energies
+        carriers = run_interacting_kmc(
+            chromo_list, p3ht_snap, 300, 1e-12, n_holes=10, seed=42
+        )
+        final_ids = [carrier.current_chromo.id for carrier in carriers]
+        assert len(set(final_ids)) == 10
+        assert sum(carrier.n_hops for carrier in carriers) > 0
+        assert all(carrier.current_time <= 1e-12 for carrier in carriers)
+        data = combine_carriers(carriers)
+        assert data["hole_history"].sum() == sum(data["n_hops"])
+
+        # Every donor is occupied, so no carrier can hop
+        carriers = run_interacting_kmc(
+            chromo_list, p3ht_snap, 300, 1e-12, n_holes=30, seed=42
+        )
+        assert all(carrier.n_hops == 0 for carrier in carriers)
+
+        with pytest.raises(ValueError):
+            run_interacting_kmc(chromo_list, p3ht_snap, 300, 1e-12, n_holes=31)
+
+    def test_get_performance(self):
+        from types import SimpleNamespace
+        from morphct.mobility_kmc import get_performance
+
+        timings = {"rates": 1.0, "rng": 0.5, "selection": 0.25, "history": 0.25}
+        jobs_list = [
+            [(0, 1e-12, "hole"), (1, 1e-11, "hole")],
+            [(1, 1e-12, "hole"), (0, 1e-11, "hole")],
+        ]
+        carriers = [
+            SimpleNamespace(
+                id=i,
+                lifetime=lifetime,
+                c_type=c_type,
+                n_hops=n,
+                walltime=2.0,
+                timings=timings,
+            )
+            for (i, lifetime, c_type), n in zip(
+                jobs_list[0] + jobs_list[1], [0, 4, 3, 100]
+            )
+        ]
+        performance = get_performance(carriers, jobs_list, 5.0)
+
+        assert performance["n_hops"] == 107
+        assert np.isclose(performance["hops_per_second"], 107 / 5)
+        assert np.isclose(performance["timings"]["rates"], 4.0)
+        histogram = performance["hops_per_carrier"]
+        assert histogram["n_zero"] == 1
+        assert histogram["edges"][0] == 2
+        assert histogram["counts"] == [1, 1, 0, 0, 0, 1]
+        workers = performance["workers"]
+        assert [w["n_hops"] for w in workers] == [4, 103]
+        assert np.isclose(workers[1]["hops_per_second"], 103 / 4)
+        assert np.isclose(workers[0]["idle_time"], 1.0)
+
+    def test_mobility_accumulator(self, p3ht_combined_carriers):
+        from types import SimpleNamespace
+        from morphct.kmc_analyze import get_times_msds
+        from morphct.mobility_kmc import MobilityAccumulator
+
+        data = p3ht_combined_carriers
+        keys = ["c_type", "lifetime", "current_time", "n_hops", "displacement"]
+        accumulator = MobilityAccumulator(300, ["hole"], [1e-13, 1e-12])
+        assert not accumulator.converged(1.0, min_carriers=1)
+        for values in zip(*[data[key] for key in keys]):
+            accumulator.add(SimpleNamespace(**dict(zip(keys, values))))
+
+        lts, msds, _, _ = get_times_msds(data)
+        lifetimes, counts, acc_msds, _ = accumulator.get_msds("hole")
+        assert np.allclose(lifetimes, lts)
+        assert np.allclose(acc_msds, msds)
+        assert counts.sum() + accumulator.n_discarded == len(data["id"])
+
+        mobility, mob_error = accumulator.get_mobility("hole")
+        assert np.isclose(mobility, 0.092657299520)
+        rse = mob_error / mobility
+        assert accumulator.converged(2 * rse, min_carriers=1)
+        assert not accumulator.converged(0.5 * rse, min_carriers=1)
+        assert not accumulator.converged(2 * rse, min_carriers=1000)
+
+    def test_checkpoints(self, tmpdir, p3ht_chromo_list_energies, p3ht_snap):
+        from morphct.kmc_analyze import get_checkpoint_msds, get_mobility_error
+        from morphct.mobility_kmc import (
+            MobilityAccumulator, get_checkpoint_times, run_single_kmc
+        )
+
+        times = get_checkpoint_times([1e-14, 1e-12], 5)
+        assert np.allclose(times, 10.0 ** np.arange(-14, -11.9, 0.5))
+
+        jobs = [[i, 1e-12, "hole"] for i in range(4)]
+        carriers = run_single_kmc(
+            jobs,
+            tmpdir,
+            p3ht_chromo_list_energies,
+            p3ht_snap,
+            300,
+            seed=42,
+            carrier_kwargs={"checkpoint_times": times},
+        )
+        # Recording the checkpoints does not change the trajectory
+        assert carriers[0].n_hops == 212
+        assert carriers[0].current_chromo.id == 14
+        for carrier in carriers:
+            assert np.all(np.isfinite(carrier.checkpoint_positions))
+            final = carrier.current_chromo.center + carrier.image * carrier.box
+            assert np.allclose(carrier.checkpoint_positions[-1], final)
+
+        accumulator = MobilityAccumulator(300, ["hole"], times)
+        for carrier in carriers:
+            accumulator.add(carrier)
+        lts, counts, msds, msd_stderr = accumulator.get_msds("hole")
+        assert np.allclose(lts, times)
+        assert np.all(counts == 4)
+
+        carrier_data = {
+            "checkpoint_times": [c.checkpoint_times for c in carriers],
+            "checkpoint_positions": [c.checkpoint_positions for c in carriers],
+            "initial_position": [c.initial_chromo.center for c in carriers],
+        }
+        cp_times, cp_msds, _, cp_stderr = get_checkpoint_msds(carrier_data)
+        assert np.allclose(cp_times, times)
+        assert np.allclose(cp_msds, msds)
+        # Both are the standard error of the mean
+        assert np.allclose(cp_stderr, msd_stderr)
+        # The error comes from whole trajectories, like the jackknife
+        _, mob_error = accumulator.get_mobility("hole")
+        assert mob_error > 0
+        assert np.isclose(
+            mob_error, get_mobility_error(carrier_data, 300, "jackknife")
+        )
+
+    def test_run_kmc_target_rse_checkpoints(
+        self, tmpdir, p3ht_chromo_list_energies, p3ht_snap
+    ):
+        from morphct.kmc_analyze import get_mobility_error
+        from morphct.mobility_kmc import MobilityAccumulator, run_kmc
+
+        carriers = run_kmc(
+            [1e-13, 1e-12],
+            tmpdir,
+            p3ht_chromo_list_energies,
+            p3ht_snap,
+            300,
+            n_holes=200,
+            nprocs=1,
+            combine=False,
+            verbose=0,
+            target_rse=0.3,
+            min_carriers=5,
+            checkpoints=5,
+        )
+        assert 5 <= len(carriers) < 200
+
+        # The run stopped once the trajectory error reached the target, and
+        # the one process may have finished one more carrier
+        accumulator = MobilityAccumulator(
+            300, ["hole"], carriers[0].checkpoint_times
+        )
+        n_converged = None
+        for n, carrier in enumerate(carriers, 1):
+            accumulator.add(carrier)
+            if n_converged is None and accumulator.converged(0.3, 5):
+                n_converged = n
+        assert n_converged is not None
+        assert len(carriers) - n_converged <= 1
+        _, mob_error = accumulator.get_mobility("hole")
+        carrier_data = {
+            "checkpoint_times": [c.checkpoint_times for c in carriers],
+            "checkpoint_positions": [c.checkpoint_positions for c in carriers],
+            "initial_position": [c.initial_chromo.center for c in carriers],
+        }
+        assert np.isclose(
+            mob_error, get_mobility_error(carrier_data, 300, "jackknife")
+        )
+
+    def test_superbasins(self, tmpdir, p3ht_chromo_list_energies, p3ht_snap):
+        from morphct.mobility_kmc import (
+            get_rate_table, get_superbasins, run_single_kmc, scale_superbasins
+        )
+
+        # A fast pair (0, 1) which escapes slowly to 2
+        rate_table = {
+            "indptr": np.array([0, 2, 4, 6]),
+            "i": np.array([0, 0, 1, 1, 2, 2]),
+            "j": np.array([1, 2, 0, 2, 0, 1]),
+            "image": np.zeros((6, 3), dtype=int),
+            "rate": np.array([1e12, 1e8, 1e12, 1e8, 1e8, 1e8]),
+        }
+        basins = get_superbasins(rate_table, ratio=10)
+        assert np.array_equal(basins["basin"], [0, 0, -1])
+        assert np.allclose(basins["scale"], [1e-3])
+        assert np.allclose(basins["separation"], [1e4])
+        scaled = scale_superbasins(rate_table, basins)
+        assert np.allclose(scaled["rate"], [1e9, 1e8, 1e9, 1e8, 1e8, 1e8])
+
+        # The pair is not a superbasin if it connects to its own image
+        rate_table["image"][2] = [1, 0, 0]
+        assert np.all(get_superbasins(rate_table)["basin"] == -1)
+
+        chromo_list = p3ht_chromo_list_energies
+        box = p3ht_snap.configuration.box[:3]
+        rate_table = get_rate_table(chromo_list, box, 300)
+        basins = get_superbasins(rate_table, ratio=3)
+        assert np.array_equal(basins["size"], [5, 12])
+        assert np.allclose(basins["separation"], [19.4, 5.2], rtol=0.01)
+        assert np.allclose(basins["scale"] * basins["separation"], 3)
+
+        jobs = [[0, 1e-12, "hole"]]
+        carrier = run_single_kmc(
+            jobs,
+            tmpdir,
+            chromo_list,
+            p3ht_snap,
+            300,
+            seed=42,
+            rate_table=scale_superbasins(rate_table, basins),
+        )[0]
+        assert carrier.n_unscaled_hops > carrier.n_hops
+
     def test_runsinglekmc(self, tmpdir, p3ht_chromo_list_energies, p3ht_snap):
         from morphct.mobility_kmc import run_single_kmc
 
@@ -0,0 +1,181 @@
+import copy
+import csv
+import os
+
+import numpy as np
+import pytest
+
+from base_test import BaseTest, test_dir
+
+
+class TestSystem(BaseTest):
+    @pytest.fixture
+    def p3ht_trajectory(self, tmpdir, p3ht_snap, p3ht_chromo_list):
+        import gsd.hoomd
+
+        # Frame 1 repeats frame 0 and frame 2 moves the first chromophore
+        moved = copy.deepcopy(p3ht_snap)
+        moved.particles.position[p3ht_chromo_list[0].atom_ids, 0] += 0.05
+        filepath = os.path.join(tmpdir, "trajectory.gsd")
+        with gsd.hoomd.open(name=filepath, mode="w") as f:
+            for snap in [p3ht_snap, p3ht_snap, moved]:
+                f.append(snap)
+        return filepath
+
+    @pytest.fixture
+    def p3ht_system(self, tmpdir, p3ht_trajectory, p3ht_chromo_list):
+        from morphct.chromophores import conversion_dict
+        from morphct.system import System
+
+        system = System(
+            p3ht_trajectory,
+            os.path.join(tmpdir, "output"),
+            frame=0,
+            conversion_dict=conversion_dict,
+        )
+        system.add_chromophores(
+            [chromo.atom_ids for chromo in p3ht_chromo_list], "donor"
+        )
+        return system
+
+    @pytest.fixture
+    def p3ht_energy_system(self, tmpdir, p3ht_chromo_list):
+        from morphct.chromophores import conversion_dict
+        from morphct.system import System
+
+        system = System(
+            os.path.join(test_dir, "assets/p3ht_2_15mers.gsd"),
+            os.path.join(tmpdir, "output"),
+            conversion_dict=conversion_dict,
+        )
+        system.add_chromophores(
+            [chromo.atom_ids for chromo in p3ht_chromo_list], "donor"
+        )
+        system.set_energies(path=os.path.join(test_dir, "assets"))
+        return system
+
+    def test_iter_frames(self, tmpdir, p3ht_system):
+        system = p3ht_system
+        chromos = system.chromophores
+        atom_ids = [chromo.atom_ids for chromo in chromos]
+
+        frames = system.iter_frames([0, 1, 2])
+        assert next(frames) == 0
+        system.compute_energies(path=str(tmpdir), backend="surrogate")
+        bonds = [chromo.boundary_bonds for chromo in chromos]
+        cache = dict(system._qcc_cache["surrogate"])
+        key = (chromos[0].qcc_input, chromos[0].charge)
+
+        # An unchanged frame reuses the topology and every QCC result
+        assert next(frames) == 1
+        assert system.frame == 1
+        assert all(chromo.qcc_input is None for chromo in chromos)
+        system.compute_energies(path=str(tmpdir), backend="surrogate")
+        assert all(i is chromo.atom_ids for i, chromo in zip(atom_ids, chromos))
+        assert all(
+            b is chromo.boundary_bonds for b, chromo in zip(bonds, chromos)
+        )
+        repeat = system._qcc_cache["surrogate"]
+        assert repeat.keys() == cache.keys()
+        assert all(repeat[k] is cache[k] for k in cache)
+
+        # Only the moved chromophore and those capped by its atoms are
+        # recalculated
+        assert next(frames) == 2
+        system.compute_energies(path=str(tmpdir), backend="surrogate")
+        moved = system._qcc_cache["surrogate"]
+        assert key not in moved
+        assert (chromos[0].qcc_input, chromos[0].charge) in moved
+        keys = [(chromo.qcc_input, chromo.charge) for chromo in chromos]
+        reused = [k for k in keys if k in cache]
+        assert len(reused) >= len(chromos) - 2
+        assert all(moved[k] is cache[k] for k in reused)
+        with pytest.raises(StopIteration):
+            next(frames)
+
+    def test_run_trajectory(self, p3ht_system):
+        system = p3ht_system
+        results = system.run_trajectory(
+            [1e-11, 1e-10],
+            300,
+            frames=[0, 1],
+            n_holes=10,
+            backend="surrogate",
+            plot=False,
+        )
+        assert list(results["frames"]) == [0, 1]
+        assert {"hole_mobility", "hole_mobility_err"} <= results.keys()
+        assert "electron_mobility" not in results
+        # Each frame has its own seed, so identical frames differ
+        mobs = [d["hole_mobility"] for d in results["frames"].values()]
+        assert mobs[0] != mobs[1]
+        assert np.isclose(results["hole_mobility"], np.mean(mobs))
+
+        for frame in [0, 1]:
+            frame_dir = os.path.join(system.outpath, f"frame_{frame}")
+            assert os.path.isfile(
+                os.path.join(frame_dir, "singles_energies.txt")
+            )
+        filepath = os.path.join(system.outpath, "trajectory_results.csv")
+        with open(filepath) as f:
+            rows = list(csv.DictReader(f))
+        assert [row["frame"] for row in rows] == ["0", "1"]
+        assert all(float(row["hole_mobility"]) > 0 for row in rows)
+
+    def test_run_kmc_sweep(self, p3ht_energy_system):
+        system = p3ht_energy_system
+        temps = [250, 300]
+        rows = system.run_kmc_sweep(temps, [1e-13, 1e-12], n_holes=4, nprocs=2)
+        assert [(row["temp"], row["c_type"]) for row in rows] == [
+            (250, "hole"), (300, "hole")
+        ]
+        # n_holes are run at each lifetime
+        assert all(row["n_carriers"] == 8 for row in rows)
+
+        filepath = os.path.join(
+            system.outpath, "kmc_sweep", "sweep_results.csv"
+        )
+        with open(filepath) as f:
+            table = list(csv.DictReader(f))
+        assert [row["temp"] for row in table] == ["250", "300"]
+        assert float(table[1]["mobility"]) == rows[1]["mobility"]
+
+    def test_run_kmc_grid(self, p3ht_energy_system):
+        system = p3ht_energy_system
+        grid = {
+            "temp": [300],
+            "reorganization_energy": [None, 0.2],
+            "boltz": [False, True],
+        }
+        rows = system.run_kmc_grid(grid, [1e-13, 1e-12], n_holes=4, nprocs=2)
+        assert len(rows) == 4
+        assert {
+            (row["reorganization_energy"], row["boltz"]) for row in rows
+        } == {(None, False), (None, True), (0.2, False), (0.2, True)}
+        assert all(row["c_type"] == "hole" for row in rows)
+
+        filepath = os.path.join(system.outpath, "kmc_grid", "grid_results.csv")
+        with open(filepath) as f:
+            table = list(csv.DictReader(f))
+        assert len(table) == 4
+        assert {"temp", "reorganization_energy", "boltz", "mobility"} <= set(
+            table[0]
+        )
+
+    def test_run_kmc_field(self, p3ht_energy_system):
+        system = p3ht_energy_system
+        field = [1e7, 0, 0]
+        with pytest.raises(ValueError):
+            system.run_kmc(
+                [1e-12], 300, n_holes=4, field=field, target_rse=0.1
+            )
+
+        results = system.run_kmc(
+            [1e-11], 300, n_holes=50, plot=False, field=field
+        )
+        mobility = results["hole_mobility"]
+        mob_error = results["hole_mobility_err"]
+        assert mob_error > 0
+        # The drift mobility along the field agrees with the master equation
+        tensor = system.solve_mobility(300, field=1e7)["mobility_tensor"]
+        assert abs(mobility - tensor[0, 0]) < 2 * mob_error